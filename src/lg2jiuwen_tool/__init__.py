@@ -12,20 +12,53 @@ A tool for migrating LangGraph agents to openJiuwen framework.
     )
 """
 
-from .service import (
-    migrate_new,
-    migrate_async,
-    MigrationOptions,
-    MigrationResult,
-)
-from .ir.models import (
-    AgentIR,
-    WorkflowIR,
-    WorkflowNodeIR,
-    WorkflowEdgeIR,
-    ToolIR,
-    MigrationIR,
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .service import (
+        migrate_new,
+        migrate_async,
+        MigrationOptions,
+        MigrationResult,
+    )
+    from .ir.models import (
+        AgentIR,
+        WorkflowIR,
+        WorkflowNodeIR,
+        WorkflowEdgeIR,
+        ToolIR,
+        MigrationIR,
+    )
+
+# 延迟导入：名称 -> 所在子模块
+# 导入包本身（如 CLI 的 --help / --version）不会加载 openjiuwen 等重量级依赖
+_LAZY_IMPORTS = {
+    "migrate_new": ".service",
+    "migrate_async": ".service",
+    "MigrationOptions": ".service",
+    "MigrationResult": ".service",
+    "AgentIR": ".ir.models",
+    "WorkflowIR": ".ir.models",
+    "WorkflowNodeIR": ".ir.models",
+    "WorkflowEdgeIR": ".ir.models",
+    "ToolIR": ".ir.models",
+    "MigrationIR": ".ir.models",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
 
 __version__ = "2.0.0"
 __all__ = [
@@ -0,0 +1,174 @@
+"""
+LG2Jiuwen 压缩包迁移
+
+供 /migrate/archive 接口使用：
+- 将上传的 zip 安全解压到临时工作区（防目录穿越、符号链接和解压炸弹）
+- 迁移结果直接写入 zip 输出流，不在服务端落盘生成目录
+"""
+
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+import zipfile
+from typing import IO, Iterator, Optional, Tuple
+
+from .output_sink import ZipSink
+from .service import MigrationOptions, MigrationResult, migrate_async
+
+
+# 上传包大小上限（压缩后）
+MAX_ARCHIVE_BYTES = int(os.getenv("LG2JIUWEN_MAX_ARCHIVE_BYTES", str(50 * 1024 * 1024)))
+# 解压后总大小上限
+MAX_EXTRACTED_BYTES = int(os.getenv("LG2JIUWEN_MAX_EXTRACTED_BYTES", str(200 * 1024 * 1024)))
+# 文件数上限
+MAX_ARCHIVE_FILES = int(os.getenv("LG2JIUWEN_MAX_ARCHIVE_FILES", "5000"))
+
+# 超过该大小的上传包和结果包溢出到临时文件
+SPOOL_BYTES = 8 * 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    """上传的压缩包无效或超出限制"""
+
+
+def _member_path(dest_dir: str, info: zipfile.ZipInfo) -> str:
+    """校验并返回成员解压后的绝对路径"""
+    name = info.filename.replace("\\", "/")
+    if name.startswith("/") or (len(name) > 1 and name[1] == ":"):
+        raise ArchiveError(f"absolute path in archive: {info.filename}")
+    if ".." in name.split("/"):
+        raise ArchiveError(f"path traversal in archive: {info.filename}")
+    if stat.S_ISLNK(info.external_attr >> 16):
+        raise ArchiveError(f"symlink in archive: {info.filename}")
+
+    target = os.path.realpath(os.path.join(dest_dir, *name.split("/")))
+    if os.path.commonpath([dest_dir, target]) != dest_dir:
+        raise ArchiveError(f"path traversal in archive: {info.filename}")
+    return target
+
+
+def safe_extract(
+    fileobj: IO[bytes],
+    dest_dir: str,
+    max_files: int = MAX_ARCHIVE_FILES,
+    max_bytes: int = MAX_EXTRACTED_BYTES
+) -> None:
+    """
+    安全解压 zip
+
+    按实际解压出的字节数计数，不信任 zip 中声明的大小
+
+    Raises:
+        ArchiveError: 不是有效的 zip、包含不安全路径或超出限制
+    """
+    dest_dir = os.path.realpath(dest_dir)
+    try:
+        zf = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        raise ArchiveError(f"invalid zip archive: {e}") from e
+
+    with zf:
+        members = zf.infolist()
+        if len(members) > max_files:
+            raise ArchiveError(f"too many files in archive: {len(members)} > {max_files}")
+
+        total = 0
+        for info in members:
+            target = _member_path(dest_dir, info)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zf.open(info) as src, open(target, "wb") as dst:
+                while True:
+                    chunk = src.read(64 * 1024)
+                    if not chunk:
+                        break
+                    total += len(chunk)
+                    if total > max_bytes:
+                        raise ArchiveError(f"archive expands beyond {max_bytes} bytes")
+                    dst.write(chunk)
+
+
+def find_project_root(dest_dir: str) -> str:
+    """压缩包只有一个顶层目录时（常见的打包方式），以该目录为项目根目录"""
+    entries = [name for name in os.listdir(dest_dir) if name != "__MACOSX"]
+    if len(entries) == 1 and os.path.isdir(os.path.join(dest_dir, entries[0])):
+        return os.path.join(dest_dir, entries[0])
+    return dest_dir
+
+
+def migrate_archive(
+    fileobj: IO[bytes],
+    options: Optional[MigrationOptions] = None,
+    llm=None
+) -> Tuple[MigrationResult, IO[bytes]]:
+    """
+    迁移 zip 中的 LangGraph 项目，返回迁移结果和生成项目的 zip
+
+    同步函数，在独立线程（或进程）中调用；返回的文件对象已定位到开头，由调用方关闭
+
+    Raises:
+        ArchiveError: 上传的压缩包无效
+    """
+    options = options or MigrationOptions(use_ai=False)
+    workspace = tempfile.mkdtemp(prefix="lg2jiuwen-archive-")
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    try:
+        source_dir = os.path.join(workspace, "source")
+        os.makedirs(source_dir)
+        safe_extract(fileobj, source_dir)
+        source_path = find_project_root(source_dir)
+
+        sink = ZipSink(output)
+        try:
+            result = asyncio.run(migrate_async(
+                source_path, os.path.join(workspace, "output"), options, llm, sink=sink
+            ))
+        finally:
+            sink.close()
+        output.seek(0)
+        return result, output
+    except BaseException:
+        output.close()
+        raise
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def migrate_archive_file(
+    archive_path: str,
+    output_path: str,
+    options: Optional[MigrationOptions] = None
+) -> MigrationResult:
+    """
+    文件路径版本的 migrate_archive，生成项目的 zip 写入 output_path
+
+    参数和返回值均可 pickle，供任务管理器在工作进程中调用
+
+    Raises:
+        ArchiveError: 上传的压缩包无效
+    """
+    with open(archive_path, "rb") as fileobj:
+        result, output = migrate_archive(fileobj, options)
+    try:
+        with open(output_path, "wb") as f:
+            shutil.copyfileobj(output, f)
+    finally:
+        output.close()
+    return result
+
+
+def iter_file(fileobj: IO[bytes], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """按块读取文件对象，读完后关闭"""
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
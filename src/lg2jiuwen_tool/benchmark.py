@@ -0,0 +1,552 @@
+"""
+LG2Jiuwen 迁移前后延迟对比
+
+在同一进程中加载 LangGraph 源项目和迁移后的 openJiuwen 项目：
+- LLM 替换为本地确定性的 StubLLM，并禁止网络访问，可在 CI 中离线运行
+- 使用 RuleExtractorComp 从源代码提取的示例输入驱动两侧
+- 对比两侧的最终输出，统计各节点和端到端的延迟分布
+"""
+
+import asyncio
+import contextlib
+import importlib
+import inspect
+import os
+import socket
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .stub_llm import StubLLM
+
+
+# 识别为 LangGraph 图对象的变量名（与 RuleExtractorComp 一致）
+GRAPH_VAR_NAMES = ("app", "graph", "workflow", "agent")
+
+# 加载项目时跳过的目录
+IGNORED_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"}
+
+
+class BenchmarkError(RuntimeError):
+    """无法加载或运行被测项目"""
+
+
+@dataclass
+class LatencyStats:
+    """延迟分布（毫秒）"""
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    min: float
+    max: float
+
+    @classmethod
+    def from_samples(cls, samples: List[float]) -> "LatencyStats":
+        """由耗时样本（秒）计算分布"""
+        if not samples:
+            return cls(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+        ordered = sorted(s * 1000 for s in samples)
+
+        def percentile(p: float) -> float:
+            return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered),
+            p50=percentile(50),
+            p90=percentile(90),
+            p99=percentile(99),
+            min=ordered[0],
+            max=ordered[-1],
+        )
+
+
+@dataclass
+class SideResult:
+    """一侧（源项目或迁移后项目）的运行结果"""
+    output: Dict[str, Any]                                         # 最后一次运行的输出
+    total: List[float] = field(default_factory=list)               # 端到端耗时（秒）
+    nodes: Dict[str, List[float]] = field(default_factory=dict)    # 各节点耗时（秒）
+    error: Optional[str] = None                                    # 运行时抛出的异常
+
+
+@dataclass
+class BenchmarkReport:
+    """对比结果"""
+    inputs: Dict[str, Any]
+    iterations: int
+    source_total: LatencyStats
+    migrated_total: LatencyStats
+    source_nodes: Dict[str, LatencyStats]
+    migrated_nodes: Dict[str, LatencyStats]
+    mismatches: Dict[str, Tuple[Any, Any]] = field(default_factory=dict)  # 字段 → (源输出, 迁移后输出)
+    compared: List[str] = field(default_factory=list)         # 两侧都输出、参与比较的字段
+    source_only: List[str] = field(default_factory=list)      # 只有源项目输出的字段
+    migrated_only: List[str] = field(default_factory=list)    # 只有迁移后项目输出的字段
+    source_error: Optional[str] = None                        # 源项目运行时抛出的异常
+    migrated_error: Optional[str] = None                      # 迁移后项目运行时抛出的异常
+
+    @property
+    def failed(self) -> bool:
+        """是否有一侧运行失败"""
+        return self.source_error is not None or self.migrated_error is not None
+
+    @property
+    def comparable(self) -> bool:
+        """两侧是否有可比较的字段"""
+        return bool(self.compared)
+
+    @property
+    def outputs_match(self) -> bool:
+        """迁移后输出是否与源项目一致（运行失败或没有可比较的字段时不算一致）"""
+        return not self.failed and self.comparable and not self.mismatches
+
+    @property
+    def verdict(self) -> str:
+        """输出比较结论"""
+        if self.failed:
+            return "运行失败"
+        if not self.comparable:
+            return "无可比较字段"
+        return "是" if self.outputs_match else "否"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可 JSON 序列化的字典"""
+        return {
+            "inputs": self.inputs,
+            "iterations": self.iterations,
+            "outputs_match": self.outputs_match,
+            "comparable": self.comparable,
+            "compared": self.compared,
+            "source_only": self.source_only,
+            "migrated_only": self.migrated_only,
+            "errors": {"source": self.source_error, "migrated": self.migrated_error},
+            "mismatches": {k: {"source": repr(s), "migrated": repr(m)} for k, (s, m) in self.mismatches.items()},
+            "total": {"source": vars(self.source_total), "migrated": vars(self.migrated_total)},
+            "nodes": {
+                name: {
+                    "source": vars(self.source_nodes[name]) if name in self.source_nodes else None,
+                    "migrated": vars(self.migrated_nodes[name]) if name in self.migrated_nodes else None,
+                }
+                for name in self._node_names()
+            },
+        }
+
+    def to_markdown(self) -> str:
+        """生成对比表格"""
+        lines = [
+            "# 迁移前后延迟对比",
+            "",
+            f"- 迭代次数: {self.iterations}",
+            f"- 输出一致: {self.verdict}",
+            "",
+            "| 阶段 | LangGraph p50 (ms) | openJiuwen p50 (ms) | LangGraph p90 (ms) | openJiuwen p90 (ms) | 次数 |",
+            "|------|------|------|------|------|------|",
+        ]
+        rows = [("端到端", self.source_total, self.migrated_total)]
+        empty = LatencyStats.from_samples([])
+        for name in self._node_names():
+            rows.append((name, self.source_nodes.get(name, empty), self.migrated_nodes.get(name, empty)))
+        for name, src, dst in rows:
+            lines.append(
+                f"| {name} | {src.p50:.2f} | {dst.p50:.2f} | {src.p90:.2f} | {dst.p90:.2f} | "
+                f"{src.count}/{dst.count} |"
+            )
+
+        if self.failed:
+            lines.extend(["", "## 运行错误", ""])
+            if self.source_error:
+                lines.append(f"- LangGraph: {self.source_error}")
+            if self.migrated_error:
+                lines.append(f"- openJiuwen: {self.migrated_error}")
+
+        if self.mismatches:
+            lines.extend(["", "## 输出差异", ""])
+            for key, (src, dst) in self.mismatches.items():
+                lines.append(f"- `{key}`: LangGraph={src!r}, openJiuwen={dst!r}")
+
+        if self.source_only or self.migrated_only:
+            lines.extend(["", "## 单侧字段", ""])
+            if self.source_only:
+                lines.append(f"- 仅 LangGraph 输出: {', '.join(f'`{key}`' for key in self.source_only)}")
+            if self.migrated_only:
+                lines.append(f"- 仅 openJiuwen 输出: {', '.join(f'`{key}`' for key in self.migrated_only)}")
+        return "\n".join(lines)
+
+    def _node_names(self) -> List[str]:
+        names = list(self.source_nodes)
+        names.extend(name for name in self.migrated_nodes if name not in self.source_nodes)
+        return names
+
+
+# ---------------------------------------------------------------------------
+# 离线运行
+# ---------------------------------------------------------------------------
+
+@contextlib.contextmanager
+def offline() -> Iterator[None]:
+    """禁止 TCP/UDP 网络访问（unix socket 不受影响），工具中的网络请求立即失败"""
+    original_connect = socket.socket.connect
+    original_getaddrinfo = socket.getaddrinfo
+
+    def connect(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            raise OSError("network disabled during benchmark")
+        return original_connect(sock, address)
+
+    def getaddrinfo(*args, **kwargs):
+        raise socket.gaierror("network disabled during benchmark")
+
+    socket.socket.connect = connect
+    socket.getaddrinfo = getaddrinfo
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+        socket.getaddrinfo = original_getaddrinfo
+
+
+@contextlib.contextmanager
+def _isolated_imports(root: str) -> Iterator[None]:
+    """
+    临时把项目加入导入路径
+
+    退出时移除项目内的模块，源项目与迁移后项目的同名模块（如 agent）互不干扰
+    """
+    root = os.path.realpath(root)
+    saved_path = list(sys.path)
+    saved_modules = set(sys.modules)
+    try:
+        yield
+    finally:
+        sys.path[:] = saved_path
+        for name in set(sys.modules) - saved_modules:
+            module_file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.realpath(module_file).startswith(root + os.sep):
+                del sys.modules[name]
+
+
+def _load_modules(path: str) -> List[Any]:
+    """
+    导入项目中的所有模块
+
+    - 单个文件：以文件所在目录为导入路径
+    - 包目录（含 __init__.py）：以上级目录为导入路径，导入包内全部子模块
+    - 普通目录：目录内的每个文件作为顶层模块导入
+    """
+    path = os.path.realpath(path)
+    if os.path.isfile(path):
+        sys.path.insert(0, os.path.dirname(path))
+        return [importlib.import_module(os.path.splitext(os.path.basename(path))[0])]
+
+    # 包目录的模块名带包名前缀
+    base = os.path.dirname(path) if os.path.exists(os.path.join(path, "__init__.py")) else path
+    sys.path.insert(0, base)
+
+    modules = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+        for filename in sorted(filenames):
+            if not filename.endswith(".py"):
+                continue
+            rel = os.path.relpath(os.path.join(dirpath, filename), base)[:-3]
+            parts = [p for p in rel.split(os.sep) if p != "__init__"]
+            if not parts:
+                continue
+            modules.append(importlib.import_module(".".join(parts)))
+    return modules
+
+
+def _package_root(path: str) -> str:
+    """项目的导入根目录（退出时据此清理模块）"""
+    path = os.path.realpath(path)
+    return os.path.dirname(path) if os.path.isfile(path) else path
+
+
+def example_inputs(source_path: str) -> Dict[str, Any]:
+    """
+    提取源项目的示例输入
+
+    与生成的 main.py 一致：优先使用 main 块中的示例值，
+    变量占位符没有示例值时使用空字符串
+    """
+    from .components.ast_parser import ASTParserComp
+    from .components.file_loader import FileLoaderComp
+    from .components.project_detector import ProjectDetectorComp
+    from .components.rule_extractor import RuleExtractorComp
+
+    async def extract():
+        data = await ProjectDetectorComp().invoke(
+            inputs={"source_path": source_path}, runtime=None, context=None
+        )
+        for comp in (FileLoaderComp(), ASTParserComp(), RuleExtractorComp()):
+            data = await comp.invoke(inputs=data, runtime=None, context=None)
+        return data["extraction_result"]
+
+    result = asyncio.run(extract())
+    inputs = {}
+    for name, value in result.initial_inputs.items():
+        if name in result.example_inputs:
+            inputs[name] = result.example_inputs[name]
+        elif isinstance(value, str) and value.startswith("${"):
+            inputs[name] = ""
+        else:
+            inputs[name] = value
+    return inputs
+
+
+# ---------------------------------------------------------------------------
+# LangGraph 源项目
+# ---------------------------------------------------------------------------
+
+def _find_graph(modules: List[Any]):
+    """查找编译后的 LangGraph 图（优先使用 app / graph 等常用变量名）"""
+    from langgraph.pregel import Pregel
+
+    candidates = []
+    for module in modules:
+        for name, value in vars(module).items():
+            if isinstance(value, Pregel):
+                candidates.append((name not in GRAPH_VAR_NAMES, name, value))
+    if not candidates:
+        raise BenchmarkError("no compiled LangGraph graph found in source project")
+    return min(candidates, key=lambda c: c[:2])[2]
+
+
+def _replace_langchain_llms(modules: List[Any], llm: StubLLM) -> None:
+    """将模块级 LangChain 聊天模型替换为 StubLLM"""
+    from langchain_core.language_models import BaseLanguageModel
+
+    chat_model = llm.as_langchain()
+    for module in modules:
+        for name, value in list(vars(module).items()):
+            if isinstance(value, BaseLanguageModel):
+                setattr(module, name, chat_model)
+
+
+def _node_timer(nodes: Dict[str, List[float]]):
+    """按 LangGraph 节点统计耗时的回调"""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class NodeTimer(BaseCallbackHandler):
+        def __init__(self):
+            self.started: Dict[Any, Tuple[str, float]] = {}
+
+        def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+            node = (metadata or {}).get("langgraph_node")
+            if node and kwargs.get("name") == node:
+                self.started[run_id] = (node, time.perf_counter())
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._finish(run_id)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._finish(run_id)
+
+        def _finish(self, run_id):
+            started = self.started.pop(run_id, None)
+            if started:
+                nodes.setdefault(started[0], []).append(time.perf_counter() - started[1])
+
+    return NodeTimer()
+
+
+def _run_source(source_path: str, inputs: Dict[str, Any], llm: StubLLM,
+                iterations: int, warmup: int) -> SideResult:
+    with _isolated_imports(_package_root(source_path)):
+        modules = _load_modules(source_path)
+        _replace_langchain_llms(modules, llm)
+        graph = _find_graph(modules)
+
+        for _ in range(warmup):
+            graph.invoke(dict(inputs))
+
+        side = SideResult(output={})
+        config = {"callbacks": [_node_timer(side.nodes)]}
+        for _ in range(iterations):
+            start = time.perf_counter()
+            side.output = graph.invoke(dict(inputs), config=config)
+            side.total.append(time.perf_counter() - start)
+        return side
+
+
+# ---------------------------------------------------------------------------
+# 迁移后的 openJiuwen 项目
+# ---------------------------------------------------------------------------
+
+def _timed_invoke(invoke: Callable, node: str, nodes: Dict[str, List[float]]) -> Callable:
+    @wraps(invoke)
+    async def timed(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await invoke(self, *args, **kwargs)
+        finally:
+            nodes.setdefault(node, []).append(time.perf_counter() - start)
+    return timed
+
+
+def _instrument_migrated(modules: List[Any], llm: StubLLM, nodes: Dict[str, List[float]]) -> Callable:
+    """替换 get_llm()，为组件的 invoke 计时，返回入口 arun"""
+    from openjiuwen.core.runtime.base import ComponentExecutable
+
+    from .components.ir_builder import IRBuilderComp
+
+    arun = None
+    for module in modules:
+        if hasattr(module, "get_llm"):
+            module.get_llm = lambda *args, **kwargs: llm
+        if callable(getattr(module, "arun", None)):
+            arun = module.arun
+        for value in list(vars(module).values()):
+            if (inspect.isclass(value) and issubclass(value, ComponentExecutable)
+                    and value.__module__ == module.__name__ and "invoke" in vars(value)):
+                # 生成的类名为 PascalCase + Comp，还原为节点名
+                class_name = value.__name__
+                node = next(
+                    (n for n in _node_name_candidates(class_name)
+                     if IRBuilderComp()._to_class_name(n) == class_name),
+                    class_name
+                )
+                value.invoke = _timed_invoke(value.invoke, node, nodes)
+
+    if arun is None:
+        raise BenchmarkError("no arun() found in migrated project; regenerate it with this version")
+    return arun
+
+
+def _node_name_candidates(class_name: str) -> List[str]:
+    """由 PascalCase 类名推出 snake_case 节点名"""
+    base = class_name[:-4] if class_name.endswith("Comp") else class_name
+    snake = "".join(f"_{c.lower()}" if c.isupper() else c for c in base).lstrip("_")
+    return [snake, base.lower()]
+
+
+def _run_migrated(migrated_path: str, inputs: Dict[str, Any], llm: StubLLM,
+                  iterations: int, warmup: int) -> SideResult:
+    with _isolated_imports(_package_root(migrated_path)):
+        side = SideResult(output={})
+        recorded: Dict[str, List[float]] = {}
+        arun = _instrument_migrated(_load_modules(migrated_path), llm, recorded)
+
+        async def drive():
+            for _ in range(warmup):
+                await arun(dict(inputs))
+            recorded.clear()
+            for _ in range(iterations):
+                start = time.perf_counter()
+                result = await arun(dict(inputs))
+                side.total.append(time.perf_counter() - start)
+                output = getattr(result, "result", result)
+                if isinstance(output, dict) and isinstance(output.get("output"), dict):
+                    output = output["output"]
+                side.output = output if isinstance(output, dict) else {"output": output}
+
+        asyncio.run(drive())
+        side.nodes = dict(recorded)
+        return side
+
+
+def _migrated_entry(migrated_path: str) -> str:
+    """迁移输出目录中的入口：多文件项目的包目录或单文件代码"""
+    if os.path.isfile(migrated_path):
+        return migrated_path
+    for entry in sorted(os.listdir(migrated_path)):
+        full = os.path.join(migrated_path, entry)
+        if os.path.isdir(full) and os.path.exists(os.path.join(full, "main.py")):
+            return full
+        if entry.endswith(".py"):
+            with open(full, encoding="utf-8") as f:
+                if "def arun(" in f.read():
+                    return full
+    raise BenchmarkError(f"no migrated agent found in {migrated_path}")
+
+
+def _run_side(run: Callable[..., SideResult], path: str, inputs: Dict[str, Any], llm: StubLLM,
+              iterations: int, warmup: int) -> SideResult:
+    """
+    运行一侧；被测代码抛出的异常记录在 SideResult.error，不中断另一侧
+
+    Raises:
+        BenchmarkError: 无法加载被测项目
+    """
+    try:
+        return run(path, inputs, llm, iterations, warmup)
+    except BenchmarkError:
+        raise
+    except Exception as e:
+        frame = traceback.extract_tb(e.__traceback__)[-1]
+        return SideResult(
+            output={},
+            error=f"{type(e).__name__}: {e} ({os.path.basename(frame.filename)}:{frame.lineno})"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 对外接口
+# ---------------------------------------------------------------------------
+
+def compare_outputs(source: Dict[str, Any], migrated: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """
+    返回两侧都输出、但取值不一致的字段
+
+    LangGraph 返回完整的最终状态，迁移后的工作流只输出 End 组件收集的字段，
+    因此只比较两侧共有的字段；没有共有字段时由 BenchmarkReport.comparable 判定为不可比较
+    """
+    return {
+        key: (value, migrated[key])
+        for key, value in source.items()
+        if key in migrated and migrated[key] != value
+    }
+
+
+def run_benchmark(
+    source_path: str,
+    migrated_path: str,
+    iterations: int = 20,
+    warmup: int = 2,
+    llm: Optional[StubLLM] = None,
+    inputs: Optional[Dict[str, Any]] = None
+) -> BenchmarkReport:
+    """
+    对比源项目与迁移后项目的延迟和输出
+
+    Args:
+        source_path: LangGraph 源文件或项目目录
+        migrated_path: 迁移输出目录（或生成的单文件）
+        iterations: 计时的运行次数
+        warmup: 不计时的预热次数
+        llm: 两侧共用的 LLM 替身，默认使用 StubLLM()
+        inputs: 输入，默认使用从源代码提取的示例输入
+
+    运行时异常不会抛出，记录在 BenchmarkReport.source_error / migrated_error
+
+    Raises:
+        BenchmarkError: 无法加载被测项目
+    """
+    llm = llm or StubLLM()
+    inputs = example_inputs(source_path) if inputs is None else inputs
+    migrated_entry = _migrated_entry(migrated_path)
+
+    with offline():
+        source = _run_side(_run_source, source_path, inputs, llm, iterations, warmup)
+        migrated = _run_side(_run_migrated, migrated_entry, inputs, llm, iterations, warmup)
+
+    return BenchmarkReport(
+        inputs=inputs,
+        compared=[key for key in source.output if key in migrated.output],
+        source_only=[key for key in source.output if key not in migrated.output],
+        migrated_only=[key for key in migrated.output if key not in source.output],
+        iterations=iterations,
+        source_total=LatencyStats.from_samples(source.total),
+        migrated_total=LatencyStats.from_samples(migrated.total),
+        source_nodes={name: LatencyStats.from_samples(s) for name, s in source.nodes.items()},
+        migrated_nodes={name: LatencyStats.from_samples(s) for name, s in migrated.nodes.items()},
+        mismatches=compare_outputs(source.output, migrated.output),
+        source_error=source.error,
+        migrated_error=migrated.error,
+    )
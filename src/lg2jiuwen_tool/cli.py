@@ -7,18 +7,23 @@ LG2Jiuwen 命令行接口
 Usage:
     python -m lg2jiuwen_tool <source> [options]
     lg2jiuwen <source> [options]
+    lg2jiuwen watch <source> [options]
+    lg2jiuwen bench <source> <migrated> [options]
 
 Examples:
     lg2jiuwen my_agent.py
     lg2jiuwen my_agent.py -o ./output
     lg2jiuwen ./my_project/ -o ./output --use-ai
+    lg2jiuwen watch ./my_project/ -o ./output
+    lg2jiuwen bench ./my_project/ ./output
 """
 
 import argparse
 import sys
 from pathlib import Path
 
-from .service import migrate_new, MigrationOptions, MigrationResult
+from . import __version__
+from .service import migrate_async, MigrationOptions, MigrationResult
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -33,7 +38,11 @@ def create_parser() -> argparse.ArgumentParser:
   %(prog)s agent.py -o ./output        迁移到指定目录
   %(prog)s ./project/ -o ./output      迁移整个项目
   %(prog)s agent.py --use-ai           启用 AI 处理未识别代码
+  LG2JIUWEN_STUB_LLM=1 %(prog)s agent.py --use-ai  使用本地 LLM 替身离线运行 AI 阶段
   %(prog)s agent.py --no-report        不生成迁移报告
+  %(prog)s agent.py --no-report --no-ir  只生成代码（批量迁移）
+  %(prog)s watch ./project/ -o ./output  监听源码变化并自动迁移
+  %(prog)s bench ./project/ ./output     对比迁移前后的延迟（离线）
 
 更多信息请访问: https://github.com/openjiuwen/lg2jiuwen
         """
@@ -58,18 +67,92 @@ def create_parser() -> argparse.ArgumentParser:
         help="启用 AI 处理规则无法转换的代码"
     )
 
+    parser.add_argument(
+        "--ai-batch-tokens",
+        type=int,
+        default=0,
+        metavar="N",
+        help="将多个待处理项合并为一次 AI 请求，每次请求的 token 预算 (默认: 0，逐项请求)"
+    )
+
+    parser.add_argument(
+        "--ai-hybrid",
+        action="store_true",
+        help="保留规则已转换的语句，只把规则无法转换的语句交给 AI"
+    )
+
+    parser.add_argument(
+        "--ai-prompt-tokens",
+        type=int,
+        default=0,
+        metavar="N",
+        help="每次 AI 请求的提示词 token 预算，超出时只发送规则无法转换的语句 (默认: 0，不限)"
+    )
+
+    parser.add_argument(
+        "--ai-models",
+        type=lambda value: [m.strip() for m in value.split(",") if m.strip()],
+        default=None,
+        metavar="M1,M2",
+        help="AI 模型分级，按从快到慢排列；结果无法解析或字段不一致时升级到下一级 (默认: gpt-4)"
+    )
+
+    parser.add_argument(
+        "--ai-pipeline",
+        action="store_true",
+        help="待处理项一生成即派发给 AI，与后续文件的提取重叠（不与 --ai-batch-tokens 合并请求）"
+    )
+
+    parser.add_argument(
+        "--ai-concurrency",
+        type=int,
+        default=4,
+        metavar="N",
+        help="同时进行的 AI 请求数上限，流水线模式下派发的请求同样受限 (默认: 4)"
+    )
+
     parser.add_argument(
         "--no-report",
         action="store_true",
         help="不生成迁移报告"
     )
 
+    parser.add_argument(
+        "--no-ir",
+        action="store_true",
+        help="不写出 IR JSON 文件"
+    )
+
     parser.add_argument(
         "--no-comments",
         action="store_true",
         help="不保留原始注释"
     )
 
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="逐文件流式提取，降低大型项目的内存占用"
+    )
+
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="读取、解析与符号扫描 / 提取以有界队列流水线方式重叠执行"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="记录各阶段的 CPU 和内存分析数据，写入输出目录的 profile/ 下"
+    )
+
+    parser.add_argument(
+        "--rule-stats",
+        action="store_true",
+        help="统计每条转换规则的匹配、命中、失败和耗时（写入报告）"
+    )
+
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -79,12 +162,164 @@ def create_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--version",
         action="version",
-        version="%(prog)s 1.0.0"
+        version=f"%(prog)s {__version__}"
     )
 
     return parser
 
 
+def create_watch_parser() -> argparse.ArgumentParser:
+    """创建 watch 子命令参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="lg2jiuwen watch",
+        description="监听源码变化，在常驻进程中自动重新迁移"
+    )
+
+    parser.add_argument(
+        "source",
+        type=str,
+        help="源文件或目录路径"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        type=str,
+        default="./output",
+        help="输出目录 (默认: ./output)"
+    )
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="轮询间隔秒数 (默认: 0.2)"
+    )
+
+    parser.add_argument(
+        "--no-report",
+        action="store_true",
+        help="不生成迁移报告"
+    )
+
+    parser.add_argument(
+        "--no-ir",
+        action="store_true",
+        help="不写出 IR JSON 文件"
+    )
+
+    return parser
+
+
+def watch_main(args) -> int:
+    """watch 子命令入口"""
+    parsed = create_watch_parser().parse_args(args)
+
+    source_path = Path(parsed.source)
+    if not source_path.exists():
+        print(f"错误: 源路径不存在: {source_path}", file=sys.stderr)
+        return 1
+
+    from .watch import watch
+
+    options = MigrationOptions(
+        use_ai=False,
+        include_report=not parsed.no_report,
+        include_ir=not parsed.no_ir
+    )
+    watch(str(source_path), parsed.output, options, interval=parsed.interval)
+    return 0
+
+
+def create_bench_parser() -> argparse.ArgumentParser:
+    """创建 bench 子命令参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="lg2jiuwen bench",
+        description="使用本地 LLM 替身离线对比源项目与迁移后项目的输出和延迟",
+        epilog="退出码: 0 输出一致，1 无法加载或运行被测项目，2 输出不一致，3 两侧没有可比较的输出字段"
+    )
+
+    parser.add_argument(
+        "source",
+        type=str,
+        help="LangGraph 源文件或目录路径"
+    )
+
+    parser.add_argument(
+        "migrated",
+        type=str,
+        help="迁移输出目录"
+    )
+
+    parser.add_argument(
+        "-n", "--iterations",
+        type=int,
+        default=20,
+        help="计时运行次数 (默认: 20)"
+    )
+
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=2,
+        help="预热运行次数 (默认: 2)"
+    )
+
+    parser.add_argument(
+        "--responses",
+        type=str,
+        help="LLM 响应文件（JSON: {提示词哈希: 响应}）"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="以 JSON 格式输出结果"
+    )
+
+    return parser
+
+
+def bench_main(args) -> int:
+    """bench 子命令入口"""
+    parsed = create_bench_parser().parse_args(args)
+
+    for path in (parsed.source, parsed.migrated):
+        if not Path(path).exists():
+            print(f"错误: 路径不存在: {path}", file=sys.stderr)
+            return 1
+
+    import json
+
+    from .benchmark import BenchmarkError, run_benchmark
+    from .stub_llm import StubLLM
+
+    responses = None
+    if parsed.responses:
+        with open(parsed.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+
+    try:
+        report = run_benchmark(
+            parsed.source, parsed.migrated,
+            iterations=parsed.iterations, warmup=parsed.warmup,
+            llm=StubLLM(responses=responses)
+        )
+    except BenchmarkError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+    if parsed.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print(report.to_markdown())
+    if report.failed:
+        return 1
+    if not report.comparable:
+        # 两侧没有共有字段，无法判断迁移是否正确
+        return 3
+    return 0 if report.outputs_match else 2
+
+
 def print_result(result: MigrationResult, verbose: bool = False) -> None:
     """打印迁移结果"""
     if result.success:
@@ -100,6 +335,31 @@ def print_result(result: MigrationResult, verbose: bool = False) -> None:
         print(f"统计:")
         print(f"  - 规则处理: {result.rule_count} 项")
         print(f"  - AI 处理: {result.ai_count} 项")
+        if result.prompt_stats:
+            tokens = [p["tokens"] for p in result.prompt_stats]
+            print(f"  - AI 请求: {len(tokens)} 次，提示词约 {sum(tokens)} tokens（单次最大 {max(tokens)}）")
+            over_budget = [p for p in result.prompt_stats if p.get("over_budget")]
+            if over_budget:
+                print(f"  - 警告: {len(over_budget)} 次 AI 请求的提示词超出 token 预算（--ai-prompt-tokens）")
+        if result.load_errors:
+            print(f"  - 警告: {len(result.load_errors)} 个文件未能读取或解析，未参与迁移:")
+            for error in result.load_errors:
+                print(f"    - {error}")
+
+        if result.rule_stats:
+            failed = result.rule_stats["failed"]
+            if failed:
+                top = sorted(failed.items(), key=lambda item: item[1], reverse=True)
+                print("  - 规则无法转换的语句: " + "，".join(f"{name} {count}" for name, count in top))
+
+        if result.profile:
+            print()
+            print("性能分析:")
+            for stage in result.profile["stages"]:
+                print(f"  - {stage['name']}: {stage['seconds']:.3f}s，"
+                      f"内存峰值 {stage['peak_bytes'] / 1024 / 1024:.1f} MB")
+            for f in result.profile.get("files", []):
+                print(f"  - {f}")
 
         if verbose and result.report:
             print()
@@ -119,6 +379,13 @@ def print_result(result: MigrationResult, verbose: bool = False) -> None:
 
 def main(args=None) -> int:
     """主入口"""
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "watch":
+        return watch_main(args[1:])
+    if args and args[0] == "bench":
+        return bench_main(args[1:])
+
     parser = create_parser()
     parsed = parser.parse_args(args)
 
@@ -135,9 +402,20 @@ def main(args=None) -> int:
     # 创建选项
     options = MigrationOptions(
         use_ai=parsed.use_ai,
+        ai_batch_tokens=parsed.ai_batch_tokens,
+        ai_hybrid=parsed.ai_hybrid,
+        ai_prompt_tokens=parsed.ai_prompt_tokens,
+        ai_models=parsed.ai_models,
+        ai_pipeline=parsed.ai_pipeline,
+        ai_max_concurrency=parsed.ai_concurrency,
         preserve_comments=not parsed.no_comments,
         include_report=not parsed.no_report,
-        verbose=parsed.verbose
+        include_ir=not parsed.no_ir,
+        verbose=parsed.verbose,
+        streaming=parsed.streaming,
+        pipelined=parsed.pipelined,
+        profile=parsed.profile,
+        rule_stats=parsed.rule_stats
     )
 
     # 显示开始信息
@@ -147,13 +425,22 @@ def main(args=None) -> int:
         print(f"使用 AI: {'是' if options.use_ai else '否'}")
         print()
 
-    # 执行迁移
+    # 执行迁移（asyncio 在此处才导入，--help / --version 不需要）
+    import asyncio
+
+    # 设置 LG2JIUWEN_STUB_LLM 时 AI 阶段使用本地 LLM 替身
+    llm = None
+    if options.use_ai:
+        from .stub_llm import StubLLM
+        llm = StubLLM.from_env()
+
     try:
-        result = migrate_new(
+        result = asyncio.run(migrate_async(
             source_path=str(source_path),
             output_dir=parsed.output,
-            options=options
-        )
+            options=options,
+            llm=llm
+        ))
 
         # 显示结果
         print_result(result, verbose=parsed.verbose)
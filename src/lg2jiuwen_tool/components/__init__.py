@@ -4,6 +4,8 @@ from .project_detector import ProjectDetectorComp
 from .file_loader import FileLoaderComp
 from .ast_parser import ASTParserComp
 from .rule_extractor import RuleExtractorComp
+from .streaming_extractor import StreamingExtractorComp
+from .pipelined_extractor import PipelinedExtractorComp
 from .pending_check import PendingCheckComp
 from .ai_semantic import AISemanticComp
 from .ir_builder import IRBuilderComp
@@ -15,6 +17,8 @@ __all__ = [
     "FileLoaderComp",
     "ASTParserComp",
     "RuleExtractorComp",
+    "StreamingExtractorComp",
+    "PipelinedExtractorComp",
     "PendingCheckComp",
     "AISemanticComp",
     "IRBuilderComp",
@@ -4,8 +4,11 @@ AI 语义理解组件
 使用 AI 处理规则无法转换的代码
 """
 
+import ast
+import asyncio
 import re
-from typing import Any, Dict, List, Optional, Tuple
+import textwrap
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from openjiuwen.core.component.base import WorkflowComponent
 from openjiuwen.core.runtime.base import ComponentExecutable, Input, Output
@@ -19,6 +22,26 @@ from ..workflow.state import (
     ExtractionResult,
 )
 from ..rules.base import ConversionResult
+from ..prompt_context import minimal_context
+from ..token_budget import estimate_tokens
+
+
+# 批量请求中每项答案的起始行
+BATCH_ITEM_MARKER = "### ITEM {number}"
+_BATCH_SECTION = re.compile(r"^### ITEM (\d+)[ \t]*$", re.MULTILINE)
+
+# 批量请求中格式说明的 token 开销
+BATCH_OVERHEAD_TOKENS = 80
+
+# 默认模型（只有一级）
+DEFAULT_MODELS = ["gpt-4"]
+
+# 默认的 LLM 并发请求数上限（流水线模式下派发的请求同样受此限制）
+DEFAULT_MAX_CONCURRENCY = 4
+
+# 语句级请求中每段答案的起始行（占位符见 rules.base.STATEMENT_PLACEHOLDER）
+STATEMENT_MARKER = "### {placeholder}"
+_STATEMENT_SECTION = re.compile(r"^### (__AI_STATEMENT_\d+__)[ \t]*$", re.MULTILINE)
 
 
 class AISemanticComp(WorkflowComponent, ComponentExecutable):
@@ -29,10 +52,62 @@ class AISemanticComp(WorkflowComponent, ComponentExecutable):
     1. 只处理 pending_items（规则无法处理的部分）
     2. 为每个 pending_item 调用 AI
     3. 将结果合并回 extraction_result
+
+    batch_tokens > 0 时启用批量模式：同类型的多个待处理项在 token 预算内合并为一次请求，
+    系统提示只发送一次；答案缺失或无法解析的项单独重试
+
+    语句级待处理项（PendingType.STATEMENTS，混合模式）只请求转换失败的语句片段，
+    结果填回规则已转换的函数体，无法得到答案的片段保留 TODO
+
+    提示词只包含待处理代码实际引用的状态字段、工具和局部变量；
+    prompt_tokens > 0 时，超出预算的整函数待处理项改为只发送规则无法转换的语句。
+    每次请求的提示词 token 数记录在 extraction_result.prompt_stats，
+    精简后仍超出预算的请求标记 over_budget
+
+    models 按从快到慢的顺序列出模型：先用第一级模型转换，结果无法解析，
+    或读写的字段与原始代码不一致时才升级到下一级，升级记录在 extraction_result.escalations
+
+    流水线模式：把 submit 作为 RuleExtractorComp 的 on_pending，待处理项一生成即派发，
+    与后续文件的提取重叠；invoke 时等待已派发的结果，未派发的项照常转换。
+    同时进行的 LLM 请求不超过 max_concurrency；工作流在 AI 阶段之前失败时，
+    调用 cancel_inflight 取消已派发的任务
     """
 
-    def __init__(self, llm=None):
+    def __init__(
+        self,
+        llm=None,
+        batch_tokens: int = 0,
+        prompt_tokens: int = 0,
+        models: Optional[List[str]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    ):
         self._llm = llm
+        self._batch_tokens = batch_tokens
+        self._prompt_tokens = prompt_tokens
+        self._models = list(models or DEFAULT_MODELS)
+        self._max_concurrency = max(1, max_concurrency)
+        # 并发上限的信号量与其所属的事件循环（组件可能在多个事件循环中使用）
+        self._limit: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+        self._prompt_stats: List[Dict[str, Any]] = []
+        self._escalations: List[Dict[str, Any]] = []
+        # 精简后提示词仍超出预算的待处理项 id
+        self._over_budget: Set[str] = set()
+        # 已派发的待处理项: {item.id: (精简后的待处理项, 转换任务)}
+        self._inflight: Dict[str, Tuple[PendingItem, "asyncio.Future[ConversionResult]"]] = {}
+
+    def submit(self, item: PendingItem, extraction_result: ExtractionResult):
+        """立即派发一个待处理项（需在事件循环中调用），结果在 invoke 时汇合"""
+        prepared = self._prepare(item, self._tool_vars(extraction_result))
+        self._inflight[item.id] = (prepared, asyncio.ensure_future(self._convert_with_ai(prepared)))
+
+    async def cancel_inflight(self):
+        """取消尚未汇合的派发任务并等待其结束（工作流未到达 AI 阶段时调用）"""
+        inflight, self._inflight = self._inflight, {}
+        tasks = [task for _, task in inflight.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._prompt_stats, self._escalations, self._over_budget = [], [], set()
 
     async def invoke(
         self,
@@ -46,23 +121,40 @@ class AISemanticComp(WorkflowComponent, ComponentExecutable):
         if extraction_result is None:
             raise ValueError("无法获取 extraction_result")
 
-        pending_items = extraction_result.pending_items
-
-        if not pending_items:
+        if not extraction_result.pending_items:
             return {"extraction_result": extraction_result}
 
-        # 处理每个 pending_item
-        for item in pending_items:
-            converted = await self._convert_with_ai(item)
+        # 精简上下文，控制提示词大小；已派发的项直接使用派发时的结果
+        tool_vars = self._tool_vars(extraction_result)
+        inflight, self._inflight = self._inflight, {}
+        pending_items, tasks = [], []
+        for item in extraction_result.pending_items:
+            prepared, task = inflight.pop(item.id, (None, None))
+            pending_items.append(prepared or self._prepare(item, tool_vars))
+            tasks.append(task)
+        for _, task in inflight.values():
+            task.cancel()
+        await asyncio.gather(*(task for _, task in inflight.values()), return_exceptions=True)
 
+        # 处理每个 pending_item
+        remaining = iter(await self._convert_all(
+            [item for item, task in zip(pending_items, tasks) if task is None]
+        ))
+        results = [await task if task is not None else next(remaining) for task in tasks]
+        extraction_result.prompt_stats.extend(self._prompt_stats)
+        extraction_result.escalations.extend(self._escalations)
+        self._prompt_stats, self._escalations, self._over_budget = [], [], set()
+        for item, converted in zip(pending_items, results):
             # 将转换结果添加到 nodes
+            hybrid = item.pending_type == PendingType.STATEMENTS
             extraction_result.nodes.append(ConvertedNode(
                 name=self._extract_name(item.id),
-                original_code=item.source_code,
+                original_code=item.context["original_code"] if hybrid else item.source_code,
                 converted_body=converted.code,
                 inputs=converted.inputs,
                 outputs=converted.outputs,
-                conversion_source="ai"
+                conversion_source="hybrid" if hybrid else "ai",
+                docstring=item.context.get("docstring")
             ))
             extraction_result.ai_count += 1
 
@@ -71,6 +163,54 @@ class AISemanticComp(WorkflowComponent, ComponentExecutable):
 
         return {"extraction_result": extraction_result}
 
+    def _tool_vars(self, extraction_result: ExtractionResult) -> List[str]:
+        """
+        工具映射等工具相关的全局变量名
+
+        流水线模式下提取尚未结束，全局变量还未分类，同时检查引用了工具名的全局变量
+        """
+        names = [extraction_result.tool_map_var_name] if extraction_result.tool_map_var_name else []
+        tool_names = [t.name for t in extraction_result.tools]
+        for var in extraction_result.tool_related_vars + extraction_result.global_vars:
+            match = re.match(r"(\w+)\s*=", var)
+            if not match:
+                continue
+            if var in extraction_result.tool_related_vars or any(
+                re.search(rf"\b{re.escape(name)}\b", var[match.end():]) for name in tool_names
+            ):
+                names.append(match.group(1))
+        return names
+
+    def _prepare(self, item: PendingItem, tool_vars: List[str]) -> PendingItem:
+        """
+        只保留待处理代码引用的上下文；整函数的提示词超出预算时，
+        改用提取器准备的语句级待处理项（规则已转换的语句不再发送）。
+        两者都超出预算时仍发送较小的一个，并记录到 _over_budget
+        """
+        item.context.update(minimal_context(item.source_code, item.context, tool_vars))
+
+        if self._prompt_tokens <= 0:
+            return item
+        cost = self._prompt_cost(item)
+        if cost <= self._prompt_tokens:
+            return item
+
+        statements = item.context.get("statements")
+        if statements is not None:
+            statements.context.update(minimal_context(statements.source_code, statements.context, tool_vars))
+            statements_cost = self._prompt_cost(statements)
+            if statements_cost < cost:
+                item, cost = statements, statements_cost
+        if cost > self._prompt_tokens:
+            self._over_budget.add(item.id)
+        return item
+
+    def _prompt_cost(self, item: PendingItem) -> int:
+        """单项请求的提示词 token 数（系统提示 + 用户提示）"""
+        return estimate_tokens(self._get_system_prompt(item.pending_type)) + estimate_tokens(
+            self._build_user_prompt(item)
+        )
+
     def _extract_name(self, item_id: str) -> str:
         """从 item_id 提取名称"""
         # item_id 格式: "file.py:func_name"
@@ -78,8 +218,23 @@ class AISemanticComp(WorkflowComponent, ComponentExecutable):
             return item_id.split(":")[-1]
         return item_id
 
-    async def _convert_with_ai(self, item: PendingItem) -> ConversionResult:
-        """调用 AI 转换代码"""
+    async def _convert_with_ai(
+        self,
+        item: PendingItem,
+        start_tier: int = 0,
+        problem: Optional[str] = None
+    ) -> ConversionResult:
+        """
+        调用 AI 转换代码
+
+        Args:
+            item: 待处理项
+            start_tier: 从第几级模型开始请求（批量答案未通过检查时从下一级开始）
+            problem: 上一级模型答案的问题，记录为升级原因
+        """
+        if item.pending_type == PendingType.STATEMENTS:
+            return await self._convert_statements(item)
+
         if self._llm is None:
             # 如果没有 LLM，返回占位符
             return self._fallback_conversion(item)
@@ -87,24 +242,293 @@ class AISemanticComp(WorkflowComponent, ComponentExecutable):
         system_prompt = self._get_system_prompt(item.pending_type)
         user_prompt = self._build_user_prompt(item)
 
+        code = None
+        for tier in range(start_tier, len(self._models)):
+            model = self._models[tier]
+            if tier:
+                self._escalate(item, self._models[tier - 1], model, problem)
+            try:
+                code = self._extract_code(await self._request(system_prompt, user_prompt, [item.id], model))
+            except Exception as e:
+                code, problem = None, str(e)
+                continue
+            problem = self._check_result(code, item.source_code, item.context.get("state_fields"))
+            if problem is None:
+                break
+
+        # 最后一级模型的结果只要能解析就采用
+        if code is None or not self._is_valid_code(code):
+            return self._fallback_conversion(item, problem)
+
+        inputs, outputs = self._analyze_io(code)
+        return ConversionResult.success_result(
+            code=code,
+            inputs=inputs,
+            outputs=outputs
+        )
+
+    def _escalate(self, item: PendingItem, from_model: str, to_model: str, reason: Optional[str]):
+        """记录一次模型升级"""
+        self._escalations.append({"item": item.id, "from": from_model, "to": to_model, "reason": reason})
+
+    def _check_result(self, code: str, source_code: str, state_fields: Optional[List[str]]) -> Optional[str]:
+        """
+        校验 AI 结果：能否解析，读写的字段是否与原始代码一致
+
+        Returns:
+            不通过的原因，通过时返回 None
+        """
+        if not self._is_valid_code(code):
+            return "代码无法解析"
+
+        inputs, outputs = self._analyze_io(code)
+        unknown = [name for name in inputs if state_fields and name not in state_fields]
+        if unknown:
+            return f"读取了原始代码未使用的字段 {unknown}"
+
+        produced = set(outputs) | self._assigned_names(code)
+        missing = [key for key in self._expected_outputs(source_code) if key not in produced]
+        if missing:
+            return f"缺少输出字段 {missing}"
+        return None
+
+    def _expected_outputs(self, source_code: str) -> List[str]:
+        """原始代码写入的状态字段：state["x"] = ... 和 return {"x": ...}"""
         try:
+            tree = ast.parse(source_code)
+        except SyntaxError:
+            return []
+
+        keys: List[str] = []
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store)
+                    and isinstance(node.value, ast.Name) and node.value.id in ("state", "State")):
+                candidates = [node.slice]
+            elif isinstance(node, ast.Return) and isinstance(node.value, ast.Dict):
+                candidates = node.value.keys
+            else:
+                continue
+            for key in candidates:
+                if isinstance(key, ast.Constant) and isinstance(key.value, str) and key.value not in keys:
+                    keys.append(key.value)
+        return keys
+
+    def _assigned_names(self, code: str) -> Set[str]:
+        """代码中赋值的变量名"""
+        tree = ast.parse("async def _body():\n" + textwrap.indent(code, "    "))
+        return {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+
+    async def _convert_statements(self, item: PendingItem) -> ConversionResult:
+        """
+        转换语句级待处理项：一次请求转换全部失败片段，填回规则已转换的函数体
+
+        未通过校验的片段升级到下一级模型重新请求，已通过的片段保留
+        """
+        spans: Dict[str, str] = item.context.get("spans", {})
+        state_fields = item.context.get("state_fields")
+        answers: Dict[str, str] = {}
+        candidates: Dict[str, str] = {}
+        error = None
+        if self._llm is not None:
+            system_prompt = self._get_system_prompt(item.pending_type)
+            user_prompt = self._build_user_prompt(item)
+            problem = None
+            for tier, model in enumerate(self._models):
+                if tier:
+                    self._escalate(item, self._models[tier - 1], model, problem)
+                try:
+                    response = await self._request(system_prompt, user_prompt, [item.id], model)
+                except Exception as e:
+                    problem = error = str(e)
+                    continue
+
+                received = self._split_statements_response(response, spans)
+                problems = []
+                for placeholder, source in spans.items():
+                    if placeholder in answers:
+                        continue
+                    code = received.get(placeholder)
+                    reason = "缺少答案" if code is None else self._check_result(code, source, state_fields)
+                    if reason is None:
+                        answers[placeholder] = code
+                    else:
+                        problems.append(f"{placeholder}: {reason}")
+                        if code is not None:
+                            candidates[placeholder] = code
+                if not problems:
+                    break
+                problem = "; ".join(problems)
+
+            # 最后一级模型仍未通过一致性校验的片段，只要能解析就采用
+            for placeholder, code in candidates.items():
+                answers.setdefault(placeholder, code)
+
+        lines = []
+        for line in item.context.get("partial_body", "").split("\n"):
+            if line in spans:
+                lines.append(answers.get(line) or self._fallback_code(spans[line], error))
+            else:
+                lines.append(line)
+
+        inputs, outputs = self._analyze_io("\n".join(answers.values()))
+        return ConversionResult.success_result(
+            code="\n".join(lines),
+            inputs=list(dict.fromkeys(item.context.get("inputs", []) + inputs)),
+            outputs=list(dict.fromkeys(item.context.get("outputs", []) + outputs))
+        )
+
+    def _split_statements_response(self, response: str, spans: Dict[str, str]) -> Dict[str, str]:
+        """按占位符拆分语句级响应，返回 {占位符: 代码}，只保留能解析的答案"""
+        parts = _STATEMENT_SECTION.split(response)
+        if len(parts) == 1 and len(spans) == 1:
+            # 只有一段时允许省略分隔行
+            parts = ["", next(iter(spans)), response]
+
+        answers = {}
+        for placeholder, body in zip(parts[1::2], parts[2::2]):
+            if placeholder not in spans or placeholder in answers:
+                continue
+            code = self._extract_code(body)
+            if self._is_valid_code(code):
+                answers[placeholder] = code
+        return answers
+
+    async def _request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        item_ids: List[str],
+        model: Optional[str] = None
+    ) -> str:
+        """发送一次 LLM 请求（默认使用第一级模型），返回响应文本，并记录提示词 token 数"""
+        model = model or self._models[0]
+        self._prompt_stats.append({
+            "items": item_ids,
+            "model": model,
+            "tokens": estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+            "over_budget": any(item_id in self._over_budget for item_id in item_ids),
+        })
+        async with self._semaphore():
             response = await self._llm.ainvoke(
-                model_name="gpt-4",
+                model_name=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ]
             )
-            code = self._extract_code(response.content)
-            inputs, outputs = self._analyze_io(code)
+        return response.content
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """当前事件循环的并发上限信号量"""
+        loop = asyncio.get_running_loop()
+        if self._limit is None or self._limit[0] is not loop:
+            self._limit = (loop, asyncio.Semaphore(self._max_concurrency))
+        return self._limit[1]
+
+    async def _convert_all(self, items: List[PendingItem]) -> List[ConversionResult]:
+        """转换全部待处理项，结果与 items 一一对应"""
+        if self._llm is None or self._batch_tokens <= 0:
+            return [await self._convert_with_ai(item) for item in items]
+
+        results: List[Optional[ConversionResult]] = [None] * len(items)
+        for batch in self._plan_batches(items):
+            converted = await self._convert_batch([items[i] for i in batch])
+            for index, result in zip(batch, converted):
+                results[index] = result
+        return results
+
+    def _plan_batches(self, items: List[PendingItem]) -> List[List[int]]:
+        """
+        按待处理类型分组（系统提示相同），在 token 预算内依次打包
 
-            return ConversionResult.success_result(
-                code=code,
-                inputs=inputs,
-                outputs=outputs
+        Returns:
+            每批待处理项在 items 中的下标；超出预算的单项独占一批
+        """
+        groups: Dict[PendingType, List[int]] = {}
+        for index, item in enumerate(items):
+            groups.setdefault(item.pending_type, []).append(index)
+
+        # 语句级待处理项的提示和答案格式不同，每项单独请求
+        batches = [[index] for index in groups.pop(PendingType.STATEMENTS, [])]
+        for pending_type, indices in groups.items():
+            overhead = estimate_tokens(self._get_system_prompt(pending_type)) + BATCH_OVERHEAD_TOKENS
+            batch, used = [], overhead
+            for index in indices:
+                cost = estimate_tokens(self._build_user_prompt(items[index]))
+                if batch and used + cost > self._batch_tokens:
+                    batches.append(batch)
+                    batch, used = [], overhead
+                batch.append(index)
+                used += cost
+            if batch:
+                batches.append(batch)
+        return batches
+
+    async def _convert_batch(self, items: List[PendingItem]) -> List[ConversionResult]:
+        """一次请求转换多个同类型的待处理项，答案缺失或无效的项单独重试"""
+        if len(items) == 1:
+            return [await self._convert_with_ai(items[0])]
+
+        try:
+            response = await self._request(
+                self._get_system_prompt(items[0].pending_type), self._build_batch_prompt(items),
+                [item.id for item in items]
             )
-        except Exception as e:
-            return self._fallback_conversion(item, str(e))
+            answers = self._split_batch_response(response, len(items))
+        except Exception:
+            answers = {}
+
+        results = []
+        for number, item in enumerate(items, 1):
+            code = answers.get(number)
+            if code is None:
+                # 答案缺失（请求失败或格式不符）与模型能力无关，单独从第一级重试
+                results.append(await self._convert_with_ai(item))
+                continue
+            problem = self._check_result(code, item.source_code, item.context.get("state_fields"))
+            if problem:
+                # 批量模型的答案未通过检查，从下一级模型开始单独重试（只有一级时仍用该模型重试）
+                start_tier = min(1, len(self._models) - 1)
+                results.append(await self._convert_with_ai(item, start_tier=start_tier, problem=problem))
+                continue
+            inputs, outputs = self._analyze_io(code)
+            results.append(ConversionResult.success_result(code=code, inputs=inputs, outputs=outputs))
+        return results
+
+    def _build_batch_prompt(self, items: List[PendingItem]) -> str:
+        """构建批量请求的用户提示"""
+        marker = BATCH_ITEM_MARKER.format(number="<编号>")
+        sections = [
+            f"以下是 {len(items)} 段待转换的代码，请分别转换。\n"
+            f"每段答案以单独一行 \"{marker}\" 开头，后接该段转换后的代码块，不要输出其他内容。"
+        ]
+        for number, item in enumerate(items, 1):
+            sections.append(f"{BATCH_ITEM_MARKER.format(number=number)}\n{self._build_user_prompt(item)}")
+        return "\n\n".join(sections)
+
+    def _split_batch_response(self, response: str, count: int) -> Dict[int, str]:
+        """按分隔行拆分批量响应，返回 {编号: 代码}，只保留能解析的答案"""
+        parts = _BATCH_SECTION.split(response)
+        answers = {}
+        # parts: [前缀, 编号1, 内容1, 编号2, 内容2, ...]
+        for number, body in zip(parts[1::2], parts[2::2]):
+            number = int(number)
+            if not 1 <= number <= count or number in answers:
+                continue
+            code = self._extract_code(body)
+            if self._is_valid_code(code):
+                answers[number] = code
+        return answers
+
+    def _is_valid_code(self, code: str) -> bool:
+        """检查代码能否作为函数体解析"""
+        if not code:
+            return False
+        try:
+            ast.parse("async def _body():\n" + textwrap.indent(code, "    "))
+        except SyntaxError:
+            return False
+        return True
 
     def _get_system_prompt(self, pending_type: PendingType) -> str:
         """获取系统提示"""
@@ -115,6 +539,7 @@ openJiuwen 组件规范：
 - 输入访问: inputs["field_name"]
 - 输出返回: return {"field": value}
 - LLM调用: await self._llm.ainvoke(model_name=self.model_name, messages=[...])
+- 工具调用: await invoke_tool(tool_name, arg) 或 await call_tool(tool, {"param": value})
 
 只输出转换后的代码，不要解释。"""
 
@@ -126,11 +551,22 @@ openJiuwen 组件规范：
 - 状态访问: runtime.get_global_state('node_name.field_name')
 - 返回值是目标节点名字符串
 - END 转换为 "end"
+"""
+        elif pending_type == PendingType.STATEMENTS:
+            marker = STATEMENT_MARKER.format(placeholder="<占位符>")
+            base += f"""
+
+语句转换规范：
+- 函数的其余语句已转换，只转换给出的语句片段，不要输出完整函数
+- 每段答案以单独一行 "{marker}" 开头，后接该段转换后的代码块
 """
         return base
 
     def _build_user_prompt(self, item: PendingItem) -> str:
         """构建用户提示"""
+        if item.pending_type == PendingType.STATEMENTS:
+            return self._build_statements_prompt(item)
+
         return f"""
 ## 上下文
 - 状态字段: {item.context.get('state_fields', [])}
@@ -141,6 +577,26 @@ openJiuwen 组件规范：
 {item.source_code}
 ```
 
+## 问题
+{item.question}
+"""
+
+    def _build_statements_prompt(self, item: PendingItem) -> str:
+        """构建语句级用户提示：只包含失败的语句片段和精简的上下文"""
+        sections = "\n\n".join(
+            f"{STATEMENT_MARKER.format(placeholder=placeholder)}\n```python\n{code}\n```"
+            for placeholder, code in item.context.get("spans", {}).items()
+        )
+        return f"""
+## 上下文
+- 函数签名: {item.context.get('signature', '')}
+- 状态字段: {item.context.get('state_fields', [])}
+- 可用工具: {item.context.get('available_tools', [])}
+- 已有局部变量: {item.context.get('local_names', [])}
+
+## 待转换的语句
+{sections}
+
 ## 问题
 {item.question}
 """
@@ -194,14 +650,16 @@ openJiuwen 组件规范：
 
         当 AI 不可用时，生成带 TODO 注释的代码
         """
-        error_comment = f"# AI 转换失败: {error}\n" if error else ""
-        code = f"""{error_comment}# TODO: 需要手动转换以下代码
-# 原始代码:
-# {item.source_code.replace(chr(10), chr(10) + '# ')}
-pass"""
-
         return ConversionResult.success_result(
-            code=code,
+            code=self._fallback_code(item.source_code, error),
             inputs=[],
             outputs=[]
         )
+
+    def _fallback_code(self, source_code: str, error: Optional[str] = None) -> str:
+        """生成带 TODO 注释的占位代码"""
+        error_comment = f"# AI 转换失败: {error}\n" if error else ""
+        return f"""{error_comment}# TODO: 需要手动转换以下代码
+# 原始代码:
+# {source_code.replace(chr(10), chr(10) + '# ')}
+pass"""
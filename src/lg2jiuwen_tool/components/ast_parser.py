@@ -5,7 +5,9 @@ AST 解析组件
 """
 
 import ast
-from typing import Any, Dict, List
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 from openjiuwen.core.component.base import WorkflowComponent
 from openjiuwen.core.runtime.base import ComponentExecutable, Input, Output
@@ -13,6 +15,62 @@ from openjiuwen.core.runtime.runtime import Runtime
 from openjiuwen.core.context_engine.base import Context
 
 
+# AST 缓存的默认容量（文件数）
+AST_CACHE_SIZE = 512
+
+
+class ASTCache:
+    """
+    AST 缓存：(文件路径, 内容摘要) -> AST，超出容量时淘汰最久未使用的树
+
+    只在常驻的监听会话中使用（由 MigrationWatcher 持有并注入解析组件），
+    未修改的文件无需重复解析；普通迁移不缓存，解析后的树随迁移结束释放。
+    提取阶段只读 AST（转换前会深拷贝），因此缓存的树可以安全复用
+    """
+
+    def __init__(self, max_entries: int = AST_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._trees: "OrderedDict[Tuple[str, str], ast.AST]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def parse(self, content: str, filename: str) -> ast.AST:
+        """
+        解析源码，内容未变化时返回缓存的 AST
+
+        Raises:
+            SyntaxError: 源码存在语法错误（不缓存）
+        """
+        key = (filename, hashlib.sha1(content.encode("utf-8", "surrogatepass")).hexdigest())
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+
+        tree = ast.parse(content, filename=filename)
+        self._trees[key] = tree
+        if len(self._trees) > self.max_entries:
+            self._trees.popitem(last=False)
+        return tree
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._trees.clear()
+
+
+def parse_source(content: str, filename: str, cache: Optional[ASTCache] = None) -> ast.AST:
+    """
+    解析源码为 AST，指定 cache 时经缓存解析
+
+    Raises:
+        SyntaxError: 源码存在语法错误
+    """
+    if cache is not None:
+        return cache.parse(content, filename)
+    return ast.parse(content, filename=filename)
+
+
 class ASTParserComp(WorkflowComponent, ComponentExecutable):
     """
     AST 解析组件
@@ -20,8 +78,13 @@ class ASTParserComp(WorkflowComponent, ComponentExecutable):
     功能：
     - 解析每个文件的 AST
     - 返回文件路径到 AST 的映射
+
+    cache 为监听会话的 AST 缓存，未指定时每次都重新解析
     """
 
+    def __init__(self, cache: Optional[ASTCache] = None):
+        self._cache = cache
+
     def _unwrap_value(self, value):
         """解包可能被 openJiuwen 包装的值"""
         if isinstance(value, dict) and "" in value and len(value) == 1:
@@ -65,7 +128,7 @@ class ASTParserComp(WorkflowComponent, ComponentExecutable):
                 parse_errors.append(f"文件内容不是字符串 {file_path}: {type(content)}")
                 continue
             try:
-                tree = ast.parse(content, filename=file_path)
+                tree = parse_source(content, file_path, self._cache)
                 ast_map[file_path] = tree
             except SyntaxError as e:
                 parse_errors.append(
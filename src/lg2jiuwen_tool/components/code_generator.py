@@ -4,10 +4,10 @@
 根据 IR 生成 openJiuwen 代码
 """
 
+import ast
 import json
-import os
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from openjiuwen.core.component.base import WorkflowComponent
 from openjiuwen.core.runtime.base import ComponentExecutable, Input, Output
@@ -15,6 +15,7 @@ from openjiuwen.core.runtime.runtime import Runtime
 from openjiuwen.core.runtime.workflow import WorkflowRuntime
 from openjiuwen.core.context_engine.base import Context
 
+from ..output_sink import DiskSink, OutputSink
 from ..ir.models import (
     AgentIR,
     WorkflowIR,
@@ -25,6 +26,73 @@ from ..ir.models import (
 )
 
 
+# 工具中可替换为共享客户端的模块级 HTTP 调用：{模块名: (方法集合, 共享客户端获取函数)}
+HTTP_POOL_TARGETS = {
+    "httpx": (
+        {"get", "post", "put", "patch", "delete", "head", "options", "request", "stream"},
+        "get_http_client",
+    ),
+    "requests": (
+        {"get", "post", "put", "patch", "delete", "head", "options", "request"},
+        "get_requests_session",
+    ),
+}
+
+# 只有模块级函数支持、客户端方法不支持的参数（出现时保留原调用）
+CLIENT_ONLY_KWARGS = {"verify", "cert", "proxy", "proxies", "trust_env", "transport", "mounts"}
+
+# 生成代码中的异步工具辅助函数（AI 转换的代码可能遗漏 await）
+ASYNC_TOOL_HELPERS = {"invoke_tool", "call_tool"}
+
+
+class _UnawaitedToolCalls(ast.NodeVisitor):
+    """
+    查找组件 invoke 函数体中直接调用、未 await 的工具辅助函数
+
+    不进入嵌套的函数、lambda、类和生成器表达式（其中不能 await）；
+    字符串和注释不是 Call 节点，不受影响
+    """
+
+    def __init__(self):
+        self.calls: List[ast.Call] = []
+        self.primaries: Set[int] = set()     # 作为属性访问、下标或调用对象的节点，await 时需加括号
+
+    def visit_Await(self, node: ast.Await):
+        if _is_tool_helper_call(node.value):
+            # 已 await，只检查其参数
+            self.generic_visit(node.value)
+        else:
+            self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        if _is_tool_helper_call(node):
+            self.calls.append(node)
+        self.primaries.add(id(node.func))
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        self.primaries.add(id(node.value))
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript):
+        self.primaries.add(id(node.value))
+        self.generic_visit(node)
+
+    def _skip_scope(self, node: ast.AST):
+        pass
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_Lambda = visit_ClassDef = visit_GeneratorExp = _skip_scope
+
+
+def _is_tool_helper_call(node: ast.AST) -> bool:
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ASYNC_TOOL_HELPERS
+
+
+def _char_offset(line: str, byte_offset: int) -> int:
+    """AST 列号（utf-8 字节偏移）转为字符偏移"""
+    return len(line.encode("utf-8")[:byte_offset].decode("utf-8"))
+
+
 class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
     """
     代码生成组件
@@ -35,6 +103,15 @@ class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
     - IR 中已包含转换后的代码
     """
 
+    def __init__(self, include_ir: bool = True, sink: Optional[OutputSink] = None):
+        """
+        Args:
+            include_ir: 是否写出 IR 结果文件（{name}_ir.json）
+            sink: 输出目标，默认写入 inputs 中的 output_dir
+        """
+        self._include_ir = include_ir
+        self._sink = sink
+
     async def invoke(
         self,
         inputs: Input,
@@ -52,13 +129,13 @@ class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
         if agent_ir is None or workflow_ir is None:
             raise ValueError("无法获取 agent_ir 或 workflow_ir")
 
-        os.makedirs(output_dir, exist_ok=True)
+        sink = self._sink or DiskSink(output_dir)
         generated_files = []
 
         if is_multi_file:
             # 多文件模式：生成与源目录类似的结构
             generated_files = self._gen_multi_file_output(
-                agent_ir, workflow_ir, migration_ir, output_dir, project_root
+                agent_ir, workflow_ir, migration_ir, sink, project_root
             )
             generated_code = "# 多文件项目，请查看生成的目录结构"
         else:
@@ -95,30 +172,24 @@ class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
             generated_code = "\n\n\n".join(sections)
 
             # 写入生成的代码
-            output_file = os.path.join(output_dir, f"{agent_ir.name.lower()}_openjiuwen.py")
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(generated_code)
-            generated_files.append(output_file)
+            generated_files.append(
+                sink.write(f"{agent_ir.name.lower()}_openjiuwen.py", generated_code)
+            )
 
         # 生成 IR 结果文件
-        ir_file = os.path.join(output_dir, f"{agent_ir.name.lower()}_ir.json")
-        ir_data = self._serialize_ir(agent_ir, workflow_ir, migration_ir)
-        with open(ir_file, "w", encoding="utf-8") as f:
-            json.dump(ir_data, f, ensure_ascii=False, indent=2)
-        generated_files.append(ir_file)
-
-        # 生成迁移报告
-        report = self._gen_report(agent_ir, workflow_ir, migration_ir, generated_files)
-        report_file = os.path.join(output_dir, f"{agent_ir.name.lower()}_report.md")
-        with open(report_file, "w", encoding="utf-8") as f:
-            f.write(report)
-        generated_files.append(report_file)
-
+        if self._include_ir:
+            ir_data = self._serialize_ir(agent_ir, workflow_ir, migration_ir)
+            generated_files.append(sink.write(
+                f"{agent_ir.name.lower()}_ir.json",
+                json.dumps(ir_data, ensure_ascii=False, indent=2)
+            ))
+
+        # 迁移报告由 ReportComp 统一生成，这里只透传统计，供不生成报告时使用
         return {
             "generated_code": generated_code,
             "generated_files": generated_files,
             "output_dir": output_dir,
-            "report": report
+            "stats": migration_ir.conversion_stats if migration_ir else {}
         }
 
     def _gen_multi_file_output(
@@ -126,7 +197,7 @@ class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
         agent_ir: AgentIR,
         workflow_ir: WorkflowIR,
         migration_ir: Optional[MigrationIR],
-        output_dir: str,
+        sink: OutputSink,
         project_root: str
     ) -> List[str]:
         """
@@ -147,13 +218,10 @@ class CodeGeneratorComp(WorkflowComponent, ComponentExecutable):
         generated_files = []
         agent_name = agent_ir.name.lower()
 
-        # 创建目录结构
-        agent_dir = os.path.join(output_dir, agent_name)
-        components_dir = os.path.join(agent_dir, "components")
-        os.makedirs(components_dir, exist_ok=True)
+        def write(path: str, content: str) -> None:
+            generated_files.append(sink.write(f"{agent_name}/{path}", content))
 
         # 1. 生成 __init__.py
-        init_file = os.path.join(agent_dir, "__init__.py")
         init_content = f'''"""
 {agent_ir.name} - 由 LG2Jiuwen 自动迁移生成
 """
@@ -162,27 +230,18 @@ from .workflow import build_{agent_name}_workflow
 
 __all__ = ["build_{agent_name}_workflow"]
 '''
-        with open(init_file, "w", encoding="utf-8") as f:
-            f.write(init_content)
-        generated_files.append(init_file)
+        write("__init__.py", init_content)
 
         # 2. 生成 config.py
-        config_file = os.path.join(agent_dir, "config.py")
         config_content = self._gen_config_file(agent_ir)
-        with open(config_file, "w", encoding="utf-8") as f:
-            f.write(config_content)
-        generated_files.append(config_file)
+        write("config.py", config_content)
 
         # 3. 生成 tools.py
         if agent_ir.tools:
-            tools_file = os.path.join(agent_dir, "tools.py")
             tools_content = self._gen_tools_file(agent_ir)
-            with open(tools_file, "w", encoding="utf-8") as f:
-                f.write(tools_content)
-            generated_files.append(tools_file)
+            write("tools.py", tools_content)
 
         # 4. 生成 components/__init__.py
-        comp_init_file = os.path.join(components_dir, "__init__.py")
         comp_imports = []
         for node in workflow_ir.nodes:
             comp_imports.append(f"from .{node.name}_comp import {node.class_name}")
@@ -194,38 +253,24 @@ __all__ = ["build_{agent_name}_workflow"]
 
 __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
 '''
-        with open(comp_init_file, "w", encoding="utf-8") as f:
-            f.write(comp_init_content)
-        generated_files.append(comp_init_file)
+        write("components/__init__.py", comp_init_content)
 
         # 5. 生成各个组件文件
         for node in workflow_ir.nodes:
-            comp_file = os.path.join(components_dir, f"{node.name}_comp.py")
             comp_content = self._gen_component_file(node, agent_ir)
-            with open(comp_file, "w", encoding="utf-8") as f:
-                f.write(comp_content)
-            generated_files.append(comp_file)
+            write(f"components/{node.name}_comp.py", comp_content)
 
         # 6. 生成 routers.py
-        routers_file = os.path.join(agent_dir, "routers.py")
         routers_content = self._gen_routers_file(workflow_ir, agent_ir)
-        with open(routers_file, "w", encoding="utf-8") as f:
-            f.write(routers_content)
-        generated_files.append(routers_file)
+        write("routers.py", routers_content)
 
         # 7. 生成 workflow.py
-        workflow_file = os.path.join(agent_dir, "workflow.py")
         workflow_content = self._gen_workflow_file(workflow_ir, agent_ir)
-        with open(workflow_file, "w", encoding="utf-8") as f:
-            f.write(workflow_content)
-        generated_files.append(workflow_file)
+        write("workflow.py", workflow_content)
 
         # 8. 生成 main.py
-        main_file = os.path.join(agent_dir, "main.py")
         main_content = self._gen_main_file(agent_ir, workflow_ir)
-        with open(main_file, "w", encoding="utf-8") as f:
-            f.write(main_content)
-        generated_files.append(main_file)
+        write("main.py", main_content)
 
         return generated_files
 
@@ -241,6 +286,7 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
 
         # 添加 LLM 相关导入
         if agent_ir.llm_config:
+            lines.append('import threading')
             lines.append('from openjiuwen.core.utils.llm.model_library.openai import OpenAIChatModel')
 
         lines.append('')
@@ -283,14 +329,161 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
             api_base_var = self._find_var_name(llm_vars, ['API_BASE', 'LLM_API_BASE', 'OPENAI_API_BASE'])
 
             if api_key_var and api_base_var:
-                lines.extend([
-                    'def get_llm():',
-                    '    """获取 LLM 实例"""',
-                    f'    return OpenAIChatModel(api_key={api_key_var}, api_base={api_base_var})',
-                ])
+                if not agent_ir.llm_config:
+                    pos = lines.index('import os') + 1
+                    lines[pos:pos] = [
+                        'import threading',
+                        'from openjiuwen.core.utils.llm.model_library.openai import OpenAIChatModel',
+                    ]
+                lines.append(self._gen_shared_llm(api_key_var, api_base_var))
+
+        # 工具共享的 HTTP 客户端
+        http_libs = self._detect_http_libs(agent_ir)
+        if http_libs:
+            pos = lines.index('import os') + 1
+            extra = [f'import {lib}' for lib in http_libs]
+            if 'import threading' not in lines:
+                extra.insert(0, 'import threading')
+            lines[pos:pos] = extra
+            lines.extend(['', '', self._gen_http_clients(http_libs)])
 
         return '\n'.join(lines)
 
+    def _gen_shared_llm(self, default_api_key: str, default_api_base: str) -> str:
+        """
+        生成进程内共享的 get_llm
+
+        按 (api_key, api_base) 缓存 LLM 实例，所有组件和所有调用复用同一个客户端及其连接池；
+        设置 LG2JIUWEN_STUB_LLM 时返回 lg2jiuwen 的本地 LLM 替身，用于离线基准测试
+        """
+        return f'''_llm_cache = {{}}
+_llm_lock = threading.Lock()
+
+
+def get_llm(api_key=None, api_base=None):
+    """获取共享的 LLM 实例（按配置缓存，首次调用时创建）"""
+    key = (
+        {default_api_key} if api_key is None else api_key,
+        {default_api_base} if api_base is None else api_base,
+    )
+    llm = _llm_cache.get(key)
+    if llm is None:
+        with _llm_lock:
+            llm = _llm_cache.get(key)
+            if llm is None:
+                if os.getenv("LG2JIUWEN_STUB_LLM"):
+                    # 离线基准测试：本地 LLM 替身（需要安装 lg2jiuwen_tool）
+                    from lg2jiuwen_tool.stub_llm import StubLLM
+                    llm = StubLLM.from_env()
+                else:
+                    llm = OpenAIChatModel(api_key=key[0], api_base=key[1])
+                _llm_cache[key] = llm
+    return llm'''
+
+    def _pool_http_calls(self, code: str) -> Tuple[str, Set[str]]:
+        """
+        将 httpx.get(...) / requests.post(...) 等模块级调用替换为共享客户端调用
+
+        Returns:
+            (替换后的代码, 涉及的模块名集合)；代码无法解析时原样返回
+        """
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return code, set()
+
+        replacements = []
+        for node in ast.walk(tree):
+            if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+                continue
+            func = node.func
+            if not isinstance(func.value, ast.Name) or func.value.id not in HTTP_POOL_TARGETS:
+                continue
+            methods, getter = HTTP_POOL_TARGETS[func.value.id]
+            if func.attr not in methods or func.lineno != func.end_lineno:
+                continue
+            if any(kw.arg is None or kw.arg in CLIENT_ONLY_KWARGS for kw in node.keywords):
+                continue
+            replacements.append((func, f"{getter}().{func.attr}", func.value.id))
+
+        if not replacements:
+            return code, set()
+
+        lines = code.split('\n')
+        # 从后往前替换，保持前面的偏移量有效（ast 偏移量为 utf-8 字节偏移）
+        replacements.sort(key=lambda r: (r[0].lineno, r[0].col_offset), reverse=True)
+        for func, new_text, _ in replacements:
+            line = lines[func.lineno - 1].encode('utf-8')
+            lines[func.lineno - 1] = (
+                line[:func.col_offset] + new_text.encode('utf-8') + line[func.end_col_offset:]
+            ).decode('utf-8')
+        return '\n'.join(lines), {lib for _, _, lib in replacements}
+
+    def _detect_http_libs(self, agent_ir: AgentIR) -> List[str]:
+        """工具中使用了哪些可替换为共享客户端的 HTTP 库"""
+        libs = set()
+        for tool in agent_ir.tools:
+            libs |= self._pool_http_calls(tool.converted_body)[1]
+        return sorted(libs)
+
+    def _gen_http_clients(self, http_libs: List[str]) -> str:
+        """生成工具共享的 HTTP 客户端（keep-alive 连接池，限额和超时可通过环境变量配置）"""
+        sections = ['''# HTTP 客户端配置（工具共享连接池）
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+_http_lock = threading.Lock()''']
+
+        if "httpx" in http_libs:
+            sections.append('''_http_client = None
+
+
+def get_http_client():
+    """获取共享的 httpx.Client（首次调用时创建）"""
+    global _http_client
+    if _http_client is None:
+        with _http_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    timeout=HTTP_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    ),
+                )
+    return _http_client''')
+
+        if "requests" in http_libs:
+            sections.append('''class _TimeoutSession(requests.Session):
+    """未指定 timeout 时使用 HTTP_TIMEOUT"""
+
+    def request(self, *args, **kwargs):
+        kwargs.setdefault("timeout", HTTP_TIMEOUT)
+        return super().request(*args, **kwargs)
+
+
+_requests_session = None
+
+
+def get_requests_session():
+    """获取共享的 requests.Session（首次调用时创建）"""
+    global _requests_session
+    if _requests_session is None:
+        with _http_lock:
+            if _requests_session is None:
+                session = _TimeoutSession()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    pool_maxsize=HTTP_MAX_CONNECTIONS,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _requests_session = session
+    return _requests_session''')
+
+        return '\n\n\n'.join(sections)
+
     def _find_var_name(self, var_list: List[str], candidates: List[str]) -> Optional[str]:
         """从变量列表中查找匹配的变量名"""
         for var in var_list:
@@ -339,6 +532,15 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
             '',
         ]
 
+        lines.extend([
+            'import asyncio',
+            'import functools',
+            'import inspect',
+            'import os',
+            'from concurrent.futures import ThreadPoolExecutor',
+            '',
+        ])
+
         # 检查需要的导入
         tool_code = "\n".join(t.converted_body for t in agent_ir.tools)
         if "httpx" in tool_code:
@@ -374,31 +576,88 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
             lines.append(f'{tool_map_name} = {{{tool_entries}}}')
             lines.append('')
 
-        # 添加 invoke_tool 辅助函数
-        lines.extend([
-            '',
-            'def invoke_tool(tool_name: str, arg: str) -> str:',
-            '    """',
-            '    调用工具的辅助函数',
-            '',
-            '    openJiuwen 的 @tool 装饰器返回 LocalFunction，',
-            '    需要通过 .invoke(inputs={param_name: arg}) 调用。',
-            '    此函数自动处理参数名映射。',
-            '    """',
-            f'    tool_func = {tool_map_name}.get(tool_name)',
-            '    if tool_func is None:',
-            '        return f"未知工具: {tool_name}"',
-            '    # 获取工具的第一个参数名',
-            '    if hasattr(tool_func, "params") and tool_func.params:',
-            '        param_name = tool_func.params[0].name',
-            '    else:',
-            '        param_name = "input"',
-            '    return tool_func.invoke(inputs={param_name: arg})',
-            '',
-        ])
+        # 添加 call_tool / invoke_tool 辅助函数
+        lines.extend(['', self._gen_tool_dispatch(tool_map_name), ''])
 
         return '\n'.join(lines)
 
+    def _gen_tool_dispatch(self, tool_map_name: str) -> str:
+        """
+        生成异步工具调度函数
+
+        - call_tool：原生 async def 工具直接 await，同步工具在有界线程池中执行，
+          不阻塞组件所在的事件循环，并发的工作流调用不会在工具调用上串行
+        - invoke_tool：按工具名调用，自动处理参数名映射
+        """
+        return f'''# 同步工具在有界线程池中执行，避免阻塞事件循环
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "16"))
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+
+
+async def call_tool(tool_func, inputs: dict):
+    """
+    调用工具
+
+    openJiuwen 的 @tool 装饰器返回 LocalFunction，
+    原生异步工具通过 .ainvoke() 调用，同步工具的 .invoke() 放到线程池执行。
+    """
+    func = getattr(tool_func, "func", None) or tool_func
+    if inspect.iscoroutinefunction(func):
+        return await tool_func.ainvoke(inputs=inputs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _tool_executor, functools.partial(tool_func.invoke, inputs=inputs)
+    )
+
+
+async def invoke_tool(tool_name: str, arg: str) -> str:
+    """
+    按工具名调用工具的辅助函数
+
+    不同工具的参数名不同，此函数自动使用工具的第一个参数名。
+    """
+    tool_func = {tool_map_name}.get(tool_name)
+    if tool_func is None:
+        return f"未知工具: {{tool_name}}"
+    # 获取工具的第一个参数名
+    if hasattr(tool_func, "params") and tool_func.params:
+        param_name = tool_func.params[0].name
+    else:
+        param_name = "input"
+    return await call_tool(tool_func, {{param_name: arg}})'''
+
+    def _await_tool_calls(self, body_code: str) -> str:
+        """
+        为 invoke 函数体中直接调用、未 await 的 invoke_tool / call_tool 补上 await
+
+        按 AST 定位调用后在原文中插入，保留注释和格式；无法解析的代码原样返回
+        """
+        try:
+            tree = ast.parse(body_code)
+        except SyntaxError:
+            return body_code
+
+        finder = _UnawaitedToolCalls()
+        finder.visit(tree)
+        if not finder.calls:
+            return body_code
+
+        # (行号, 字符偏移, 插入文本)，从后向前插入，前面的偏移不受影响
+        lines = body_code.split("\n")
+        inserts = []
+        for call in finder.calls:
+            start = _char_offset(lines[call.lineno - 1], call.col_offset)
+            if id(call) in finder.primaries:
+                end = _char_offset(lines[call.end_lineno - 1], call.end_col_offset)
+                inserts.append((call.lineno, start, "(await "))
+                inserts.append((call.end_lineno, end, ")"))
+            else:
+                inserts.append((call.lineno, start, "await "))
+        for lineno, offset, text in sorted(inserts, key=lambda insert: insert[:2], reverse=True):
+            line = lines[lineno - 1]
+            lines[lineno - 1] = line[:offset] + text + line[offset:]
+        return "\n".join(lines)
+
     def _gen_component_file(self, node: WorkflowNodeIR, agent_ir: AgentIR) -> str:
         """生成单个组件文件"""
         lines = [
@@ -433,6 +692,8 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
         # 检查是否使用了 invoke_tool（优先检查）
         if 'invoke_tool(' in node.converted_body:
             imports_list.append('invoke_tool')
+        if 'call_tool(' in node.converted_body:
+            imports_list.append('call_tool')
         # 检查是否使用了工具映射变量（使用从源代码提取的变量名）
         tool_map_name = agent_ir.tool_map_var_name or "tool_map"
         if tool_map_name in node.converted_body:
@@ -442,7 +703,7 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
             for tool in agent_ir.tools:
                 func_name = tool.func_name or tool.name.lower()
                 # 检查代码中是否直接调用了该工具函数
-                if func_name + '(' in node.converted_body or func_name + ' ' in node.converted_body:
+                if any(func_name + sep in node.converted_body for sep in ('(', ' ', ',')):
                     if func_name not in imports_list:
                         imports_list.append(func_name)
         if imports_list:
@@ -480,6 +741,7 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
         # 处理组件逻辑代码
         body_code = node.converted_body
         body_code = body_code.replace("__COLLECTED_OUTPUTS__", outputs_dict)
+        body_code = self._await_tool_calls(body_code)
 
         # 将全局状态变量的访问从 inputs.get/inputs[] 转换为 runtime.get_global_state()
         body_code = self._convert_global_state_access(body_code, global_state_keys)
@@ -731,6 +993,7 @@ __all__ = [{", ".join(f'"{n.class_name}"' for n in workflow_ir.nodes)}]
 import asyncio
 import sys
 import os
+import threading
 
 # 支持直接运行
 if __name__ == "__main__":
@@ -741,30 +1004,90 @@ from openjiuwen.core.runtime.workflow import WorkflowRuntime
 from {agent_name}.workflow import build_{agent_name}_workflow
 
 
+{self._gen_runners(agent_name)}
+
+
 async def main():
     """主函数"""
-    workflow = build_{agent_name}_workflow()
-    runtime = WorkflowRuntime()
-
     # 示例输入
     inputs = {{
 {inputs_content}
     }}
 
-    result = await workflow.invoke(inputs, runtime)
+    result = await arun(inputs)
     print("执行结果:", result)
 
 
+if __name__ == "__main__":
+    asyncio.run(main())
+'''
+
+    def _gen_runners(self, agent_name: str) -> str:
+        """
+        生成运行入口：arun / run / arun_batch / run_batch
+
+        工作流只构建一次并缓存复用。同一个 Workflow 实例不能并发执行
+        （图节点保存了单次执行的状态），因此缓存的是空闲实例池：
+        并发调用各自借用一个实例，实例数等于峰值并发数。
+        """
+        return f'''# 批量执行默认并发数
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+# 空闲的工作流实例（同一实例不能并发执行，按峰值并发数构建，之后复用）
+_idle_workflows = []
+_workflows_lock = threading.Lock()
+
+
+def _acquire_workflow():
+    """借用一个空闲的工作流实例，没有时新建"""
+    with _workflows_lock:
+        if _idle_workflows:
+            return _idle_workflows.pop()
+    return build_{agent_name}_workflow()
+
+
+def _release_workflow(workflow) -> None:
+    """归还工作流实例"""
+    with _workflows_lock:
+        _idle_workflows.append(workflow)
+
+
+async def arun(inputs: dict) -> dict:
+    """异步运行 Agent（每次调用使用独立的 WorkflowRuntime）"""
+    workflow = _acquire_workflow()
+    try:
+        return await workflow.invoke(inputs, WorkflowRuntime())
+    finally:
+        _release_workflow(workflow)
+
+
 def run(inputs: dict) -> dict:
     """运行 Agent"""
-    workflow = build_{agent_name}_workflow()
-    runtime = WorkflowRuntime()
-    return asyncio.run(workflow.invoke(inputs, runtime))
+    return asyncio.run(arun(inputs))
 
 
-if __name__ == "__main__":
-    asyncio.run(main())
-'''
+async def arun_batch(inputs_list: list, concurrency: int = BATCH_CONCURRENCY,
+                     return_exceptions: bool = False) -> list:
+    """
+    在当前事件循环中批量运行 Agent，最多 concurrency 个调用同时执行
+
+    结果按输入顺序返回；return_exceptions 为 True 时失败的调用返回异常对象
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(inputs: dict):
+        async with semaphore:
+            return await arun(inputs)
+
+    return await asyncio.gather(
+        *(run_one(inputs) for inputs in inputs_list), return_exceptions=return_exceptions
+    )
+
+
+def run_batch(inputs_list: list, concurrency: int = BATCH_CONCURRENCY,
+              return_exceptions: bool = False) -> list:
+    """批量运行 Agent（在一个事件循环中驱动所有调用）"""
+    return asyncio.run(arun_batch(inputs_list, concurrency, return_exceptions))'''
 
     def _serialize_ir(
         self,
@@ -830,91 +1153,6 @@ if __name__ == "__main__":
             "stats": migration_ir.conversion_stats if migration_ir else {}
         }
 
-    def _gen_report(
-        self,
-        agent_ir: AgentIR,
-        workflow_ir: WorkflowIR,
-        migration_ir: Optional[MigrationIR],
-        generated_files: List[str]
-    ) -> str:
-        """生成迁移报告"""
-        stats = migration_ir.conversion_stats if migration_ir else {}
-
-        report_lines = [
-            "# LG2Jiuwen 迁移报告",
-            "",
-            f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            "",
-            "## 概览",
-            "",
-            f"- **Agent 名称**: {agent_ir.name}",
-            f"- **节点数量**: {len(workflow_ir.nodes)}",
-            f"- **边数量**: {len(workflow_ir.edges)}",
-            f"- **工具数量**: {len(agent_ir.tools)}",
-            "",
-            "## 转换统计",
-            "",
-            "| 指标 | 数量 |",
-            "|------|------|",
-            f"| 规则处理 | {stats.get('rule_count', 0)} |",
-            f"| AI 处理 | {stats.get('ai_count', 0)} |",
-            f"| 总节点数 | {stats.get('total_nodes', len(workflow_ir.nodes))} |",
-            f"| 总边数 | {stats.get('total_edges', len(workflow_ir.edges))} |",
-            f"| 总工具数 | {stats.get('total_tools', len(agent_ir.tools))} |",
-            "",
-            "## 节点详情",
-            "",
-            "| 节点名 | 类名 | 输入 | 输出 | 转换来源 |",
-            "|--------|------|------|------|----------|",
-        ]
-
-        for node in workflow_ir.nodes:
-            inputs_str = ", ".join(node.inputs) if node.inputs else "-"
-            outputs_str = ", ".join(node.outputs) if node.outputs else "-"
-            report_lines.append(
-                f"| {node.name} | {node.class_name} | {inputs_str} | {outputs_str} | {node.conversion_source} |"
-            )
-
-        report_lines.extend([
-            "",
-            "## 边详情",
-            "",
-            "| 源节点 | 目标节点 | 类型 |",
-            "|--------|----------|------|",
-        ])
-
-        for edge in workflow_ir.edges:
-            edge_type = "条件" if edge.is_conditional else "普通"
-            target = edge.target or f"(路由: {edge.router_name})"
-            report_lines.append(f"| {edge.source} | {target} | {edge_type} |")
-
-        if agent_ir.tools:
-            report_lines.extend([
-                "",
-                "## 工具详情",
-                "",
-                "| 工具名 | 描述 |",
-                "|--------|------|",
-            ])
-            for tool in agent_ir.tools:
-                report_lines.append(f"| {tool.name} | {tool.description} |")
-
-        report_lines.extend([
-            "",
-            "## 生成的文件",
-            "",
-        ])
-        for f in generated_files:
-            report_lines.append(f"- `{f}`")
-
-        report_lines.extend([
-            "",
-            "---",
-            "*由 LG2Jiuwen 自动生成*"
-        ])
-
-        return "\n".join(report_lines)
-
     def _gen_imports(self, agent_ir: AgentIR, workflow_ir: WorkflowIR) -> str:
         """生成导入语句"""
         imports = [
@@ -924,6 +1162,7 @@ if __name__ == "__main__":
             '',
             'import os',
             'import asyncio',
+            'import threading',
             'from typing import Any, Dict, List, Optional',
             '',
             'from openjiuwen.core.workflow.base import Workflow',
@@ -943,6 +1182,10 @@ if __name__ == "__main__":
 
         # 如果有工具
         if agent_ir.tools:
+            pos = imports.index('import asyncio') + 1
+            imports[pos:pos] = ['import functools', 'import inspect']
+            imports.insert(imports.index('from typing import Any, Dict, List, Optional'),
+                           'from concurrent.futures import ThreadPoolExecutor')
             imports.append('from openjiuwen.core.utils.tool.param import Param')
             imports.append('from openjiuwen.core.utils.tool.tool import tool')
 
@@ -952,8 +1195,11 @@ if __name__ == "__main__":
         all_code = tool_code + node_code
 
         # 检查并添加常用依赖
+        http_libs = self._detect_http_libs(agent_ir)
         if "httpx" in all_code:
             imports.insert(4, 'import httpx')
+        if "requests" in http_libs:
+            imports.insert(4, 'import requests')
 
         result = '\n'.join(imports)
 
@@ -965,6 +1211,15 @@ if __name__ == "__main__":
             result += '\n\n'
             result += '\n'.join(agent_ir.global_vars)
 
+        # 共享 LLM 客户端
+        if has_llm:
+            api_key, api_base = self._single_file_llm_defaults(agent_ir)
+            result += '\n\n\n' + self._gen_shared_llm(api_key, api_base)
+
+        # 工具共享的 HTTP 客户端
+        if http_libs:
+            result += '\n\n\n' + self._gen_http_clients(http_libs)
+
         return result
 
     def _gen_tool(self, tool: ToolIR) -> str:
@@ -994,6 +1249,9 @@ if __name__ == "__main__":
         params_list = ",\n".join(param_defs) if param_defs else ""
         func_params_str = ", ".join(func_params) if func_params else ""
 
+        # 模块级 HTTP 调用改用共享客户端
+        body, _ = self._pool_http_calls(tool.converted_body)
+
         # 使用新格式生成工具
         if params_list:
             return f'''@tool(
@@ -1005,7 +1263,7 @@ if __name__ == "__main__":
 )
 def {tool.func_name}({func_params_str}) -> str:
     """{tool.description}"""
-{self._indent(tool.converted_body, 4)}'''
+{self._indent(body, 4)}'''
         else:
             return f'''@tool(
     name="{tool.func_name}",
@@ -1013,7 +1271,7 @@ def {tool.func_name}({func_params_str}) -> str:
 )
 def {tool.func_name}() -> str:
     """{tool.description}"""
-{self._indent(tool.converted_body, 4)}'''
+{self._indent(body, 4)}'''
 
     def _gen_tool_map_and_invoke(self, agent_ir: AgentIR) -> str:
         """生成工具映射和 invoke_tool 函数（单文件模式）"""
@@ -1032,28 +1290,8 @@ def {tool.func_name}() -> str:
             )
             lines.append(f'{tool_map_name} = {{{tool_entries}}}')
 
-        # 生成 invoke_tool 函数
-        lines.extend([
-            '',
-            '',
-            'def invoke_tool(tool_name: str, arg: str) -> str:',
-            '    """',
-            '    调用工具的辅助函数',
-            '',
-            '    openJiuwen 的 @tool 装饰器返回 LocalFunction，',
-            '    需要通过 .invoke(inputs={param_name: arg}) 调用。',
-            '    此函数自动处理参数名映射。',
-            '    """',
-            f'    tool_func = {tool_map_name}.get(tool_name)',
-            '    if tool_func is None:',
-            '        return f"未知工具: {tool_name}"',
-            '    # 获取工具的第一个参数名',
-            '    if hasattr(tool_func, "params") and tool_func.params:',
-            '        param_name = tool_func.params[0].name',
-            '    else:',
-            '        param_name = "input"',
-            '    return tool_func.invoke(inputs={param_name: arg})',
-        ])
+        # 生成 call_tool / invoke_tool 函数
+        lines.extend(['', '', self._gen_tool_dispatch(tool_map_name)])
 
         return '\n'.join(lines)
 
@@ -1081,6 +1319,7 @@ def {tool.func_name}() -> str:
         # 处理组件逻辑代码
         body_code = node.converted_body
         body_code = body_code.replace("__COLLECTED_OUTPUTS__", outputs_dict)
+        body_code = self._await_tool_calls(body_code)
 
         # 将全局状态变量的访问从 inputs.get/inputs[] 转换为 runtime.get_global_state()
         body_code = self._convert_global_state_access(body_code, global_state_keys)
@@ -1141,27 +1380,27 @@ def {tool.func_name}() -> str:
         """生成初始化方法"""
         if node.has_llm:
             model_name = agent_ir.llm_config.model_name if agent_ir.llm_config else "gpt-4"
-            # 从 agent_ir 获取 API 配置
-            api_key = "os.getenv('OPENAI_API_KEY', '')"
-            api_base = "os.getenv('OPENAI_API_BASE', '')"
-            if agent_ir.llm_config and agent_ir.llm_config.other_params:
-                if "api_key" in agent_ir.llm_config.other_params:
-                    api_key = f'"{agent_ir.llm_config.other_params["api_key"]}"'
-                if "api_base" in agent_ir.llm_config.other_params:
-                    api_base = f'"{agent_ir.llm_config.other_params["api_base"]}"'
             return f'''    def __init__(self, llm=None):
         if llm:
             self._llm = llm
         else:
-            self._llm = OpenAIChatModel(
-                api_key={api_key},
-                api_base={api_base}
-            )
+            self._llm = get_llm()
         self.model_name = "{model_name}"'''
         else:
             return '''    def __init__(self):
         pass'''
 
+    def _single_file_llm_defaults(self, agent_ir: AgentIR):
+        """单文件模式下 get_llm 的默认 API 配置表达式"""
+        api_key = "os.getenv('OPENAI_API_KEY', '')"
+        api_base = "os.getenv('OPENAI_API_BASE', '')"
+        if agent_ir.llm_config and agent_ir.llm_config.other_params:
+            if "api_key" in agent_ir.llm_config.other_params:
+                api_key = f'"{agent_ir.llm_config.other_params["api_key"]}"'
+            if "api_base" in agent_ir.llm_config.other_params:
+                api_base = f'"{agent_ir.llm_config.other_params["api_base"]}"'
+        return api_key, api_base
+
     def _gen_output_init(self, outputs: List[str]) -> str:
         """生成输出变量初始化"""
         if not outputs:
@@ -1312,17 +1551,17 @@ def {tool.func_name}() -> str:
 
         inputs_content = ",\n".join(input_fields)
 
-        return f'''async def main():
-    """主函数"""
-    workflow = build_{agent_ir.name.lower()}_workflow()
-    runtime = WorkflowRuntime()
+        return f'''{self._gen_runners(agent_ir.name.lower())}
+
 
+async def main():
+    """主函数"""
     # 示例输入
     inputs = {{
 {inputs_content}
     }}
 
-    result = await workflow.invoke(inputs, runtime)
+    result = await arun(inputs)
     print("执行结果:", result)
 
 
@@ -62,16 +62,21 @@ class FileLoaderComp(WorkflowComponent, ComponentExecutable):
 
     def _read_file(self, file_path: str) -> str:
         """读取单个文件"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"文件不存在: {file_path}")
+        return read_source_file(file_path)
 
-        # 尝试多种编码
-        encodings = ["utf-8", "gbk", "latin-1"]
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
 
-        raise ValueError(f"无法解码文件: {file_path}")
+def read_source_file(file_path: str) -> str:
+    """读取源文件，依次尝试多种编码"""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"文件不存在: {file_path}")
+
+    # 尝试多种编码
+    encodings = ["utf-8", "gbk", "latin-1"]
+    for encoding in encodings:
+        try:
+            with open(file_path, "r", encoding=encoding) as f:
+                return f.read()
+        except UnicodeDecodeError:
+            continue
+
+    raise ValueError(f"无法解码文件: {file_path}")
@@ -92,7 +92,13 @@ class IRBuilderComp(WorkflowComponent, ComponentExecutable):
                 "ai_count": extraction_result.ai_count,
                 "total_nodes": len(extraction_result.nodes),
                 "total_edges": len(extraction_result.edges),
-                "total_tools": len(extraction_result.tools)
+                "total_tools": len(extraction_result.tools),
+                "ai_requests": len(extraction_result.prompt_stats),
+                "prompt_tokens": sum(p["tokens"] for p in extraction_result.prompt_stats),
+                "escalations": len(extraction_result.escalations),
+                "prompts": extraction_result.prompt_stats,
+                "rules": extraction_result.rule_stats,
+                "load_errors": extraction_result.load_errors
             }
         )
 
@@ -0,0 +1,146 @@
+"""
+流水线规则提取组件
+
+替代 FileLoader → ASTParser → RuleExtractor 三个阶段：读取、解析、符号扫描 / 提取
+组成生产者/消费者链，阶段之间用有界队列连接，文件 I/O 与解析、扫描、提取重叠
+"""
+
+import ast
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+
+from openjiuwen.core.runtime.base import Input, Output
+from openjiuwen.core.runtime.runtime import Runtime
+from openjiuwen.core.context_engine.base import Context
+
+from ..workflow.state import ExtractionResult, PendingItem
+from .ast_parser import ASTCache, parse_source
+from .file_loader import read_source_file
+from .streaming_extractor import StreamingExtractorComp, SymbolIndex
+
+
+# 阶段之间队列的默认容量（文件数）
+PIPELINE_QUEUE_SIZE = 8
+
+# 队列结束标记
+_DONE = object()
+
+
+class PipelinedExtractorComp(StreamingExtractorComp):
+    """
+    流水线规则提取组件
+
+    与流式提取相同的两遍处理，每一遍都是 读取（线程池）→ 解析（线程池）→ 消费
+    三个阶段并发执行，队列有界，读取不会远远领先于解析：
+    1. 符号扫描：记录读取 / 解析错误，收集跨文件符号
+    2. 逐文件提取：提取阶段从队列中取出 AST，提取完即释放
+
+    跨文件符号（add_node 映射、路由函数定义）需要扫描完全部文件才能确定，
+    因此第二遍在扫描结束后开始；任何时刻只有队列中的少量 AST 驻留内存
+    """
+
+    def __init__(
+        self,
+        hybrid: bool = False,
+        on_pending: Optional[Callable[[PendingItem, ExtractionResult], None]] = None,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        rule_stats: bool = False,
+        ast_cache: Optional[ASTCache] = None
+    ):
+        super().__init__(hybrid=hybrid, on_pending=on_pending, rule_stats=rule_stats)
+        self._queue_size = queue_size
+        self._ast_cache = ast_cache
+
+    async def invoke(
+        self,
+        inputs: Input,
+        runtime: Runtime,
+        context: Context
+    ) -> Output:
+        # 从 inputs 获取（通过 transformer 传入）
+        file_list: List[str] = self._unwrap_value(inputs.get("file_list", [])) or []
+        dependency_order: List[str] = self._unwrap_value(inputs.get("dependency_order", [])) or []
+        order = dependency_order or file_list
+
+        errors: List[str] = []
+
+        # 第一遍：读取 → 解析 → 符号扫描
+        index = SymbolIndex()
+
+        async def scan(file_path: str, tree: ast.AST):
+            self._scan_file(index, file_path, tree)
+
+        await self._run_pipeline(order, errors, scan)
+
+        if not index.loaded_files:
+            raise ValueError(f"无法解析任何文件: {'; '.join(errors)}")
+        index.resolve()
+
+        # 第二遍：读取 → 解析 → 提取，提取完即释放 AST
+        result = ExtractionResult(load_errors=errors)
+
+        async def extract(file_path: str, tree: ast.AST):
+            self._extract_scanned(index, file_path, tree, result)
+            await self._yield_to_dispatched()
+
+        await self._run_pipeline(index.loaded_files, errors, extract)
+
+        self._classify_global_vars(result)
+        self._record_rule_stats(result)
+
+        return {
+            "extraction_result": result,
+            "load_errors": errors
+        }
+
+    async def _run_pipeline(
+        self,
+        order: List[str],
+        errors: List[str],
+        consume: Callable[[str, ast.AST], Awaitable[None]]
+    ) -> None:
+        """
+        运行 读取 → 解析 → 消费 流水线
+
+        Args:
+            order: 按顺序处理的文件列表，消费阶段按相同顺序收到 AST
+            errors: 读取 / 解析错误追加到此列表
+            consume: 消费单个文件 AST 的协程函数，返回后不再持有该 AST
+        """
+        loop = asyncio.get_running_loop()
+        read_queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        parse_queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+
+        async def read():
+            # 队列中放入读取任务，队列容量限制同时在读的文件数
+            for file_path in order:
+                await read_queue.put((file_path, loop.run_in_executor(None, read_source_file, file_path)))
+            await read_queue.put(_DONE)
+
+        async def parse():
+            while (entry := await read_queue.get()) is not _DONE:
+                file_path, reading = entry
+                try:
+                    content = await reading
+                except Exception as e:
+                    errors.append(f"读取文件失败 {file_path}: {str(e)}")
+                    continue
+                try:
+                    tree = await loop.run_in_executor(None, parse_source, content, file_path, self._ast_cache)
+                except SyntaxError as e:
+                    errors.append(f"语法错误 {file_path}:{e.lineno}: {e.msg}")
+                    continue
+                await parse_queue.put((file_path, tree))
+            await parse_queue.put(_DONE)
+
+        async def drain():
+            while (entry := await parse_queue.get()) is not _DONE:
+                await consume(*entry)
+
+        stages = [asyncio.ensure_future(stage()) for stage in (read, parse, drain)]
+        try:
+            await asyncio.gather(*stages)
+        finally:
+            # 任一阶段出错时停止其他阶段，避免阻塞在队列上
+            for stage in stages:
+                stage.cancel()
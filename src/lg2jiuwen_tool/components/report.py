@@ -5,13 +5,14 @@
 """
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from openjiuwen.core.component.base import WorkflowComponent
 from openjiuwen.core.runtime.base import ComponentExecutable, Input, Output
 from openjiuwen.core.runtime.runtime import Runtime
 from openjiuwen.core.context_engine.base import Context
 
+from ..output_sink import DiskSink, OutputSink
 from ..workflow.state import ExtractionResult
 from ..ir.models import MigrationIR
 
@@ -23,8 +24,16 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
     功能：
     - 生成详细的迁移报告
     - 包含转换统计、特性支持、手动检查项
+    - 写出 {agent}_report.md（未指定输出目标且无 output_dir 时只返回内容）
     """
 
+    def __init__(self, sink: Optional[OutputSink] = None):
+        """
+        Args:
+            sink: 输出目标，默认写入 inputs 中的 output_dir
+        """
+        self._sink = sink
+
     async def invoke(
         self,
         inputs: Input,
@@ -34,7 +43,8 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
         # 从 inputs 获取（通过 transformer 传入）
         extraction_result: ExtractionResult = inputs.get("extraction_result")
         migration_ir: MigrationIR = inputs.get("migration_ir")
-        generated_files: List[str] = inputs.get("generated_files", [])
+        generated_files: List[str] = list(inputs.get("generated_files") or [])
+        output_dir: str = inputs.get("output_dir")
 
         report = self._generate_report(
             extraction_result,
@@ -42,6 +52,11 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
             migration_ir
         )
 
+        sink = self._sink or (DiskSink(output_dir) if output_dir else None)
+        if sink is not None:
+            agent_name = migration_ir.agent_ir.name.lower() if migration_ir else "agent"
+            generated_files.append(sink.write(f"{agent_name}_report.md", report))
+
         return {
             "report": report,
             "generated_files": generated_files
@@ -104,7 +119,68 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
 |---------|------|------|
 | 规则处理 | {result.rule_count} | {rule_pct:.1f}% |
 | AI 处理 | {result.ai_count} | {ai_pct:.1f}% |
-| **总计** | **{total}** | **100%** |"""
+| **总计** | **{total}** | **100%** |""" + self._gen_prompt_stats(result) + self._gen_escalations(result) \
+            + self._gen_rule_stats(result)
+
+    def _gen_prompt_stats(self, result: ExtractionResult) -> str:
+        """生成 AI 请求的提示词 token 统计"""
+        if not result.prompt_stats:
+            return ""
+
+        lines = ["", "", "| AI 请求 | 待处理项 | 模型 | 提示词 tokens |", "|---------|---------|------|--------------|"]
+        for number, prompt in enumerate(result.prompt_stats, 1):
+            lines.append(f"| {number} | {', '.join(prompt['items'])} | {prompt['model']} | {prompt['tokens']} |")
+
+        over_budget = [prompt for prompt in result.prompt_stats if prompt.get("over_budget")]
+        if over_budget:
+            items = sorted({item for prompt in over_budget for item in prompt["items"]})
+            lines.extend([
+                "",
+                f"**警告**: {len(over_budget)} 次 AI 请求的提示词超出 token 预算"
+                f"（只发送无法转换的语句仍超出）: {', '.join(items)}",
+            ])
+        return "\n".join(lines)
+
+    def _gen_escalations(self, result: ExtractionResult) -> str:
+        """生成 AI 模型升级记录"""
+        if not result.escalations:
+            return ""
+
+        lines = ["", "", "| 升级的待处理项 | 原模型 | 升级到 | 原因 |", "|--------------|-------|-------|------|"]
+        for escalation in result.escalations:
+            lines.append(
+                f"| {escalation['item']} | {escalation['from']} | {escalation['to']} | {escalation['reason'] or '-'} |"
+            )
+        return "\n".join(lines)
+
+    def _gen_rule_stats(self, result: ExtractionResult) -> str:
+        """生成逐规则计数，以及兜底 / 无法转换的语句类型"""
+        if not result.rule_stats:
+            return ""
+
+        lines = [
+            "", "", "### 规则统计", "",
+            "| 规则 | 匹配尝试 | 命中 | 转换失败 | 转换耗时 (ms) |",
+            "|------|---------|------|---------|--------------|",
+        ]
+        for name, stats in result.rule_stats["rules"].items():
+            lines.append(
+                f"| {name} | {stats['attempts']} | {stats['hits']} | {stats['failures']} | {stats['seconds'] * 1000:.2f} |"
+            )
+
+        passthrough = result.rule_stats["passthrough"]
+        failed = result.rule_stats["failed"]
+        if passthrough or failed:
+            # 无法转换最多的语句类型排在前面，是新增规则收益最大的方向
+            types = sorted(
+                set(passthrough) | set(failed),
+                key=lambda name: (failed.get(name, 0), passthrough.get(name, 0)),
+                reverse=True
+            )
+            lines.extend(["", "| 语句类型 | 透传兜底 | 无法转换 |", "|---------|---------|---------|"])
+            for name in types:
+                lines.append(f"| {name} | {passthrough.get(name, 0)} | {failed.get(name, 0)} |")
+        return "\n".join(lines)
 
     def _gen_nodes_detail(self, result: ExtractionResult) -> str:
         """生成节点详情"""
@@ -164,7 +240,7 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
         ]
 
         # 如果有 AI 处理的节点，添加额外检查项
-        ai_nodes = [n for n in result.nodes if n.conversion_source == "ai"]
+        ai_nodes = [n for n in result.nodes if n.conversion_source in ("ai", "hybrid")]
         if ai_nodes:
             checks.append(f"[ ] 人工审核 AI 转换的 {len(ai_nodes)} 个节点")
 
@@ -172,6 +248,11 @@ class ReportComp(WorkflowComponent, ComponentExecutable):
         if result.tools:
             checks.append("[ ] 验证工具函数的参数和返回值")
 
+        # 读取或解析失败的文件没有参与迁移
+        if result.load_errors:
+            checks.append(f"[ ] 处理 {len(result.load_errors)} 个未能读取或解析的文件（未参与迁移）")
+            checks.extend(f"  - {error}" for error in result.load_errors)
+
         lines = ["## 手动检查项", ""]
         lines.extend(checks)
 
@@ -5,7 +5,8 @@
 """
 
 import ast
-from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from openjiuwen.core.component.base import WorkflowComponent
 from openjiuwen.core.runtime.base import ComponentExecutable, Input, Output
@@ -22,7 +23,7 @@ from ..workflow.state import (
     ToolInfo,
     LLMConfig,
 )
-from ..rules.base import RuleChain, ConversionResult, PassthroughRule
+from ..rules.base import RuleChain, RuleChainStats, ConversionResult, PassthroughRule
 
 
 class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
@@ -33,9 +34,27 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
     1. 提取 LangGraph 结构（状态、节点、边、工具）
     2. 尝试用规则转换函数体
     3. 无法处理的生成 pending_item
+
+    hybrid=True 时启用混合模式：保留规则已转换的语句，
+    pending_item 只包含规则无法转换的语句片段和精简的上下文，
+    由 AI 转换后填回占位符
+
+    on_pending(item, result) 在每个 pending_item 生成时调用（流水线模式下立即派发给 AI）；
+    设置后每处理完一个文件让出一次事件循环，使已派发的请求与后续提取重叠
+
+    rule_stats=True 时记录规则链中每条规则的匹配、命中、失败和耗时，
+    写入 ExtractionResult.rule_stats
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        hybrid: bool = False,
+        on_pending: Optional[Callable[[PendingItem, ExtractionResult], None]] = None,
+        rule_stats: bool = False
+    ):
+        self._hybrid = hybrid
+        self._on_pending = on_pending
+        self._rule_stats = rule_stats
         # 延迟导入规则，避免循环依赖
         self._rule_chain: Optional[RuleChain] = None
         self._tool_call_rule: Optional["ToolCallRule"] = None
@@ -57,7 +76,7 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
                 ToolMapCallRule(),  # 处理 tool_map[key].run() 模式
                 ReturnRule(),
                 PassthroughRule(),  # fallback: 保持原样
-            ])
+            ], collect_stats=self._rule_stats)
         return self._rule_chain
 
     def _update_tool_names(self, tool_names: List[str]):
@@ -102,7 +121,9 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
         if not isinstance(ast_map, dict):
             raise TypeError(f"ast_map 应为 dict，实际为 {type(ast_map)}")
 
-        result = ExtractionResult()
+        # 加载和解析阶段的错误随提取结果进入报告
+        load_errors = self._unwrap_value(inputs.get("load_errors", [])) or []
+        result = ExtractionResult(load_errors=list(load_errors))
 
         # 第一遍：收集所有文件中的信息
         global_func_to_node: Dict[str, str] = {}
@@ -126,37 +147,69 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
         for file_path in dependency_order:
             if file_path not in ast_map:
                 continue
-            tree = ast_map[file_path]
+            self._extract_file(
+                ast_map[file_path], result, file_path, global_func_to_node, global_func_defs
+            )
+            await self._yield_to_dispatched()
 
-            # 1. 提取导入语句和全局变量
-            self._extract_imports_and_globals(tree, result)
+        # 8. 分类全局变量：识别工具相关的变量
+        self._classify_global_vars(result)
+        self._record_rule_stats(result)
+
+        return {"extraction_result": result}
 
-            # 2. 提取状态类
-            self._extract_states(tree, result)
+    def _add_pending(self, result: ExtractionResult, item: PendingItem):
+        """登记 pending_item，并通知 on_pending"""
+        result.pending_items.append(item)
+        if self._on_pending is not None:
+            self._on_pending(item, result)
 
-            # 3. 提取 LLM 配置
-            self._extract_llm_configs(tree, result)
+    def _record_rule_stats(self, result: ExtractionResult):
+        """把规则链计数写入结果，并为下一次提取清零"""
+        chain = self._rule_chain
+        if chain is None or chain.stats is None:
+            return
+        result.rule_stats = chain.stats.to_dict()
+        chain.stats = RuleChainStats()
 
-            # 4. 提取工具（使用全局函数定义映射支持跨文件查找）
-            self._extract_tools(tree, result, file_path, global_func_defs)
+    async def _yield_to_dispatched(self):
+        """流水线模式下让出事件循环，使已派发的 AI 请求得以推进"""
+        if self._on_pending is not None:
+            await asyncio.sleep(0)
 
-            # 4.5 更新工具名列表到规则链
-            tool_names = [t.name for t in result.tools]
-            self._update_tool_names(tool_names)
+    def _extract_file(
+        self,
+        tree: ast.AST,
+        result: ExtractionResult,
+        file_path: str,
+        global_func_to_node: Dict[str, str],
+        global_func_defs: Dict[str, ast.FunctionDef]
+    ):
+        """提取单个文件（第二遍处理）"""
+        # 1. 提取导入语句和全局变量
+        self._extract_imports_and_globals(tree, result)
 
-            # 5. 提取并转换节点（使用全局的 func_to_node 映射）
-            self._extract_and_convert_nodes_with_mapping(tree, result, file_path, global_func_to_node)
+        # 2. 提取状态类
+        self._extract_states(tree, result)
 
-            # 6. 提取边（使用全局的函数定义映射）
-            self._extract_edges_with_global_funcs(tree, result, global_func_defs)
+        # 3. 提取 LLM 配置
+        self._extract_llm_configs(tree, result)
 
-            # 7. 提取初始输入（从 invoke() 调用）
-            self._extract_initial_inputs(tree, result)
+        # 4. 提取工具（使用全局函数定义映射支持跨文件查找）
+        self._extract_tools(tree, result, file_path, global_func_defs)
 
-        # 8. 分类全局变量：识别工具相关的变量
-        self._classify_global_vars(result)
+        # 4.5 更新工具名列表到规则链
+        tool_names = [t.name for t in result.tools]
+        self._update_tool_names(tool_names)
 
-        return {"extraction_result": result}
+        # 5. 提取并转换节点（使用全局的 func_to_node 映射）
+        self._extract_and_convert_nodes_with_mapping(tree, result, file_path, global_func_to_node)
+
+        # 6. 提取边（使用全局的函数定义映射）
+        self._extract_edges_with_global_funcs(tree, result, global_func_defs)
+
+        # 7. 提取初始输入（从 invoke() 调用）
+        self._extract_initial_inputs(tree, result)
 
     def _classify_global_vars(self, result: ExtractionResult):
         """分类全局变量，将工具相关的变量移到 tool_related_vars"""
@@ -608,16 +661,25 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
                             docstring=ast.get_docstring(node)
                         ))
                         result.rule_count += 1
+                    elif self._hybrid:
+                        # 只把无法转换的语句交给 AI
+                        self._add_pending(result, self._build_statements_item(
+                            node, conversion, result, file_path, actual_node_name
+                        ))
                     else:
                         # 生成 pending_item
-                        result.pending_items.append(PendingItem(
+                        self._add_pending(result, PendingItem(
                             id=f"{file_path}:{actual_node_name}",
                             pending_type=PendingType.NODE_BODY,
                             source_code=ast.unparse(node),
                             context={
                                 "state_fields": [s.name for s in result.states],
                                 "available_tools": [t.name for t in result.tools],
-                                "failed_lines": conversion.failed_lines
+                                "failed_lines": conversion.failed_lines,
+                                # 提示词超出预算时改用语句级待处理项
+                                "statements": self._build_statements_item(
+                                    node, conversion, result, file_path, actual_node_name
+                                )
                             },
                             question=self._build_question(node, conversion.failed_lines),
                             location=f"{file_path}:{node.lineno}"
@@ -654,6 +716,84 @@ class RuleExtractorComp(WorkflowComponent, ComponentExecutable):
         rule_chain = self._get_rule_chain()
         return rule_chain.convert_statements(func.body)
 
+    def _build_statements_item(
+        self,
+        func: ast.FunctionDef,
+        conversion: ConversionResult,
+        result: ExtractionResult,
+        file_path: str,
+        node_name: str
+    ) -> PendingItem:
+        """
+        为部分转换的节点函数生成语句级 pending_item
+
+        source_code 只包含失败的语句片段（按占位符分段），
+        context 中的 partial_body 是规则已转换的函数体，AI 结果按占位符填回
+        """
+        spans: Dict[str, List[str]] = {}
+        for failed in conversion.failed_lines:
+            spans.setdefault(failed["placeholder"], []).append(failed["code"])
+
+        return PendingItem(
+            id=f"{file_path}:{node_name}",
+            pending_type=PendingType.STATEMENTS,
+            source_code="\n\n".join(
+                f"# {placeholder}\n" + "\n".join(codes) for placeholder, codes in spans.items()
+            ),
+            context={
+                "state_fields": [s.name for s in result.states],
+                "available_tools": [t.name for t in result.tools],
+                "failed_lines": conversion.failed_lines,
+                "signature": f"def {func.name}({ast.unparse(func.args)})",
+                "local_names": self._assigned_names(conversion.code),
+                "partial_body": conversion.code,
+                "spans": {placeholder: "\n".join(codes) for placeholder, codes in spans.items()},
+                "inputs": conversion.inputs,
+                "outputs": conversion.outputs + [
+                    key for key in self._state_writes(spans) if key not in conversion.outputs
+                ],
+                "original_code": ast.unparse(func),
+                "docstring": ast.get_docstring(func),
+            },
+            question=self._build_statements_question(func),
+            location=f"{file_path}:{func.lineno}"
+        )
+
+    def _state_writes(self, spans: Dict[str, List[str]]) -> List[str]:
+        """收集失败语句中写入的状态字段（state["x"] = ... / state["x"] += ...）"""
+        keys: List[str] = []
+        for codes in spans.values():
+            for code in codes:
+                for node in ast.walk(ast.parse(code)):
+                    if (isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store)
+                            and isinstance(node.value, ast.Name) and node.value.id in ("state", "State")
+                            and isinstance(node.slice, ast.Constant) and node.slice.value not in keys):
+                        keys.append(node.slice.value)
+        return keys
+
+    def _assigned_names(self, code: str) -> List[str]:
+        """收集已转换代码中赋值的局部变量名"""
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return []
+        names: List[str] = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) and node.id not in names:
+                names.append(node.id)
+        return names
+
+    def _build_statements_question(self, func: ast.FunctionDef) -> str:
+        """为语句级 pending_item 构建问题（失败语句已在 source_code 中分段给出）"""
+        return f"""
+函数 `{func.name}` 中其余语句已由规则转换，以上语句无法用规则转换，请逐段转换为 openJiuwen 格式：
+
+1. 状态读取: state["x"] → inputs["x"]
+2. 状态写入: state["x"] = v → x = v
+3. LLM调用: llm.invoke(msgs) → await self._llm.ainvoke(model_name=self.model_name, messages=msgs)
+4. 可以直接使用已有的局部变量，保持原有逻辑不变
+"""
+
     def _build_question(
         self,
         func: ast.FunctionDef,
@@ -0,0 +1,151 @@
+"""
+流式规则提取组件
+
+大型项目的低内存模式：逐文件读取、解析、提取，处理完即释放
+"""
+
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from openjiuwen.core.runtime.base import Input, Output
+from openjiuwen.core.runtime.runtime import Runtime
+from openjiuwen.core.context_engine.base import Context
+
+from ..workflow.state import ExtractionResult
+from .file_loader import read_source_file
+from .rule_extractor import RuleExtractorComp
+
+
+@dataclass
+class SymbolIndex:
+    """第一遍符号扫描的结果（不保留整个 AST）"""
+    func_to_node: Dict[str, str] = field(default_factory=dict)        # add_node 映射
+    referenced: Set[str] = field(default_factory=set)                 # 需要跨文件查找定义的函数名
+    last_defined: Dict[str, str] = field(default_factory=dict)        # 函数名 → 最后定义它的文件
+    symbol_defs: Dict[str, ast.FunctionDef] = field(default_factory=dict)  # 已确定的被引用函数定义
+    # 扫描到定义时已被引用的函数: 函数名 → (文件, 定义)，后定义的覆盖先定义的
+    scanned_defs: Dict[str, Tuple[str, ast.FunctionDef]] = field(default_factory=dict)
+    loaded_files: List[str] = field(default_factory=list)             # 成功读取并解析的文件
+
+    def resolve(self) -> None:
+        """扫描结束后确定被引用函数的定义：扫描时保留的定义来自最后定义它的文件时直接采用"""
+        for name, (file_path, node) in self.scanned_defs.items():
+            if self.last_defined.get(name) == file_path:
+                self.symbol_defs[name] = node
+        self.scanned_defs = {}
+
+
+class StreamingExtractorComp(RuleExtractorComp):
+    """
+    流式规则提取组件
+
+    替代 FileLoader → ASTParser → RuleExtractor 三个阶段，
+    源码和 AST 不再整体驻留在工作流状态中。
+
+    处理流程（均按依赖顺序，每个文件最多解析两次）：
+    1. 符号扫描：记录读取 / 解析错误，收集 add_node 映射、add_conditional_edges /
+       Tool(func=...) 引用的函数名，以及扫描到时已被引用的函数定义
+    2. 逐文件提取：解析 → 补齐本文件中最终生效、扫描时尚未被引用的函数定义 → 提取 → 释放
+
+    被引用函数的定义在扫描时未被保留，说明所有引用都在其最后定义文件之后，
+    第二遍到达引用文件前已经补齐，因此与全量模式的结果一致。
+    峰值内存取决于最大的单个文件，而不是整个项目
+    """
+
+    async def invoke(
+        self,
+        inputs: Input,
+        runtime: Runtime,
+        context: Context
+    ) -> Output:
+        # 从 inputs 获取（通过 transformer 传入）
+        file_list: List[str] = self._unwrap_value(inputs.get("file_list", [])) or []
+        dependency_order: List[str] = self._unwrap_value(inputs.get("dependency_order", [])) or []
+        order = dependency_order or file_list
+
+        errors: List[str] = []
+
+        # 第一遍：扫描符号引用，记录读取和解析错误
+        index = SymbolIndex()
+        for file_path in order:
+            tree = self._load_tree(file_path, errors)
+            if tree is not None:
+                self._scan_file(index, file_path, tree)
+
+        if not index.loaded_files:
+            raise ValueError(f"无法解析任何文件: {'; '.join(errors)}")
+        index.resolve()
+
+        # 第二遍：逐文件提取，提取完即释放 AST
+        result = ExtractionResult(load_errors=errors)
+        for file_path in index.loaded_files:
+            tree = self._load_tree(file_path, errors)
+            if tree is None:
+                continue
+            self._extract_scanned(index, file_path, tree, result)
+            await self._yield_to_dispatched()
+
+        self._classify_global_vars(result)
+        self._record_rule_stats(result)
+
+        return {
+            "extraction_result": result,
+            "load_errors": errors
+        }
+
+    def _load_tree(self, file_path: str, errors: List[str]) -> Optional[ast.AST]:
+        """读取并解析单个文件，失败时记录错误并返回 None"""
+        try:
+            content = read_source_file(file_path)
+        except Exception as e:
+            errors.append(f"读取文件失败 {file_path}: {str(e)}")
+            return None
+
+        try:
+            return ast.parse(content, filename=file_path)
+        except SyntaxError as e:
+            errors.append(f"语法错误 {file_path}:{e.lineno}: {e.msg}")
+            return None
+
+    def _scan_file(self, index: SymbolIndex, file_path: str, tree: ast.AST) -> None:
+        """第一遍：扫描单个文件的符号，只保留已被引用的函数定义"""
+        index.loaded_files.append(file_path)
+        index.func_to_node.update(self._find_node_references(tree))
+        index.referenced.update(self._find_symbol_references(tree))
+        for node in ast.walk(tree):
+            if isinstance(node, ast.FunctionDef):
+                index.last_defined[node.name] = file_path
+                if node.name in index.referenced:
+                    index.scanned_defs[node.name] = (file_path, node)
+
+    def _extract_scanned(self, index: SymbolIndex, file_path: str, tree: ast.AST, result: ExtractionResult) -> None:
+        """第二遍：补齐本文件中最终生效的被引用函数定义，然后提取"""
+        for node in ast.walk(tree):
+            if (isinstance(node, ast.FunctionDef) and node.name in index.referenced
+                    and node.name not in index.symbol_defs and index.last_defined.get(node.name) == file_path):
+                index.symbol_defs[node.name] = node
+        # 传入副本，避免本地函数定义在文件间累积
+        self._extract_file(tree, result, file_path, index.func_to_node, dict(index.symbol_defs))
+
+    def _find_symbol_references(self, tree: ast.AST) -> Set[str]:
+        """找出需要跨文件查找定义的函数名（路由函数和 Tool(func=...)）"""
+        names: Set[str] = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.Call):
+                continue
+            # graph.add_conditional_edges("node", router_func, {...})
+            if isinstance(node.func, ast.Attribute) and node.func.attr == "add_conditional_edges":
+                if len(node.args) >= 2 and isinstance(node.args[1], ast.Name):
+                    names.add(node.args[1].id)
+            # Tool(name=..., func=some_func, ...)
+            func_name = None
+            if isinstance(node.func, ast.Name):
+                func_name = node.func.id
+            elif isinstance(node.func, ast.Attribute):
+                func_name = node.func.attr
+            if func_name == "Tool":
+                for keyword in node.keywords:
+                    if keyword.arg == "func" and isinstance(keyword.value, ast.Name):
+                        names.add(keyword.value.id)
+        return names
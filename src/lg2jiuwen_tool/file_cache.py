@@ -0,0 +1,277 @@
+"""
+LG2Jiuwen 文件缓存
+
+供文件读取接口使用：
+- 热点生成文件（报告、IR JSON、代码）的内存 LRU，按 mtime + size 失效
+- ETag / Last-Modified 条件请求判断
+- Range 请求解析
+- 压缩结果等派生数据随缓存条目复用，大小计入缓存总大小
+"""
+
+import gzip
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+@dataclass
+class CachedFile:
+    """
+    文件快照
+
+    data 为 None 表示文件过大未缓存，需要从磁盘流式读取
+    """
+    path: str
+    size: int
+    mtime_ns: int
+    data: Optional[bytes] = None
+    derived_bytes: int = 0               # 派生数据的大小（计入所属缓存的总大小）
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+    _cache: Optional["FileCache"] = field(default=None, repr=False)  # 所属缓存，淘汰后为 None
+
+    @property
+    def etag(self) -> str:
+        """基于 mtime 和大小的 ETag"""
+        return f'"{self.mtime_ns:x}-{self.size:x}"'
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def last_modified(self) -> str:
+        """HTTP 日期格式的修改时间"""
+        return formatdate(self.mtime, usegmt=True)
+
+    def read(self) -> bytes:
+        """获取完整内容"""
+        if self.data is not None:
+            return self.data
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def text(self, encoding: str = "utf-8") -> str:
+        """获取文本内容"""
+        return self.derive(f"text:{encoding}", lambda: self.read().decode(encoding))
+
+    def gzipped(self) -> bytes:
+        """获取 gzip 压缩后的内容"""
+        return self.derive("gzip", lambda: gzip.compress(self.read(), compresslevel=6, mtime=0))
+
+    def derive(self, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        获取派生数据（如压缩结果、编码后的响应体）
+
+        已缓存的文件会记住结果，直到文件变化导致条目失效；
+        结果的大小计入所属缓存，超出上限时按 LRU 淘汰
+        """
+        if self.data is None:
+            return factory()
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+            value = self._derived[key] = factory()
+        size = _derived_size(value)
+        cache = self._cache
+        if cache is not None:
+            cache._add_derived(self, size)
+        else:
+            self.derived_bytes += size
+        return value
+
+    def iter_range(self, start: int, end: int, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """按块读取 [start, end] 区间（含 end）"""
+        if self.data is not None:
+            yield self.data[start:end + 1]
+            return
+        remaining = end - start + 1
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+def _derived_size(value: Any) -> int:
+    """派生数据占用的字节数（bytes 按长度，其他对象按 sys.getsizeof）"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class FileCache:
+    """
+    文件内存缓存（LRU）
+
+    每次访问都 stat 文件，mtime 或大小变化即重新读取；
+    总大小包含文件内容和派生数据（解码文本、JSON 响应体、gzip 等）
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_file_bytes: int = 4 * 1024 * 1024,
+        max_total_bytes: int = 64 * 1024 * 1024
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大缓存文件数
+            max_file_bytes: 单个文件超过该大小不缓存
+            max_total_bytes: 缓存内容总大小上限（含派生数据）
+        """
+        self.max_entries = max_entries
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> CachedFile:
+        """
+        获取文件快照
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            IsADirectoryError: 路径是目录
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        if not os.path.isfile(path):
+            raise IsADirectoryError(f"{path} is not a file")
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            if entry:
+                self._remove_locked(path)
+            self.misses += 1
+
+        if stat.st_size > self.max_file_bytes:
+            return CachedFile(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+        with open(path, "rb") as f:
+            data = f.read()
+        # 读取期间文件可能被改写，以实际读到的内容为准，并使用读取后的 mtime
+        stat_after = os.stat(path)
+        entry = CachedFile(
+            path=path, size=len(data), mtime_ns=stat_after.st_mtime_ns, data=data
+        )
+        if stat_after.st_size != len(data):
+            # 仍在写入中，不缓存
+            return entry
+
+        with self._lock:
+            if path in self._entries:
+                self._remove_locked(path)
+            self._entries[path] = entry
+            entry._cache = self
+            self._total_bytes += entry.size + entry.derived_bytes
+            self._evict_locked()
+        return entry
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """使指定文件（或全部）失效"""
+        with self._lock:
+            if path is None:
+                for entry in self._entries.values():
+                    entry._cache = None
+                self._entries.clear()
+                self._total_bytes = 0
+            elif os.path.abspath(path) in self._entries:
+                self._remove_locked(os.path.abspath(path))
+
+    def _add_derived(self, entry: CachedFile, size: int) -> None:
+        """记录条目新增的派生数据，条目仍在缓存中时计入总大小并淘汰"""
+        with self._lock:
+            entry.derived_bytes += size
+            if self._entries.get(entry.path) is entry:
+                self._total_bytes += size
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or self._total_bytes > self.max_total_bytes
+        ):
+            self._remove_locked(next(iter(self._entries)))
+
+    def _remove_locked(self, path: str) -> None:
+        entry = self._entries.pop(path)
+        entry._cache = None
+        self._total_bytes -= entry.size + entry.derived_bytes
+
+
+def is_not_modified(
+    cached: CachedFile,
+    if_none_match: Optional[str] = None,
+    if_modified_since: Optional[str] = None
+) -> bool:
+    """判断条件请求是否可以返回 304（If-None-Match 优先于 If-Modified-Since）"""
+    if if_none_match:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == cached.etag for tag in tags)
+
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP 日期精度为秒
+        return int(cached.mtime) <= int(since)
+    return False
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析 Range 请求头，返回 (start, end)（含 end）
+
+    - 未提供、格式不支持或多区间请求：返回 None（返回完整内容）
+    - 区间无法满足：抛出 ValueError（应返回 416）
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    start_text, end_text = (part.strip() for part in spec.split("-", 1))
+    if not all(text == "" or text.isdigit() for text in (start_text, end_text)):
+        return None
+    if not start_text and not end_text:
+        return None
+
+    if not start_text:
+        # bytes=-N：最后 N 个字节
+        length = int(end_text)
+        if length == 0 or size == 0:
+            raise ValueError(f"range not satisfiable: {header}")
+        return max(size - length, 0), size - 1
+
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or start > end:
+        raise ValueError(f"range not satisfiable: {header}")
+    return start, min(end, size - 1)
+
+
+_default_cache = FileCache()
+
+
+def get_file_cache() -> FileCache:
+    """获取进程级默认文件缓存"""
+    return _default_cache
@@ -21,7 +21,7 @@ class WorkflowNodeIR:
     converted_body: str                  # 已转换的函数体代码
     inputs: List[str]                    # 输入字段列表
     outputs: List[str]                   # 输出字段列表
-    conversion_source: str               # "rule" 或 "ai"
+    conversion_source: str               # "rule"、"ai" 或 "hybrid"（规则 + AI 逐语句）
     docstring: Optional[str] = None      # 文档字符串
     has_llm: bool = False                # 是否使用 LLM
     has_tools: bool = False              # 是否使用工具
@@ -129,7 +129,7 @@ class MigrationIR:
     agent_ir: AgentIR
     workflow_ir: WorkflowIR
     source_files: List[str] = field(default_factory=list)
-    conversion_stats: Dict[str, int] = field(default_factory=dict)
+    conversion_stats: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典（用于 JSON 序列化）"""
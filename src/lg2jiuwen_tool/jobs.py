@@ -0,0 +1,346 @@
+"""
+LG2Jiuwen 迁移任务管理
+
+REST 接口的异步任务子系统：
+- 提交后立即返回任务 ID，迁移在工作进程（或线程）池中运行，不阻塞事件循环
+- 排队数量有上限，超出时拒绝提交（接口返回 429）
+- 需要直接返回结果的接口（如压缩包迁移）通过 call() 共用同一工作池和排队上限
+- 支持查询状态与结果、取消任务
+- 已结束的任务按数量上限和过期时间淘汰
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+class JobStatus(str, Enum):
+    """任务状态"""
+    PENDING = "pending"          # 排队中
+    RUNNING = "running"          # 运行中
+    SUCCEEDED = "succeeded"      # 成功
+    FAILED = "failed"            # 失败
+    CANCELLED = "cancelled"      # 已取消
+
+    @property
+    def finished(self) -> bool:
+        """是否已结束"""
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+@dataclass
+class MigrationJob:
+    """迁移任务"""
+    job_id: str
+    source_path: str
+    output_dir: str
+    status: JobStatus = JobStatus.PENDING
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None                   # 迁移结果（生成的文件路径）
+    error: Optional[str] = None          # 错误信息
+    cancel_requested: bool = False       # 运行中收到取消请求
+    _future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为接口返回格式"""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "source_path": self.source_path,
+            "output_dir": self.output_dir,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class QueueFullError(RuntimeError):
+    """排队任务已达上限"""
+
+
+def _run_legacy_migrate(source_path: str, output_dir: str) -> Any:
+    """在工作进程（或线程）中执行迁移（兼容旧版本接口）"""
+    from .service import migrate
+    return asyncio.run(migrate(source_path, output_dir))
+
+
+def _warm_up_worker() -> None:
+    """工作进程初始化：预先导入迁移工作流，首个任务无需等待导入"""
+    from .workflow import migration_workflow  # noqa: F401
+
+
+class MigrationJobManager:
+    """
+    迁移任务管理器
+
+    - process 模式（默认）：迁移在独立工作进程中运行，AST 处理不占用服务进程的 GIL
+    - thread 模式：迁移在工作线程中以独立事件循环运行
+
+    每个任务由一个调度线程负责状态流转，调度线程数与工作进程数相同
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_jobs: int = 1000,
+        ttl_seconds: float = 3600,
+        runner: Optional[Callable[[str, str], Any]] = None,
+        executor: Optional[str] = None
+    ):
+        """
+        初始化任务管理器
+
+        Args:
+            max_workers: 最大并发迁移数，默认读取 LG2JIUWEN_MAX_WORKERS（默认 2）
+            max_queue: 最大排队任务数，默认读取 LG2JIUWEN_MAX_QUEUE（默认 16）
+            max_jobs: 保留的已结束任务数上限
+            ttl_seconds: 已结束任务的保留时间（秒）
+            runner: 迁移执行函数 (source_path, output_dir) -> result，
+                process 模式下必须可被 pickle（模块级函数）
+            executor: "process" 或 "thread"，默认读取 LG2JIUWEN_EXECUTOR（默认 process）
+        """
+        if max_workers is None:
+            max_workers = int(os.getenv("LG2JIUWEN_MAX_WORKERS", "2"))
+        if max_queue is None:
+            max_queue = int(os.getenv("LG2JIUWEN_MAX_QUEUE", "16"))
+        if executor is None:
+            executor = os.getenv("LG2JIUWEN_EXECUTOR", "process")
+        if executor not in ("process", "thread"):
+            raise ValueError(f"不支持的执行器类型: {executor}")
+
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self.executor_type = executor
+        self._runner = runner or _run_legacy_migrate
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="lg2jiuwen-migrate"
+        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        if executor == "process":
+            self._process_pool = self._create_process_pool()
+        self._jobs: Dict[str, MigrationJob] = {}
+        self._calls = 0                  # 通过 call() 提交、尚未结束的调用数
+        self._lock = threading.Lock()
+
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        # spawn：服务进程是多线程的，fork 可能死锁
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up_worker if self._runner is _run_legacy_migrate else None
+        )
+
+    @property
+    def active_count(self) -> int:
+        """排队中和运行中的任务数（含 call() 提交的调用）"""
+        with self._lock:
+            return self._active_locked()
+
+    def _active_locked(self) -> int:
+        """排队中和运行中的任务数（调用方需持有锁）"""
+        return self._calls + sum(1 for job in self._jobs.values() if not job.status.finished)
+
+    def _check_capacity_locked(self) -> None:
+        """排队已满时拒绝提交（调用方需持有锁）"""
+        self._evict_locked()
+        active = self._active_locked()
+        if active >= self.max_workers + self.max_queue:
+            raise QueueFullError(
+                f"too many migrate jobs: {active} active, limit {self.max_workers + self.max_queue}"
+            )
+
+    def submit(self, source_path: str, output_dir: str) -> MigrationJob:
+        """
+        提交迁移任务，立即返回
+
+        Raises:
+            QueueFullError: 运行中和排队中的任务已达上限
+        """
+        job = MigrationJob(
+            job_id=uuid.uuid4().hex,
+            source_path=source_path,
+            output_dir=output_dir
+        )
+        with self._lock:
+            self._check_capacity_locked()
+            self._jobs[job.job_id] = job
+        job._future = self._executor.submit(self._execute, job)
+        return job
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        在工作进程（或线程）中执行 fn(*args)，与迁移任务共用并发数和排队上限
+
+        不登记任务，结果通过返回的 Future 获取（可用 asyncio.wrap_future 等待）；
+        process 模式下 fn 和参数必须可被 pickle
+
+        Raises:
+            QueueFullError: 运行中和排队中的任务已达上限
+        """
+        with self._lock:
+            self._check_capacity_locked()
+            self._calls += 1
+        try:
+            return self._executor.submit(self._execute_call, fn, args)
+        except BaseException:
+            with self._lock:
+                self._calls -= 1
+            raise
+
+    def get(self, job_id: str) -> Optional[MigrationJob]:
+        """查询任务，不存在或已淘汰返回 None"""
+        with self._lock:
+            self._evict_locked()
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[MigrationJob]:
+        """列出所有保留中的任务"""
+        with self._lock:
+            self._evict_locked()
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[MigrationJob]:
+        """
+        取消任务
+
+        排队中的任务直接取消；运行中的任务无法中断，完成后丢弃结果并标记为已取消
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status.finished:
+                return job
+
+            if job._future is not None and job._future.cancel():
+                self._finish_locked(job, JobStatus.CANCELLED)
+            else:
+                job.cancel_requested = True
+            return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        优雅关闭：取消所有排队中的任务，等待运行中的任务结束后关闭工作进程
+
+        Args:
+            wait: 是否阻塞等待运行中的任务
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status == JobStatus.PENDING and job._future is not None and job._future.cancel():
+                    self._finish_locked(job, JobStatus.CANCELLED)
+        self._executor.shutdown(wait=wait)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _call_runner(self, job: MigrationJob) -> Any:
+        """在工作进程（或当前调度线程）中执行迁移"""
+        return self._call_in_worker(self._runner, job.source_path, job.output_dir)
+
+    def _execute_call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        """调度线程：执行 call() 提交的调用"""
+        try:
+            return self._call_in_worker(fn, *args)
+        finally:
+            with self._lock:
+                self._calls -= 1
+
+    def _call_in_worker(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """在工作进程（或当前调度线程）中执行 fn(*args)"""
+        pool = self._process_pool
+        if pool is None:
+            return fn(*args)
+        try:
+            return pool.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # 工作进程异常退出（如内存耗尽被杀），重建进程池供后续任务使用
+            with self._lock:
+                if self._process_pool is pool:
+                    self._process_pool = self._create_process_pool()
+            pool.shutdown(wait=False)
+            raise
+
+    def _execute(self, job: MigrationJob) -> None:
+        """工作线程：执行单个任务"""
+        with self._lock:
+            if job.cancel_requested:
+                self._finish_locked(job, JobStatus.CANCELLED)
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+
+        try:
+            result = self._call_runner(job)
+        except Exception as e:
+            with self._lock:
+                if job.cancel_requested:
+                    self._finish_locked(job, JobStatus.CANCELLED)
+                else:
+                    job.error = str(e)
+                    self._finish_locked(job, JobStatus.FAILED)
+            return
+
+        with self._lock:
+            if job.cancel_requested:
+                self._finish_locked(job, JobStatus.CANCELLED)
+            else:
+                job.result = result
+                self._finish_locked(job, JobStatus.SUCCEEDED)
+
+    def _finish_locked(self, job: MigrationJob, status: JobStatus) -> None:
+        """标记任务结束（调用方需持有锁）"""
+        job.status = status
+        job.finished_at = time.time()
+        job._future = None
+
+    def _evict_locked(self) -> None:
+        """淘汰过期和超出数量上限的已结束任务（调用方需持有锁）"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status.finished]
+
+        expired = [job for job in finished if now - job.finished_at > self.ttl_seconds]
+        for job in expired:
+            del self._jobs[job.job_id]
+
+        remaining = [job for job in finished if job.job_id in self._jobs]
+        overflow = len(remaining) - self.max_jobs
+        if overflow > 0:
+            remaining.sort(key=lambda job: job.finished_at)
+            for job in remaining[:overflow]:
+                del self._jobs[job.job_id]
+
+
+_default_manager: Optional[MigrationJobManager] = None
+_default_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> MigrationJobManager:
+    """获取进程级默认任务管理器"""
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = MigrationJobManager()
+        return _default_manager
+
+
+def shutdown_job_manager(wait: bool = True) -> None:
+    """关闭默认任务管理器"""
+    global _default_manager
+    with _default_manager_lock:
+        manager, _default_manager = _default_manager, None
+    if manager is not None:
+        manager.shutdown(wait=wait)
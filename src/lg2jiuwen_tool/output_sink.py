@@ -0,0 +1,88 @@
+"""
+LG2Jiuwen 输出目标
+
+代码生成和报告组件通过输出目标写出文件：
+- DiskSink：写入磁盘目录（默认行为）
+- MemorySink：保存在内存字典中，不触碰文件系统
+- ZipSink：边生成边写入 zip 流（可以是不可 seek 的流）
+
+写入路径统一使用相对于输出根目录、以 "/" 分隔的路径
+"""
+
+import os
+import zipfile
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Union
+
+
+Content = Union[str, bytes]
+
+
+def _to_bytes(content: Content) -> bytes:
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    return content
+
+
+class OutputSink(ABC):
+    """
+    输出目标基类
+
+    所有输出目标必须继承此类并实现 write 方法
+    """
+
+    @abstractmethod
+    def write(self, path: str, content: Content) -> str:
+        """
+        写出文件
+
+        Args:
+            path: 相对于输出根目录的路径（"/" 分隔）
+            content: 文件内容，str 按 utf-8 编码
+
+        Returns:
+            str: 记录在 generated_files 中的路径
+        """
+        pass
+
+    def close(self) -> None:
+        """结束写出"""
+
+
+class DiskSink(OutputSink):
+    """写入磁盘目录"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def write(self, path: str, content: Content) -> str:
+        full_path = os.path.join(self.root, *path.split("/"))
+        os.makedirs(os.path.dirname(full_path) or ".", exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(_to_bytes(content))
+        return full_path
+
+
+class MemorySink(OutputSink):
+    """保存在内存中，files 按写出顺序保存 {相对路径: 内容}"""
+
+    def __init__(self):
+        self.files: Dict[str, bytes] = {}
+
+    def write(self, path: str, content: Content) -> str:
+        self.files[path] = _to_bytes(content)
+        return path
+
+
+class ZipSink(OutputSink):
+    """写入 zip 流，close() 后写出目录区"""
+
+    def __init__(self, fileobj: IO[bytes], compression: int = zipfile.ZIP_DEFLATED):
+        self._zip = zipfile.ZipFile(fileobj, "w", compression=compression)
+
+    def write(self, path: str, content: Content) -> str:
+        self._zip.writestr(path, _to_bytes(content))
+        return path
+
+    def close(self) -> None:
+        self._zip.close()
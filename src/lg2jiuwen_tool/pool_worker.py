@@ -0,0 +1,208 @@
+"""
+预热解释器池的工作进程
+
+由 worker_pool.WorkerPool 以独立解释器启动（可能是 .venv 中的 Python），
+因此本文件只依赖标准库，不导入 lg2jiuwen_tool 包。
+
+协议：stdin / stdout 上逐行 JSON
+- 启动后预导入指定模块，输出 {"ready": true, "rss": ..., "startup": ...}
+- 请求 {"op": "main" | "run", "main_file": ..., "cwd": ..., "inputs": {...}}
+- 响应 {"exit_code": ..., "stdout": ..., "stderr": ..., "result": ..., "rss": ...}
+
+Agent 代码的 print 输出被重定向捕获，协议通道使用复制出的原始 stdout 描述符。
+项目模块和 run() 所在的命名空间在请求之间缓存，切换项目时换出 sys.modules 中的同名模块
+"""
+
+import collections
+import contextlib
+import importlib
+import io
+import json
+import os
+import runpy
+import sys
+import time
+import traceback
+
+
+def current_rss() -> int:
+    """当前常驻内存（字节）"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # 非 Linux 平台退化为峰值内存（macOS 单位为字节，其他为 KB）
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+# 每个工作进程缓存的项目数（超出时淘汰最久未使用的项目）
+MAX_CACHED_PROJECTS = 4
+
+
+class _Project:
+    """工作进程中缓存的项目：run() 所在的命名空间和项目自身的模块"""
+
+    def __init__(self, mtime_ns: int):
+        self.mtime_ns = mtime_ns
+        self.namespace = None            # run 请求的 runpy.run_path 结果（含生成代码缓存的工作流）
+        self.modules = {}                # 项目目录下的模块 {模块名: 模块}
+
+
+# 缓存的项目 {main_file: _Project}，按最近使用排序；工作进程被回收时随进程释放
+_projects = collections.OrderedDict()
+# 当前模块在 sys.modules 中的项目
+_active = None
+
+
+def _unload(project: "_Project") -> None:
+    """从 sys.modules 移除项目的模块（不同项目可能使用相同的包名）"""
+    for name, module in project.modules.items():
+        if sys.modules.get(name) is module:
+            del sys.modules[name]
+
+
+def _activate(main_file: str) -> "_Project":
+    """
+    切换到 main_file 所在的项目：换出当前项目的模块，换入缓存的模块
+
+    main_file 的 mtime 变化（重新生成）时丢弃缓存，重新加载
+    """
+    global _active
+    mtime_ns = os.stat(main_file).st_mtime_ns
+    project = _projects.get(main_file)
+    if project is not None and project.mtime_ns != mtime_ns:
+        _drop(main_file)
+        project = None
+
+    if _active is not None and _active != main_file and _active in _projects:
+        _unload(_projects[_active])
+    if project is None:
+        project = _projects[main_file] = _Project(mtime_ns)
+        while len(_projects) > MAX_CACHED_PROJECTS:
+            _drop(next(iter(_projects)))
+    else:
+        sys.modules.update(project.modules)
+    _projects.move_to_end(main_file)
+    _active = main_file
+    return project
+
+
+def _drop(main_file: str) -> None:
+    """丢弃缓存的项目"""
+    global _active
+    project = _projects.pop(main_file)
+    if _active == main_file:
+        _unload(project)
+        _active = None
+
+
+def _collect_modules(project: "_Project", root: str, loaded: set) -> None:
+    """
+    记录本次运行新导入、且位于 root 目录下的项目模块
+
+    第三方模块不记录，在进程中保持预热
+    """
+    root = os.path.abspath(root) + os.sep
+    for name, module in list(sys.modules.items()):
+        if name in loaded:
+            continue
+        path = getattr(module, "__file__", None)
+        if path and os.path.abspath(path).startswith(root):
+            project.modules[name] = module
+
+
+def execute(request: dict) -> dict:
+    """
+    执行一次请求
+
+    同一项目的模块在请求之间保留；run 请求的命名空间按 (main_file, mtime) 缓存，
+    生成代码中缓存的工作流因此可以跨请求复用。运行失败时丢弃项目缓存
+    """
+    main_file = os.path.abspath(request["main_file"])
+    cwd = request.get("cwd") or os.path.dirname(main_file)
+    # 生成的 main.py 以包方式导入（from agent.workflow import ...），需要项目上级目录
+    project_root = os.path.dirname(os.path.dirname(main_file))
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    result = None
+    old_cwd, old_path = os.getcwd(), list(sys.path)
+    project = None
+
+    try:
+        project = _activate(main_file)
+        loaded = set(sys.modules)
+        os.chdir(cwd)
+        sys.path[:0] = [os.path.dirname(main_file), project_root]
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                if request.get("op") == "run":
+                    if project.namespace is None:
+                        project.namespace = runpy.run_path(main_file, run_name="__lg2jiuwen_main__")
+                    result = project.namespace["run"](request.get("inputs") or {})
+                else:
+                    runpy.run_path(main_file, run_name="__main__")
+            except SystemExit as e:
+                if isinstance(e.code, int):
+                    exit_code = e.code
+                elif e.code is not None:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+        _collect_modules(project, os.path.dirname(main_file), loaded)
+    finally:
+        os.chdir(old_cwd)
+        sys.path[:] = old_path
+        if project is not None and exit_code != 0 and main_file in _projects:
+            _drop(main_file)
+
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "result": result,
+        "rss": current_rss(),
+    }
+
+
+def main() -> None:
+    start = time.perf_counter()
+
+    # 协议通道：复制原始 stdout，之后 fd 1 指向 stderr，防止 C 扩展直接写入破坏协议
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    def send(message: dict) -> None:
+        channel.write(json.dumps(message, ensure_ascii=False, default=str) + "\n")
+        channel.flush()
+
+    preload_errors = []
+    for name in filter(None, os.environ.get("LG2JIUWEN_PRELOAD", "").split(",")):
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            preload_errors.append(f"{name}: {e}")
+
+    send({
+        "ready": True,
+        "rss": current_rss(),
+        "startup": time.perf_counter() - start,
+        "preload_errors": preload_errors,
+    })
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            send(execute(json.loads(line)))
+        except Exception:
+            send({"exit_code": 1, "stdout": "", "stderr": traceback.format_exc(),
+                  "result": None, "rss": current_rss()})
+
+
+if __name__ == "__main__":
+    main()
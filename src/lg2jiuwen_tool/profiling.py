@@ -0,0 +1,303 @@
+"""
+LG2Jiuwen 迁移性能分析
+
+--profile 模式下为工作流的每个组件记录：
+- cProfile 统计：写出 profile/<组件>.pstats，可用 pstats / snakeviz 查看
+- 折叠栈：写出 profile/migration.collapsed，以组件名为根帧，
+  可直接交给 flamegraph.pl / speedscope 生成火焰图
+- tracemalloc：组件执行前后快照的差异，按代码行列出新增分配最多的位置
+- 耗时和 traced 内存峰值，汇总在 profile/summary.md
+
+产物与迁移输出写在一起，用户遇到迁移缓慢时可以直接发送，无需复现其环境
+"""
+
+import contextlib
+import cProfile
+import marshal
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .output_sink import OutputSink
+
+
+# 产物目录（相对于输出根目录）
+PROFILE_DIR = "profile"
+
+# 每个组件保留的分配位置数
+TOP_ALLOCATIONS = 10
+
+# 折叠栈的最大深度
+MAX_STACK_DEPTH = 64
+
+# tracemalloc 快照中忽略的帧（分析器自身、快照本身和导入机制的分配）
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# pstats 的函数键: (文件名, 行号, 函数名)
+FuncKey = Tuple[str, int, str]
+
+
+@dataclass
+class Allocation:
+    """组件执行期间新增的内存分配（按代码行汇总）"""
+    location: str                        # 文件:行号
+    size: int                            # 新增字节数
+    count: int                           # 新增内存块数
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"location": self.location, "size": self.size, "count": self.count}
+
+
+@dataclass
+class StageProfile:
+    """单个工作流组件的性能数据（多次调用累计）"""
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0                  # 执行期间 traced 内存峰值
+    allocations: List[Allocation] = field(default_factory=list)
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile, repr=False)
+
+    def add_allocations(self, diffs: List[tracemalloc.StatisticDiff], top: int) -> None:
+        """合并一次调用的快照差异，只保留新增最多的 top 个位置"""
+        merged = {a.location: a for a in self.allocations}
+        for diff in diffs:
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            location = f"{frame.filename}:{frame.lineno}"
+            current = merged.setdefault(location, Allocation(location, 0, 0))
+            current.size += diff.size_diff
+            current.count += diff.count_diff
+        self.allocations = sorted(merged.values(), key=lambda a: a.size, reverse=True)[:top]
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """cProfile 统计，没有采集到数据时返回 None"""
+        self.profile.create_stats()
+        if not self.profile.stats:
+            return None
+        return pstats.Stats(self.profile)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "peak_bytes": self.peak_bytes,
+            "allocations": [a.to_dict() for a in self.allocations],
+        }
+
+
+def _frame_label(func: FuncKey) -> str:
+    """折叠栈中的帧名: 函数名 (文件名:行号)"""
+    filename, line, name = func
+    if filename == "~":
+        # 内置函数
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats, root: str) -> Dict[str, int]:
+    """
+    由 cProfile 统计重建折叠栈
+
+    cProfile 只记录调用者 → 被调用者的边，这里从没有调用者的函数出发沿边展开，
+    被调用函数的时间按各调用边的累计时间占比分摊到调用路径上，结果为近似值
+
+    Args:
+        stats: cProfile 统计
+        root: 根帧名（组件名）
+
+    Returns:
+        {分号分隔的调用栈: 自身耗时（微秒）}
+    """
+    entries = stats.stats
+    callees: Dict[FuncKey, List[FuncKey]] = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller in callers:
+            callees.setdefault(caller, []).append(func)
+
+    stacks: Dict[str, float] = {}
+    on_stack: set = set()
+
+    def walk(func: FuncKey, path: str, ratio: float, depth: int) -> None:
+        _, _, self_time, _, _ = entries[func]
+        path = f"{path};{_frame_label(func)}"
+        if self_time * ratio > 0:
+            stacks[path] = stacks.get(path, 0.0) + self_time * ratio * 1e6
+        if depth >= MAX_STACK_DEPTH:
+            return
+        on_stack.add(func)
+        for callee in callees.get(func, ()):
+            if callee in on_stack:
+                continue
+            _, _, _, callee_time, callers = entries[callee]
+            edge_time = callers[func][3]
+            # 忽略分摊后不足 1 微秒的路径
+            if not callee_time or edge_time * ratio * 1e6 < 1:
+                continue
+            walk(callee, path, ratio * edge_time / callee_time, depth + 1)
+        on_stack.discard(func)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not any(caller in entries for caller in callers):
+            walk(func, root, 1.0, 1)
+
+    return {stack: round(us) for stack, us in stacks.items() if round(us) > 0}
+
+
+class MigrationProfiler:
+    """
+    工作流组件性能分析器
+
+    用法：
+        profiler = MigrationProfiler()
+        workflow = build_simple_migration_workflow(profiler=profiler)
+        with profiler.tracing():
+            await workflow.invoke(inputs, runtime)
+        profiler.write(sink)
+    """
+
+    def __init__(self, top: int = TOP_ALLOCATIONS):
+        self.stages: Dict[str, StageProfile] = {}
+        self._top = top
+
+    def instrument(self, workflow) -> None:
+        """此后通过 add_workflow_comp 添加的组件都会被分析"""
+        add_workflow_comp = workflow.add_workflow_comp
+
+        @wraps(add_workflow_comp)
+        def add_profiled_comp(comp_id, workflow_comp, **kwargs):
+            return add_workflow_comp(comp_id, self.wrap(comp_id, workflow_comp), **kwargs)
+
+        workflow.add_workflow_comp = add_profiled_comp
+
+    def wrap(self, name: str, comp):
+        """包装组件的 invoke，返回组件本身"""
+        invoke = comp.invoke
+
+        @wraps(invoke)
+        async def profiled(inputs, runtime, context):
+            with self.measure(name):
+                return await invoke(inputs, runtime, context)
+
+        comp.invoke = profiled
+        return comp
+
+    @contextlib.contextmanager
+    def tracing(self) -> Iterator[None]:
+        """在此期间开启 tracemalloc（已开启时沿用）"""
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """记录一次组件执行"""
+        stage = self.stages.setdefault(name, StageProfile(name))
+        before = self._snapshot()
+        if before is not None:
+            tracemalloc.reset_peak()
+
+        try:
+            stage.profile.enable()
+            profiling = True
+        except ValueError:
+            # 已有其他 profiler 处于活动状态（如外层正在分析）
+            profiling = False
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stage.seconds += time.perf_counter() - start
+            if profiling:
+                stage.profile.disable()
+            stage.calls += 1
+            if before is not None:
+                stage.peak_bytes = max(stage.peak_bytes, tracemalloc.get_traced_memory()[1])
+                after = self._snapshot()
+                if after is not None:
+                    stage.add_allocations(after.compare_to(before, "lineno"), self._top)
+
+    @staticmethod
+    def _snapshot() -> Optional[tracemalloc.Snapshot]:
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"stages": [stage.to_dict() for stage in self.stages.values()]}
+
+    def write(self, sink: OutputSink) -> List[str]:
+        """
+        写出 pstats、折叠栈和汇总
+
+        Returns:
+            写出的文件路径
+        """
+        files = []
+        stacks: Dict[str, int] = {}
+        for stage in self.stages.values():
+            stats = stage.stats()
+            if stats is None:
+                continue
+            # 与 pstats.Stats.dump_stats 的格式一致
+            files.append(sink.write(f"{PROFILE_DIR}/{_file_name(stage.name)}.pstats", marshal.dumps(stats.stats)))
+            stacks.update(collapsed_stacks(stats, stage.name))
+
+        collapsed = "".join(f"{stack} {us}\n" for stack, us in stacks.items())
+        files.append(sink.write(f"{PROFILE_DIR}/migration.collapsed", collapsed))
+        files.append(sink.write(f"{PROFILE_DIR}/summary.md", self.summary()))
+        return files
+
+    def summary(self) -> str:
+        """Markdown 汇总：各组件耗时、内存峰值和新增分配最多的位置"""
+        lines = [
+            "# 迁移性能分析",
+            "",
+            "| 组件 | 调用次数 | 耗时 (s) | 内存峰值 (MB) |",
+            "|------|---------|---------|--------------|",
+        ]
+        for stage in self.stages.values():
+            lines.append(
+                f"| {stage.name} | {stage.calls} | {stage.seconds:.3f} | {stage.peak_bytes / 1024 / 1024:.1f} |"
+            )
+
+        for stage in self.stages.values():
+            if not stage.allocations:
+                continue
+            lines.extend([
+                "",
+                f"## {stage.name} 新增分配",
+                "",
+                "| 位置 | 大小 (KB) | 内存块数 |",
+                "|------|----------|---------|",
+            ])
+            for allocation in stage.allocations:
+                lines.append(f"| {allocation.location} | {allocation.size / 1024:.1f} | {allocation.count} |")
+
+        return "\n".join(lines) + "\n"
+
+
+def _file_name(name: str) -> str:
+    """组件名转为安全的文件名"""
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)
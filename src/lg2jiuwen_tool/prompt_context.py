@@ -0,0 +1,94 @@
+"""
+LG2Jiuwen AI 提示词上下文精简
+
+按名字分析待处理代码，只向 AI 发送代码实际引用的上下文：
+- 状态字段：代码中以 state["x"] / state.get("x") / state.x 访问的字段；
+  state 被整体使用（如作为参数传递）时保留全部字段
+- 可用工具：代码中出现工具名，或引用了工具映射变量（如 tool_map[name]）时保留全部工具
+- 局部变量：代码中出现的已有局部变量
+"""
+
+import ast
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+
+_STATE_NAMES = ("state", "State")
+
+# 访问全部字段的 state 方法
+_WHOLE_STATE_METHODS = ("items", "keys", "values", "copy")
+
+
+def referenced_names(code: str) -> Tuple[Set[str], bool]:
+    """
+    收集代码中出现的名字
+
+    Returns:
+        (名字集合, 是否整体使用了 state)
+        名字包括变量名、属性名和字符串常量；代码无法解析时按标识符匹配，并视为整体使用 state
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return set(_IDENTIFIER.findall(code)), True
+
+    names: Set[str] = set()
+    state_uses = 0
+    field_uses = 0
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+            if node.id in _STATE_NAMES:
+                state_uses += 1
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+            if isinstance(node.value, ast.Name) and node.value.id in _STATE_NAMES:
+                if node.attr not in _WHOLE_STATE_METHODS:
+                    field_uses += 1
+        elif isinstance(node, ast.Subscript):
+            if isinstance(node.value, ast.Name) and node.value.id in _STATE_NAMES:
+                field_uses += 1
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str):
+            names.add(node.value)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+
+    # 除字段访问外的 state 使用（传参、遍历等）都视为整体使用
+    return names, state_uses > field_uses
+
+
+def select_referenced(candidates: Iterable[str], names: Set[str]) -> List[str]:
+    """保留在 names 中出现的候选名（不区分大小写），顺序不变"""
+    lowered = {name.lower() for name in names}
+    return [c for c in candidates if c.lower() in lowered]
+
+
+def minimal_context(
+    code: str,
+    context: Dict[str, Any],
+    tool_vars: Optional[Iterable[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    计算待处理代码实际需要的上下文
+
+    Args:
+        code: 待处理代码
+        context: PendingItem.context（state_fields / available_tools / local_names）
+        tool_vars: 工具映射等工具相关的变量名，代码引用它们时保留全部工具
+
+    Returns:
+        精简后的 state_fields / available_tools / local_names
+    """
+    names, whole_state = referenced_names(code)
+    state_fields = context.get("state_fields", [])
+    tools = context.get("available_tools", [])
+
+    selected = {
+        "state_fields": list(state_fields) if whole_state else select_referenced(state_fields, names),
+        "available_tools": list(tools) if names & set(tool_vars or ()) else select_referenced(tools, names),
+    }
+    if "local_names" in context:
+        selected["local_names"] = [n for n in context["local_names"] if n in names]
+    return selected
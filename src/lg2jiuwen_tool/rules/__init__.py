@@ -1,19 +1,39 @@
 """转换规则模块"""
 
-from .base import BaseRule, ConversionResult
-from .state_rules import StateAccessRule, StateAssignRule
-from .llm_rules import LLMInvokeRule
-from .tool_rules import ToolCallRule, ToolMapCallRule
-from .edge_rules import ReturnRule, EdgeExtractor
-
-__all__ = [
-    "BaseRule",
-    "ConversionResult",
-    "StateAccessRule",
-    "StateAssignRule",
-    "LLMInvokeRule",
-    "ToolCallRule",
-    "ToolMapCallRule",
-    "ReturnRule",
-    "EdgeExtractor",
-]
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import BaseRule, ConversionResult
+    from .state_rules import StateAccessRule, StateAssignRule
+    from .llm_rules import LLMInvokeRule
+    from .tool_rules import ToolCallRule, ToolMapCallRule
+    from .edge_rules import ReturnRule, EdgeExtractor
+
+# 延迟导入：名称 -> 所在子模块，只加载实际用到的规则
+_LAZY_IMPORTS = {
+    "BaseRule": ".base",
+    "ConversionResult": ".base",
+    "StateAccessRule": ".state_rules",
+    "StateAssignRule": ".state_rules",
+    "LLMInvokeRule": ".llm_rules",
+    "ToolCallRule": ".tool_rules",
+    "ToolMapCallRule": ".tool_rules",
+    "ReturnRule": ".edge_rules",
+    "EdgeExtractor": ".edge_rules",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
@@ -6,11 +6,16 @@
 
 import ast
 import copy
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 
+# 规则无法转换的语句在部分转换结果中的占位行
+STATEMENT_PLACEHOLDER = "__AI_STATEMENT_{index}__"
+
+
 class StateToInputsTransformer(ast.NodeTransformer):
     """
     AST 转换器：
@@ -287,15 +292,59 @@ class PassthroughRule(BaseRule):
         return ConversionResult.success_result(code=code, inputs=inputs_used, outputs=outputs_used)
 
 
+@dataclass
+class RuleStats:
+    """单条规则的计数"""
+    attempts: int = 0                    # matches() 调用次数
+    hits: int = 0                        # matches() 返回 True 的次数
+    failures: int = 0                    # convert() 返回失败的次数
+    seconds: float = 0.0                 # convert() 累计耗时
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "failures": self.failures,
+            "seconds": self.seconds,
+        }
+
+
+@dataclass
+class RuleChainStats:
+    """
+    规则链计数
+
+    - rules: 按规则类名统计匹配和转换
+    - passthrough: 由 PassthroughRule 兜底的语句类型（没有专门的规则）
+    - failed: 没有规则匹配或转换失败的语句类型（交给 AI 或留 TODO）
+    """
+    rules: Dict[str, RuleStats] = field(default_factory=dict)
+    passthrough: Dict[str, int] = field(default_factory=dict)
+    failed: Dict[str, int] = field(default_factory=dict)
+
+    def rule(self, rule: BaseRule) -> RuleStats:
+        """获取规则的计数（按规则链顺序创建）"""
+        return self.rules.setdefault(type(rule).__name__, RuleStats())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rules": {name: stats.to_dict() for name, stats in self.rules.items()},
+            "passthrough": dict(self.passthrough),
+            "failed": dict(self.failed),
+        }
+
+
 class RuleChain:
     """
     规则链
 
-    按顺序尝试应用多个规则
+    按顺序尝试应用多个规则。collect_stats=True 时在 stats 中记录每条规则的
+    匹配次数、命中、失败和转换耗时，以及兜底 / 失败的语句类型
     """
 
-    def __init__(self, rules: Optional[List[BaseRule]] = None):
+    def __init__(self, rules: Optional[List[BaseRule]] = None, collect_stats: bool = False):
         self.rules: List[BaseRule] = rules or []
+        self.stats: Optional[RuleChainStats] = RuleChainStats() if collect_stats else None
 
     def add_rule(self, rule: BaseRule) -> "RuleChain":
         """添加规则"""
@@ -308,11 +357,34 @@ class RuleChain:
 
         按顺序尝试每个规则，返回第一个匹配的结果
         """
+        if self.stats is not None:
+            return self._try_convert_counted(node, self.stats)
         for rule in self.rules:
             if rule.matches(node):
                 return rule.convert(node)
         return ConversionResult.failure(error_message="No matching rule")
 
+    def _try_convert_counted(self, node: ast.AST, stats: RuleChainStats) -> ConversionResult:
+        """try_convert 的计数版本"""
+        node_type = type(node).__name__
+        for rule in self.rules:
+            counter = stats.rule(rule)
+            counter.attempts += 1
+            if not rule.matches(node):
+                continue
+            counter.hits += 1
+            start = time.perf_counter()
+            result = rule.convert(node)
+            counter.seconds += time.perf_counter() - start
+            if not result.success:
+                counter.failures += 1
+                stats.failed[node_type] = stats.failed.get(node_type, 0) + 1
+            elif isinstance(rule, PassthroughRule):
+                stats.passthrough[node_type] = stats.passthrough.get(node_type, 0) + 1
+            return result
+        stats.failed[node_type] = stats.failed.get(node_type, 0) + 1
+        return ConversionResult.failure(error_message="No matching rule")
+
     def convert_statements(
         self,
         statements: List[ast.stmt]
@@ -320,12 +392,16 @@ class RuleChain:
         """
         转换语句列表
 
-        返回合并的转换结果
+        返回合并的转换结果。有语句无法转换时返回失败结果，
+        但 code 中仍保留已转换的语句：每段连续的失败语句替换为一行占位符
+        （STATEMENT_PLACEHOLDER），failed_lines 中记录每条失败语句对应的占位符
         """
         converted_lines: List[str] = []
         all_inputs: Set[str] = set()
         all_outputs: Set[str] = set()
         failed_lines: List[Dict[str, Any]] = []
+        span_count = 0
+        previous_failed = False
 
         for stmt in statements:
             # 跳过 docstring
@@ -339,14 +415,27 @@ class RuleChain:
                 converted_lines.append(result.code)
                 all_inputs.update(result.inputs)
                 all_outputs.update(result.outputs)
+                previous_failed = False
             else:
+                # 连续的失败语句共用一个占位符
+                if not previous_failed:
+                    span_count += 1
+                    converted_lines.append(STATEMENT_PLACEHOLDER.format(index=span_count))
                 failed_lines.append({
                     "line": getattr(stmt, "lineno", 0),
-                    "code": ast.unparse(stmt)
+                    "code": ast.unparse(stmt),
+                    "placeholder": converted_lines[-1]
                 })
+                previous_failed = True
 
         if failed_lines:
-            return ConversionResult.failure(failed_lines=failed_lines)
+            return ConversionResult(
+                success=False,
+                code="\n".join(converted_lines),
+                inputs=list(all_inputs),
+                outputs=list(all_outputs),
+                failed_lines=failed_lines
+            )
 
         return ConversionResult.success_result(
             code="\n".join(converted_lines),
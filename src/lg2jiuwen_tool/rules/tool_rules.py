@@ -15,10 +15,11 @@ class ToolCallRule(StatementRule):
     工具调用规则
 
     转换为 openJiuwen 格式:
-    - result = tool.invoke({"arg": value}) → result = tool.invoke(inputs={"arg": value})
-    - result = tool(arg=value) → result = tool.invoke(inputs={"arg": value})
+    - result = tool.invoke({"arg": value}) → result = await call_tool(tool, {"arg": value})
+    - result = tool(arg=value) → result = await call_tool(tool, {"arg": value})
 
-    openJiuwen 中工具需要通过 .invoke(inputs={...}) 方法调用
+    openJiuwen 中工具需要通过 .invoke(inputs={...}) 方法调用，
+    组件中统一经由生成的 call_tool 调用，同步工具在线程池中执行，不阻塞事件循环
     """
 
     def __init__(self, tool_names: Optional[Set[str]] = None):
@@ -74,7 +75,7 @@ class ToolCallRule(StatementRule):
         return ConversionResult.failure()
 
     def _convert_tool_call(self, node: ast.Call) -> str:
-        """转换工具调用表达式为 tool.invoke(inputs={...}) 格式"""
+        """转换工具调用表达式为 await call_tool(tool, {...}) 格式"""
         tool_name = ""
         inputs_dict_parts = []
 
@@ -95,12 +96,12 @@ class ToolCallRule(StatementRule):
                             inputs_dict_parts.append(f'"{key.s}": {ast.unparse(value)}')
                 else:
                     # 其他情况直接使用
-                    return f'{tool_name}.invoke(inputs={ast.unparse(arg)})'
+                    return f'await call_tool({tool_name}, {ast.unparse(arg)})'
 
             # 处理 keyword 参数 (如 inputs=...)
             for kw in node.keywords:
                 if kw.arg == "inputs":
-                    return f'{tool_name}.invoke(inputs={ast.unparse(kw.value)})'
+                    return f'await call_tool({tool_name}, {ast.unparse(kw.value)})'
 
         elif isinstance(node.func, ast.Name):
             # 直接调用 tool(...) 格式
@@ -118,7 +119,7 @@ class ToolCallRule(StatementRule):
 
         # 构建 inputs 字典
         inputs_dict = "{" + ", ".join(inputs_dict_parts) + "}"
-        return f'{tool_name}.invoke(inputs={inputs_dict})'
+        return f'await call_tool({tool_name}, {inputs_dict})'
 
 
 class ToolMapCallRule(StatementRule):
@@ -126,11 +127,12 @@ class ToolMapCallRule(StatementRule):
     工具映射调用规则
 
     处理 tool_map[key].run(arg) 或 tool_map[key].invoke(arg) 模式
-    转换为 openJiuwen 格式: invoke_tool(key, arg)
+    转换为 openJiuwen 格式: await invoke_tool(key, arg)
 
     在 openJiuwen 中，@tool 装饰的函数返回 LocalFunction，
     需要通过 .invoke(inputs={param_name: arg}) 调用
-    由于不同工具有不同参数名，使用 invoke_tool 辅助函数处理
+    由于不同工具有不同参数名，使用 invoke_tool 辅助函数处理；
+    invoke_tool 为异步函数，同步工具在线程池中执行
     """
 
     def matches(self, node: ast.AST) -> bool:
@@ -151,7 +153,7 @@ class ToolMapCallRule(StatementRule):
         return False
 
     def convert(self, node: ast.AST) -> ConversionResult:
-        """转换 tool_map[key].run(arg) → invoke_tool(key, arg)"""
+        """转换 tool_map[key].run(arg) → await invoke_tool(key, arg)"""
         call_node = None
         target = None
 
@@ -173,8 +175,8 @@ class ToolMapCallRule(StatementRule):
         if call_node.args:
             arg = ast.unparse(call_node.args[0])
 
-        # 生成 invoke_tool 调用: invoke_tool(key, arg)
-        call_code = f'invoke_tool({key}, {arg})'
+        # 生成 invoke_tool 调用: await invoke_tool(key, arg)
+        call_code = f'await invoke_tool({key}, {arg})'
 
         if target:
             return ConversionResult.success_result(code=f'{target} = {call_code}')
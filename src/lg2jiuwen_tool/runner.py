@@ -0,0 +1,250 @@
+"""
+LG2Jiuwen 运行器
+
+以异步子进程运行迁移后的 Agent：
+- 不阻塞事件循环，每次运行有超时限制
+- 全局并发数受限
+- stdout / stderr 增量输出，记录退出码和耗时
+"""
+
+import asyncio
+import codecs
+import os
+import platform
+import signal
+import sys
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+
+@dataclass
+class RunTarget:
+    """运行目标"""
+    main_file: str                       # 入口文件
+    cwd: str                             # 工作目录
+
+
+@dataclass
+class RunResult:
+    """运行结果"""
+    exit_code: Optional[int]             # 退出码（被信号终止时为负数）
+    stdout: str                          # 标准输出
+    stderr: str                          # 标准错误
+    duration: float                      # 耗时（秒）
+    timed_out: bool = False              # 是否超时被终止
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为接口返回格式"""
+        return asdict(self)
+
+
+def resolve_run_target(source_path: str) -> RunTarget:
+    """
+    解析运行目标（路径相对于 BASE_DIR）
+
+    - 目录：运行其中的 main.py
+    - Python 文件：直接运行
+
+    Raises:
+        ValueError: 路径不存在或不可运行
+    """
+    base_dir = os.getenv("BASE_DIR", "/")
+    source_path = os.path.join(base_dir, source_path.strip(os.path.sep))
+    if not os.path.exists(source_path):
+        raise ValueError(f"{source_path} does not exist")
+
+    if Path(source_path).is_dir():
+        main_file = os.path.join(source_path, "main.py")
+        if not os.path.exists(main_file):
+            raise ValueError(f"{source_path} is a directory but does not contain main.py")
+        return RunTarget(main_file=main_file, cwd=source_path)
+    if source_path.endswith(".py"):
+        return RunTarget(main_file=source_path, cwd=os.path.dirname(source_path))
+    raise ValueError(f"{source_path} is not a directory or a Python file")
+
+
+def get_python_executable() -> str:
+    """优先使用当前目录下 .venv 中的解释器，否则使用当前解释器"""
+    if platform.system().lower() == "windows":
+        venv_python = os.path.join(os.getcwd(), ".venv", "Scripts", "python.exe")
+    else:
+        venv_python = os.path.join(os.getcwd(), ".venv", "bin", "python")
+    return venv_python if os.path.exists(venv_python) else sys.executable
+
+
+class AgentRunner:
+    """
+    Agent 运行器
+
+    使用 asyncio 子进程执行，参数列表方式启动（不经过 shell）
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        初始化运行器
+
+        Args:
+            max_concurrent: 最大并发运行数，默认读取 LG2JIUWEN_MAX_RUNS（默认 4）
+            timeout: 默认超时秒数，默认读取 LG2JIUWEN_RUN_TIMEOUT（默认 300）
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("LG2JIUWEN_MAX_RUNS", "4"))
+        if timeout is None:
+            timeout = float(os.getenv("LG2JIUWEN_RUN_TIMEOUT", "300"))
+        self.max_concurrent = max(1, max_concurrent)
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取绑定当前事件循环的信号量"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _spawn(self, target: RunTarget) -> asyncio.subprocess.Process:
+        """启动子进程（独立进程组，便于超时后连同子进程一起终止）"""
+        env = dict(os.environ, PYTHONUNBUFFERED="1")
+        return await asyncio.create_subprocess_exec(
+            get_python_executable(), target.main_file,
+            cwd=target.cwd,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+
+    def _kill(self, proc: asyncio.subprocess.Process) -> None:
+        """终止子进程及其进程组"""
+        if proc.returncode is not None:
+            return
+        try:
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def stream(
+        self,
+        target: RunTarget,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        运行并增量产出输出事件
+
+        Yields:
+            {"stream": "stdout" | "stderr", "data": str}
+            最后一条为 {"event": "exit", "exit_code": ..., "duration": ..., "timed_out": ...}
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            deadline = loop.time() + timeout
+            proc = await self._spawn(target)
+            queue: asyncio.Queue = asyncio.Queue()
+
+            async def pump(reader: asyncio.StreamReader, name: str) -> None:
+                decoder = codecs.getincrementaldecoder("utf-8")("replace")
+                while True:
+                    chunk = await reader.read(4096)
+                    if not chunk:
+                        break
+                    text = decoder.decode(chunk)
+                    if text:
+                        await queue.put((name, text))
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    await queue.put((name, tail))
+                await queue.put((name, None))
+
+            pumps = [
+                asyncio.create_task(pump(proc.stdout, "stdout")),
+                asyncio.create_task(pump(proc.stderr, "stderr")),
+            ]
+            timed_out = False
+            try:
+                open_streams = len(pumps)
+                while open_streams:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    try:
+                        name, text = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                        break
+                    if text is None:
+                        open_streams -= 1
+                        continue
+                    yield {"stream": name, "data": text}
+
+                if timed_out:
+                    self._kill(proc)
+                else:
+                    try:
+                        await asyncio.wait_for(proc.wait(), max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        timed_out = True
+                        self._kill(proc)
+                exit_code = await proc.wait()
+            finally:
+                # 客户端断开或异常时确保子进程被回收
+                if proc.returncode is None:
+                    self._kill(proc)
+                    await proc.wait()
+                for task in pumps:
+                    task.cancel()
+
+            yield {
+                "event": "exit",
+                "exit_code": exit_code,
+                "duration": time.perf_counter() - start,
+                "timed_out": timed_out,
+            }
+
+    async def run(
+        self,
+        target: RunTarget,
+        timeout: Optional[float] = None
+    ) -> RunResult:
+        """运行并收集全部输出"""
+        outputs: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        exit_event: Dict[str, Any] = {}
+        async for event in self.stream(target, timeout):
+            if "stream" in event:
+                outputs[event["stream"]].append(event["data"])
+            else:
+                exit_event = event
+
+        return RunResult(
+            exit_code=exit_event.get("exit_code"),
+            stdout="".join(outputs["stdout"]),
+            stderr="".join(outputs["stderr"]),
+            duration=exit_event.get("duration", 0.0),
+            timed_out=exit_event.get("timed_out", False),
+        )
+
+
+_default_runner: Optional[AgentRunner] = None
+
+
+def get_agent_runner() -> AgentRunner:
+    """获取进程级默认运行器"""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = AgentRunner()
+    return _default_runner
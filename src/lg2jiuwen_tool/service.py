@@ -4,20 +4,16 @@ LG2Jiuwen 服务接口
 提供迁移服务的编程接口
 """
 
-import asyncio
+import io
 import os
 import subprocess
-import platform
-from dataclasses import dataclass
-from pathlib import Path
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
-from openjiuwen.core.runtime.workflow import WorkflowRuntime
+from .output_sink import DiskSink, MemorySink, OutputSink, ZipSink
 
-from .workflow.migration_workflow import (
-    build_migration_workflow,
-    build_simple_migration_workflow,
-)
+# openjiuwen 和工作流组件在 migrate_async 中延迟导入，
+# 避免 CLI 的 --help / --version 等轻量操作加载重量级依赖
 
 
 @dataclass
@@ -26,7 +22,19 @@ class MigrationOptions:
     use_ai: bool = True                  # 是否使用 AI 处理
     preserve_comments: bool = True       # 是否保留注释
     include_report: bool = True          # 是否生成报告
+    include_ir: bool = True              # 是否写出 IR JSON
     verbose: bool = False                # 是否输出详细信息
+    streaming: bool = False              # 是否逐文件流式提取（大型项目低内存模式）
+    pipelined: bool = False              # 读取、解析与符号扫描 / 提取经有界队列流水线执行（与 streaming 同时指定时使用 streaming）
+    output_mode: str = "disk"            # 输出方式: disk / memory / zip
+    ai_batch_tokens: int = 0             # AI 批量转换的 token 预算（0 表示逐项请求）
+    ai_hybrid: bool = False              # 只把规则无法转换的语句交给 AI（保留规则转换结果）
+    ai_prompt_tokens: int = 0            # 每次 AI 请求的提示词 token 预算（0 表示不限）
+    ai_models: Optional[List[str]] = None  # AI 模型分级（从快到慢），结果校验失败时升级；None 使用默认模型
+    ai_pipeline: bool = False            # 待处理项一生成即派发给 AI，与后续文件的提取重叠
+    ai_max_concurrency: int = 4          # 同时进行的 AI 请求数上限（流水线模式下派发的请求同样受限）
+    profile: bool = False                # 记录各组件的 cProfile / tracemalloc 数据，写入输出的 profile/ 目录
+    rule_stats: bool = False             # 记录规则链的逐规则计数（匹配、命中、失败、耗时）
 
 
 @dataclass
@@ -38,22 +46,32 @@ class MigrationResult:
     rule_count: int                      # 规则处理数量
     ai_count: int                        # AI 处理数量
     errors: List[str]                    # 错误信息
+    files: Dict[str, bytes] = field(default_factory=dict)  # memory 模式: {相对路径: 内容}
+    archive: Optional[bytes] = None      # zip 模式: 生成文件的 zip 包
+    prompt_stats: List[Dict[str, Any]] = field(default_factory=list)  # 每次 AI 请求的提示词 token 数
+    profile: Dict[str, Any] = field(default_factory=dict)  # profile 模式: 各组件耗时、内存和产物文件
+    rule_stats: Dict[str, Any] = field(default_factory=dict)  # rule_stats 模式: 逐规则计数和兜底 / 失败的语句类型
+    load_errors: List[str] = field(default_factory=list)  # 读取或解析失败、未参与迁移的文件
 
 
 async def migrate_async(
     source_path: str,
     output_dir: str = "./output",
     options: Optional[MigrationOptions] = None,
-    llm=None
+    llm=None,
+    sink: Optional[OutputSink] = None,
+    ast_cache=None
 ) -> MigrationResult:
     """
     异步迁移 LangGraph 代码到 openJiuwen
 
     Args:
         source_path: 源文件或目录路径
-        output_dir: 输出目录
+        output_dir: 输出目录（disk 模式）
         options: 迁移选项
         llm: 可选的 LLM 实例
+        sink: 自定义输出目标，指定时忽略 options.output_mode，由调用方负责 close()
+        ast_cache: AST 缓存（components.ast_parser.ASTCache），常驻的监听会话用来复用未修改文件的 AST
 
     Returns:
         MigrationResult: 迁移结果
@@ -71,15 +89,59 @@ async def migrate_async(
             errors=[f"源路径不存在: {source_path}"]
         )
 
-    # 创建输出目录
-    os.makedirs(output_dir, exist_ok=True)
+    archive_buffer = None
+    if sink is None:
+        if options.output_mode == "memory":
+            sink = MemorySink()
+        elif options.output_mode == "zip":
+            archive_buffer = io.BytesIO()
+            sink = ZipSink(archive_buffer)
+        elif options.output_mode == "disk":
+            # 创建输出目录
+            os.makedirs(output_dir, exist_ok=True)
+        else:
+            return MigrationResult(
+                success=False,
+                generated_files=[],
+                report="",
+                rule_count=0,
+                ai_count=0,
+                errors=[f"不支持的输出方式: {options.output_mode}"]
+            )
 
     try:
-        # 构建工作流
+        from openjiuwen.core.runtime.workflow import WorkflowRuntime
+
+        from .workflow.migration_workflow import (
+            build_migration_workflow,
+            build_simple_migration_workflow,
+        )
+
+        profiler = None
+        if options.profile:
+            from .profiling import MigrationProfiler
+            profiler = MigrationProfiler()
+
+        # 构建工作流（按选项裁剪报告、IR 等输出阶段）
+        stage_options = {
+            "streaming": options.streaming,
+            "pipelined": options.pipelined,
+            "include_report": options.include_report,
+            "include_ir": options.include_ir,
+            "sink": sink,
+            "profiler": profiler,
+            "rule_stats": options.rule_stats,
+            "ast_cache": ast_cache,
+        }
         if options.use_ai and llm:
-            workflow = build_migration_workflow(llm=llm)
+            workflow = build_migration_workflow(
+                llm=llm, ai_batch_tokens=options.ai_batch_tokens, ai_hybrid=options.ai_hybrid,
+                ai_prompt_tokens=options.ai_prompt_tokens, ai_models=options.ai_models,
+                ai_pipeline=options.ai_pipeline, ai_max_concurrency=options.ai_max_concurrency,
+                **stage_options
+            )
         else:
-            workflow = build_simple_migration_workflow()
+            workflow = build_simple_migration_workflow(**stage_options)
 
         # 创建运行时
         runtime = WorkflowRuntime()
@@ -90,21 +152,27 @@ async def migrate_async(
             "output_dir": output_dir
         }
 
-        result = await workflow.invoke(inputs, runtime)
+        if profiler is not None:
+            with profiler.tracing():
+                result = await workflow.invoke(inputs, runtime)
+        else:
+            result = await workflow.invoke(inputs, runtime)
         result = result.result
         # 提取结果 - WorkflowOutput 对象需要通过 .output 属性访问
         output_data = result["output"] if "output" in result else result
         if isinstance(output_data, dict):
             generated_files = output_data.get("generated_files", [])
-            report = output_data.get("report", "")
+            report = output_data.get("report") or ""
+            stats = output_data.get("stats") or {}
         else:
             generated_files = getattr(output_data, 'generated_files', [])
-            report = getattr(output_data, 'report', "")
+            report = getattr(output_data, 'report', None) or ""
+            stats = getattr(output_data, 'stats', None) or {}
 
-        # 从报告中提取统计
-        rule_count = 0
-        ai_count = 0
-        if "规则处理" in report:
+        # 优先使用生成阶段透传的统计，不生成报告时同样可用
+        rule_count = stats.get("rule_count", 0)
+        ai_count = stats.get("ai_count", 0)
+        if not stats and "规则处理" in report:
             # 简单解析
             import re
             rule_match = re.search(r"规则处理 \| (\d+)", report)
@@ -114,13 +182,30 @@ async def migrate_async(
             if ai_match:
                 ai_count = int(ai_match.group(1))
 
+        profile = {}
+        if profiler is not None:
+            # 产物与生成的代码写在一起（zip 模式须在 close 之前写入）
+            profile = profiler.to_dict()
+            profile["files"] = profiler.write(sink or DiskSink(output_dir))
+
+        archive = None
+        if archive_buffer is not None:
+            sink.close()
+            archive = archive_buffer.getvalue()
+
         return MigrationResult(
             success=True,
             generated_files=generated_files,
             report=report,
             rule_count=rule_count,
             ai_count=ai_count,
-            errors=[]
+            errors=[],
+            files=dict(sink.files) if isinstance(sink, MemorySink) else {},
+            archive=archive,
+            prompt_stats=stats.get("prompts", []),
+            profile=profile,
+            rule_stats=stats.get("rules") or {},
+            load_errors=stats.get("load_errors", [])
         )
 
     except Exception as e:
@@ -132,6 +217,10 @@ async def migrate_async(
             ai_count=0,
             errors=[str(e)]
         )
+    finally:
+        if archive_buffer is not None:
+            # 失败时同样关闭自建的 zip 写入器（成功路径已关闭，重复关闭无副作用）
+            sink.close()
 
 
 async def migrate_new(
@@ -188,45 +277,36 @@ async def migrate(source_path: str, output_dir: str) -> str:
     return result_file
 
 
-def get_file_content(file_path: str) -> str:
-    """获取文件内容"""
+def resolve_file_path(file_path: str) -> str:
+    """将接口传入的路径解析为 BASE_DIR 下的绝对路径"""
     base_dir = os.getenv("BASE_DIR", "/")
     file_path = os.path.join(base_dir, file_path.strip(os.path.sep))
     if not os.path.exists(file_path):
         raise ValueError(f"{file_path} does not exist")
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
+    return file_path
 
 
-def run(source_path: str) -> str:
-    """运行指定的Python文件或目录下的main.py文件"""
-    base_dir = os.getenv("BASE_DIR","/")
-    source_path = os.path.join(base_dir,source_path.strip(os.path.sep))
-    if not os.path.exists(source_path):
-        raise ValueError(f"{source_path} does not exist")
+def get_file_content(file_path: str) -> str:
+    """获取文件内容（经 mtime 校验的内存缓存）"""
+    from .file_cache import get_file_cache
+    return get_file_cache().get(resolve_file_path(file_path)).text()
 
-    cmd = f"source {os.path.join(os.getcwd(),".venv/bin/activate")}"
-    if platform.system().lower() == "windows":
-        cmd = f"{os.path.join(os.getcwd(),".venv/Scripts/activate.bat")}"
-    shell = os.getenv("SHELL",None)
-    if Path(source_path).is_dir():
-        if not os.path.exists(os.path.join(source_path,"main.py")):
-            raise ValueError(f"{source_path} is a directory but does not contain main.py")
-        main_file = os.path.join(source_path,"main.py")
-        result = subprocess.run(
-            f"{cmd} && python {main_file}", shell=True, executable=shell, cwd=source_path, capture_output=True
-        )
-    elif source_path.endswith(".py"):
-        result = subprocess.run(
-            f"{cmd} && python {source_path}",
-            shell=True,
-            executable=shell,
-            cwd=os.path.dirname(source_path),
-            capture_output=True,
-        )
-    else:
-        raise ValueError(f"{source_path} is not a directory or a Python file")
 
+def run(source_path: str, timeout: Optional[float] = None) -> str:
+    """
+    运行指定的Python文件或目录下的main.py文件（同步，兼容旧版本）
+
+    异步、带并发限制和增量输出的版本见 runner.AgentRunner
+    """
+    from .runner import get_python_executable, resolve_run_target
+
+    target = resolve_run_target(source_path)
+    result = subprocess.run(
+        [get_python_executable(), target.main_file],
+        cwd=target.cwd,
+        capture_output=True,
+        timeout=timeout,
+    )
     return result.stdout.decode("utf-8")
 
 
@@ -282,6 +362,7 @@ class MigrationService:
         output_dir: str = "./output"
     ) -> MigrationResult:
         """同步迁移单个文件"""
+        import asyncio
         return asyncio.run(self.migrate_file(source_file, output_dir))
 
     def migrate_project_sync(
@@ -290,4 +371,5 @@ class MigrationService:
         output_dir: str = "./output"
     ) -> MigrationResult:
         """同步迁移项目目录"""
+        import asyncio
         return asyncio.run(self.migrate_project(source_dir, output_dir))
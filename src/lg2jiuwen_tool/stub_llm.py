@@ -0,0 +1,254 @@
+"""
+LG2Jiuwen 本地 LLM 替身
+
+不访问网络、结果确定的 LLM，用于基准测试和离线运行：
+- 接口与 openJiuwen 的 OpenAIChatModel 一致（invoke / ainvoke(model_name, messages)），
+  可直接传给 MigrationService(llm=...) / AISemanticComp，或由生成代码的 get_llm() 返回
+- as_langchain() 返回 LangChain 聊天模型，用于替换 LangGraph 源代码中的 ChatOpenAI
+- 按提示词哈希回放录制的响应，未命中时返回默认响应
+- 可模拟延迟、抖动、限流和随机失败（固定随机种子，结果可复现）
+
+通过环境变量启用（CLI --use-ai 和生成代码的 get_llm() 会读取）：
+    LG2JIUWEN_STUB_LLM           录制文件路径（JSON: {提示词哈希: 响应}），或 "1" 表示不使用录制
+    LG2JIUWEN_STUB_LATENCY       每次调用的延迟秒数（默认 0）
+    LG2JIUWEN_STUB_JITTER        延迟抖动秒数（均匀分布 ±jitter，默认 0）
+    LG2JIUWEN_STUB_RATE_LIMIT    每秒最多调用次数，超出时抛出 StubRateLimitError（默认不限）
+    LG2JIUWEN_STUB_FAILURE_RATE  随机失败概率（默认 0）
+    LG2JIUWEN_STUB_SEED          随机种子（默认 0）
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+DEFAULT_RESPONSE = "stub response"
+
+ENV_PREFIX = "LG2JIUWEN_STUB_"
+
+# LangChain 消息类型 → OpenAI 角色
+_LANGCHAIN_ROLES = {"human": "user", "ai": "assistant", "system": "system", "tool": "tool"}
+
+
+class StubLLMError(RuntimeError):
+    """模拟的 LLM 调用失败"""
+
+
+class StubRateLimitError(StubLLMError):
+    """模拟的限流（HTTP 429）"""
+
+
+def normalize_messages(messages: Any) -> List[Dict[str, Any]]:
+    """
+    将不同格式的消息统一为 [{"role": ..., "content": ...}]
+
+    支持字符串、字典、(role, content) 元组、openJiuwen 和 LangChain 消息对象，
+    两个框架中相同的提示词得到相同的结果
+    """
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+
+    normalized = []
+    for message in messages:
+        if isinstance(message, str):
+            role, content = "user", message
+        elif isinstance(message, dict):
+            role, content = message.get("role", "user"), message.get("content", "")
+        elif isinstance(message, tuple):
+            role, content = message
+        elif hasattr(message, "role"):
+            role, content = message.role, message.content
+        else:
+            role = _LANGCHAIN_ROLES.get(getattr(message, "type", ""), "user")
+            content = message.content
+        normalized.append({"role": _LANGCHAIN_ROLES.get(role, role), "content": content})
+    return normalized
+
+
+def prompt_hash(messages: Any) -> str:
+    """计算提示词哈希（sha256）"""
+    payload = json.dumps(normalize_messages(messages), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_recording(path: str) -> Dict[str, str]:
+    """读取录制文件"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class StubLLM:
+    """
+    确定性的本地 LLM
+
+    Args:
+        responses: {提示词哈希: 响应内容}
+        default: 未命中时的响应，可以是字符串或 callable(messages) -> str
+        latency: 每次调用的延迟（秒）
+        jitter: 延迟抖动（秒），实际延迟在 latency ± jitter 之间
+        rate_limit: 任意 1 秒内最多允许的调用次数，超出时抛出 StubRateLimitError
+        failure_rate: 随机失败概率，失败时抛出 StubLLMError
+        seed: 随机种子（抖动和失败）
+    """
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, str]] = None,
+        default: Union[str, Callable[[List[Dict[str, Any]]], str]] = DEFAULT_RESPONSE,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit: Optional[float] = None,
+        failure_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.responses: Dict[str, str] = dict(responses or {})
+        self.default = default
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.hits = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._recent = collections.deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "StubLLM":
+        """从录制文件创建"""
+        return cls(responses=load_recording(path), **kwargs)
+
+    @classmethod
+    def from_env(cls, environ: Optional[Dict[str, str]] = None) -> Optional["StubLLM"]:
+        """根据 LG2JIUWEN_STUB_* 环境变量创建，未设置 LG2JIUWEN_STUB_LLM 时返回 None"""
+        environ = os.environ if environ is None else environ
+        source = environ.get(ENV_PREFIX + "LLM")
+        if not source:
+            return None
+
+        rate_limit = environ.get(ENV_PREFIX + "RATE_LIMIT")
+        return cls(
+            responses=load_recording(source) if os.path.isfile(source) else None,
+            latency=float(environ.get(ENV_PREFIX + "LATENCY", "0")),
+            jitter=float(environ.get(ENV_PREFIX + "JITTER", "0")),
+            rate_limit=float(rate_limit) if rate_limit else None,
+            failure_rate=float(environ.get(ENV_PREFIX + "FAILURE_RATE", "0")),
+            seed=int(environ.get(ENV_PREFIX + "SEED", "0")),
+        )
+
+    def respond(self, messages: Any) -> str:
+        """返回提示词对应的响应内容（不模拟延迟和失败）"""
+        normalized = normalize_messages(messages)
+        content = self.responses.get(prompt_hash(normalized))
+        if content is not None:
+            with self._lock:
+                self.hits += 1
+            return content
+        if callable(self.default):
+            return self.default(normalized)
+        return self.default
+
+    def _admit(self) -> float:
+        """
+        登记一次调用：检查限流、抽取失败，返回本次延迟秒数
+
+        Raises:
+            StubRateLimitError: 超过 rate_limit
+            StubLLMError: 模拟随机失败
+        """
+        with self._lock:
+            self.calls += 1
+            if self.rate_limit is not None:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] >= 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.failures += 1
+                    raise StubRateLimitError("rate limit exceeded (simulated 429)")
+                self._recent.append(now)
+
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                self.failures += 1
+                raise StubLLMError("simulated LLM failure")
+
+            delay = self.latency
+            if self.jitter:
+                delay += self._random.uniform(-self.jitter, self.jitter)
+            return max(0.0, delay)
+
+    def invoke(self, model_name: str = None, messages: Any = None, **kwargs):
+        """同步调用（openJiuwen 接口）"""
+        from openjiuwen.core.utils.llm.messages import AIMessage
+
+        delay = self._admit()
+        if delay:
+            time.sleep(delay)
+        return AIMessage(content=self.respond(messages))
+
+    async def ainvoke(self, model_name: str = None, messages: Any = None, **kwargs):
+        """异步调用（openJiuwen 接口），延迟期间不阻塞事件循环"""
+        from openjiuwen.core.utils.llm.messages import AIMessage
+
+        delay = self._admit()
+        if delay:
+            await asyncio.sleep(delay)
+        return AIMessage(content=self.respond(messages))
+
+    def as_langchain(self):
+        """返回共享本替身响应和模拟行为的 LangChain 聊天模型"""
+        from langchain_core.language_models.chat_models import BaseChatModel
+        from langchain_core.messages import AIMessage
+        from langchain_core.outputs import ChatGeneration, ChatResult
+
+        stub = self
+
+        class StubChatModel(BaseChatModel):
+            """LangChain 聊天模型形式的 StubLLM"""
+
+            @property
+            def _llm_type(self) -> str:
+                return "lg2jiuwen-stub"
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                content = stub.invoke(messages=messages).content
+                return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+            async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+                content = (await stub.ainvoke(messages=messages)).content
+                return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+        return StubChatModel()
+
+
+class RecordingLLM:
+    """
+    录制真实 LLM 的响应
+
+    包装 openJiuwen LLM，按提示词哈希记录响应内容，save() 后可由 StubLLM.from_file 回放
+    """
+
+    def __init__(self, llm):
+        self._llm = llm
+        self.recording: Dict[str, str] = {}
+
+    async def ainvoke(self, model_name: str = None, messages: Any = None, **kwargs):
+        response = await self._llm.ainvoke(model_name=model_name, messages=messages, **kwargs)
+        self.recording[prompt_hash(messages)] = response.content
+        return response
+
+    def invoke(self, model_name: str = None, messages: Any = None, **kwargs):
+        response = self._llm.invoke(model_name=model_name, messages=messages, **kwargs)
+        self.recording[prompt_hash(messages)] = response.content
+        return response
+
+    def save(self, path: str) -> None:
+        """写出录制文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.recording, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,23 @@
+"""
+LG2Jiuwen token 估算
+
+在本地估算提示词的 token 数，不依赖具体模型的分词器：
+- 中日韩字符及全角标点按每字 1 token 计
+- 其他字符按每 4 个字符 1 token 计
+
+估算值用于预算控制（批量打包、提示词裁剪），不要求与模型计费完全一致
+"""
+
+import math
+import re
+
+
+_CJK = re.compile("[\u3000-\u303f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 token 数"""
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
@@ -0,0 +1,219 @@
+"""
+LG2Jiuwen 监听模式
+
+常驻进程监听源码目录，文件变化后在进程内重新迁移：
+- 重量级依赖（openjiuwen、langchain）只导入一次
+- 未修改文件的 AST 由监听器持有的缓存复用
+- 每次变更输出迁移耗时
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from .components.ast_parser import ASTCache
+from .service import MigrationOptions, MigrationResult, migrate_async
+
+
+# 扫描时跳过的目录
+IGNORED_DIRS = {"__pycache__", ".git", ".venv", "venv", "node_modules"}
+
+
+@dataclass
+class ChangeEvent:
+    """一次变更触发的迁移记录"""
+    changed_files: List[str]             # 变更的文件（新增 / 修改 / 删除）
+    result: MigrationResult              # 迁移结果
+    elapsed: float                       # 迁移耗时（秒）
+
+
+@dataclass
+class _FileStamp:
+    """文件快照"""
+    mtime_ns: int
+    size: int
+    digest: Optional[str] = field(default=None)
+
+
+class MigrationWatcher:
+    """
+    迁移监听器
+
+    轮询源码目录（mtime + size），只有内容真正变化时才重新迁移
+    """
+
+    def __init__(
+        self,
+        source_path: str,
+        output_dir: str = "./output",
+        options: Optional[MigrationOptions] = None,
+        llm=None,
+        interval: float = 0.2,
+        on_change: Optional[Callable[[ChangeEvent], None]] = None
+    ):
+        """
+        初始化监听器
+
+        Args:
+            source_path: 源文件或目录路径
+            output_dir: 输出目录
+            options: 迁移选项
+            llm: 可选的 LLM 实例
+            interval: 轮询间隔（秒）
+            on_change: 每次迁移完成后的回调
+        """
+        self.source_path = os.path.abspath(source_path)
+        self.output_dir = os.path.abspath(output_dir)
+        self.options = options or MigrationOptions(use_ai=False)
+        self.llm = llm
+        self.interval = interval
+        self.on_change = on_change
+        self._stamps: Dict[str, _FileStamp] = {}
+        # 本会话的 AST 缓存，随监听器释放
+        self.ast_cache = ASTCache()
+
+    def _iter_sources(self):
+        """遍历需要监听的 Python 文件"""
+        if os.path.isfile(self.source_path):
+            yield self.source_path
+            return
+
+        for root, dirs, files in os.walk(self.source_path):
+            dirs[:] = [
+                d for d in dirs
+                if d not in IGNORED_DIRS and not d.startswith(".")
+                and os.path.join(root, d) != self.output_dir
+            ]
+            for name in files:
+                if name.endswith(".py"):
+                    yield os.path.join(root, name)
+
+    def _digest(self, path: str) -> Optional[str]:
+        """计算文件内容摘要，读取失败返回 None"""
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def scan(self) -> List[str]:
+        """
+        扫描源码，返回内容发生变化的文件列表
+
+        只在 mtime 或 size 变化时计算摘要，仅 touch 未修改内容的文件不会触发迁移
+        """
+        changed: List[str] = []
+        current: Dict[str, _FileStamp] = {}
+
+        for path in self._iter_sources():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            old = self._stamps.get(path)
+            if old and old.mtime_ns == stat.st_mtime_ns and old.size == stat.st_size:
+                current[path] = old
+                continue
+
+            stamp = _FileStamp(stat.st_mtime_ns, stat.st_size, self._digest(path))
+            current[path] = stamp
+            if old is None or old.digest != stamp.digest:
+                changed.append(path)
+
+        # 删除的文件
+        changed.extend(path for path in self._stamps if path not in current)
+
+        self._stamps = current
+        return changed
+
+    async def migrate(self, changed_files: Optional[List[str]] = None) -> ChangeEvent:
+        """执行一次迁移并计时"""
+        start = time.perf_counter()
+        result = await migrate_async(
+            self.source_path, self.output_dir, self.options, self.llm, ast_cache=self.ast_cache
+        )
+        event = ChangeEvent(
+            changed_files=changed_files or [],
+            result=result,
+            elapsed=time.perf_counter() - start
+        )
+        if self.on_change:
+            self.on_change(event)
+        return event
+
+    async def poll_once(self) -> Optional[ChangeEvent]:
+        """检查一次变化，有变化则重新迁移"""
+        changed = self.scan()
+        if not changed:
+            return None
+        return await self.migrate(changed)
+
+    async def run(self, max_events: Optional[int] = None) -> None:
+        """
+        持续监听，直到被中断
+
+        Args:
+            max_events: 处理指定次数的变更后退出（不含首次迁移），None 表示不限
+        """
+        # 首次全量迁移
+        await self.migrate(self.scan())
+
+        handled = 0
+        while max_events is None or handled < max_events:
+            await asyncio.sleep(self.interval)
+            if await self.poll_once() is not None:
+                handled += 1
+
+
+def format_event(event: ChangeEvent, source_root: str = "") -> str:
+    """格式化变更记录为一行输出"""
+    elapsed_ms = event.elapsed * 1000
+    if event.changed_files:
+        names = [
+            os.path.relpath(f, source_root) if source_root and os.path.isdir(source_root) else os.path.basename(f)
+            for f in event.changed_files
+        ]
+        shown = ", ".join(names[:3])
+        if len(names) > 3:
+            shown += f" 等 {len(names)} 个文件"
+    else:
+        shown = "(无)"
+
+    timestamp = time.strftime("%H:%M:%S")
+    if event.result.success:
+        return f"[{timestamp}] ✓ {shown} → {len(event.result.generated_files)} 个文件, {elapsed_ms:.0f} ms"
+    errors = "; ".join(event.result.errors)
+    return f"[{timestamp}] ✗ {shown} → 迁移失败 ({elapsed_ms:.0f} ms): {errors}"
+
+
+def watch(
+    source_path: str,
+    output_dir: str = "./output",
+    options: Optional[MigrationOptions] = None,
+    interval: float = 0.2
+) -> None:
+    """
+    监听源码变化并自动迁移（阻塞，Ctrl+C 退出）
+
+    Args:
+        source_path: 源文件或目录路径
+        output_dir: 输出目录
+        options: 迁移选项
+        interval: 轮询间隔（秒）
+    """
+    watcher = MigrationWatcher(
+        source_path,
+        output_dir,
+        options,
+        interval=interval,
+        on_change=lambda event: print(format_event(event, watcher.source_path), flush=True)
+    )
+    print(f"监听 {watcher.source_path} → {watcher.output_dir}（Ctrl+C 退出）", flush=True)
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        print("已停止监听")
@@ -0,0 +1,330 @@
+"""
+LG2Jiuwen 预热解释器池
+
+常驻的工作解释器预先导入 openjiuwen，运行请求时直接执行生成的
+main.py 或其中的 run(inputs)，省去每次启动解释器和导入依赖的开销。
+
+- 工作进程运行 N 次或内存增长超过阈值后自动回收重建
+- 分别统计冷启动（请求等待新进程预热）与热运行的延迟
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, List, Optional, Sequence
+
+from .runner import RunTarget, get_python_executable
+
+
+# 工作进程默认预导入的模块
+DEFAULT_PRELOAD = (
+    "openjiuwen.core.runtime.workflow",
+    "openjiuwen.core.workflow.base",
+    "openjiuwen.core.component.base",
+    "openjiuwen.core.component.start_comp",
+    "openjiuwen.core.component.end_comp",
+    "openjiuwen.core.utils.llm.model_library.openai",
+    "openjiuwen.core.utils.tool.tool",
+    "httpx",
+)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pool_worker.py")
+
+# 单条协议消息上限（包含 Agent 的全部输出）
+_MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class PoolRunResult:
+    """池中运行的结果"""
+    exit_code: Optional[int]             # 退出码
+    stdout: str                          # 标准输出
+    stderr: str                          # 标准错误
+    duration: float                      # 请求耗时（秒，含等待工作进程）
+    cold: bool                           # 是否等待了新工作进程预热
+    timed_out: bool = False              # 是否超时
+    result: Any = None                   # run(inputs) 的返回值
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为接口返回格式"""
+        return asdict(self)
+
+
+@dataclass
+class PoolStats:
+    """池统计"""
+    cold_latencies: List[float] = field(default_factory=list)
+    warm_latencies: List[float] = field(default_factory=list)
+    startup_times: List[float] = field(default_factory=list)
+    recycled: int = 0                    # 回收的工作进程数
+
+    def to_dict(self) -> Dict[str, Any]:
+        """汇总为接口返回格式"""
+        def summarize(values: List[float]) -> Dict[str, Any]:
+            if not values:
+                return {"count": 0, "mean": None, "p50": None, "max": None}
+            return {
+                "count": len(values),
+                "mean": statistics.fmean(values),
+                "p50": statistics.median(values),
+                "max": max(values),
+            }
+
+        return {
+            "cold": summarize(self.cold_latencies),
+            "warm": summarize(self.warm_latencies),
+            "worker_startup": summarize(self.startup_times),
+            "recycled": self.recycled,
+        }
+
+
+class _Worker:
+    """单个工作进程"""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.runs = 0
+        self.baseline_rss = 0
+        self.rss = 0
+        self.ready_at = 0.0
+
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.proc.stdin.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.proc.stdin.drain()
+        return await self.read()
+
+    async def read(self) -> Dict[str, Any]:
+        line = await self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("工作进程意外退出")
+        return json.loads(line)
+
+    def kill(self) -> None:
+        if self.proc.stdin is not None and not self.proc.stdin.is_closing():
+            self.proc.stdin.close()
+        if self.proc.returncode is None:
+            try:
+                self.proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+class WorkerPool:
+    """
+    预热解释器池
+
+    用法：
+        pool = WorkerPool(size=2)
+        await pool.start()
+        result = await pool.run_main(target)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_runs: int = 50,
+        max_rss_growth: int = 200 * 1024 * 1024,
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+        timeout: Optional[float] = None,
+        python: Optional[str] = None
+    ):
+        """
+        初始化解释器池
+
+        Args:
+            size: 工作进程数，默认读取 LG2JIUWEN_POOL_SIZE（默认 2）
+            max_runs: 每个工作进程最多运行次数，超过后回收
+            max_rss_growth: 相对预热后基线的内存增长上限（字节），超过后回收
+            preload: 预导入的模块
+            timeout: 单次运行超时秒数，默认读取 LG2JIUWEN_RUN_TIMEOUT（默认 300）
+            python: 工作进程解释器，默认同 runner（优先 .venv）
+        """
+        if size is None:
+            size = int(os.getenv("LG2JIUWEN_POOL_SIZE", "2"))
+        if timeout is None:
+            timeout = float(os.getenv("LG2JIUWEN_RUN_TIMEOUT", "300"))
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.max_rss_growth = max_rss_growth
+        self.preload = tuple(preload)
+        self.timeout = timeout
+        self.python = python or get_python_executable()
+        self.stats = PoolStats()
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self._retired: List[_Worker] = []
+        self._spawning: set = set()
+        self._closed = False
+
+    async def start(self) -> None:
+        """启动并预热全部工作进程"""
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        """关闭全部工作进程"""
+        self._closed = True
+        for task in list(self._spawning):
+            task.cancel()
+        workers = self._workers + self._retired
+        for worker in workers:
+            worker.kill()
+        for worker in workers:
+            await worker.proc.wait()
+        self._workers.clear()
+        self._retired.clear()
+
+    async def _spawn(self) -> _Worker:
+        """启动一个工作进程并等待预热完成"""
+        start = time.perf_counter()
+        env = dict(os.environ, LG2JIUWEN_PRELOAD=",".join(self.preload), PYTHONUNBUFFERED="1")
+        proc = await asyncio.create_subprocess_exec(
+            self.python, WORKER_SCRIPT,
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=_MAX_MESSAGE_BYTES,
+        )
+        worker = _Worker(proc)
+        self._workers.append(worker)
+        try:
+            ready = await worker.read()
+        except Exception:
+            self._discard(worker)
+            raise
+        worker.baseline_rss = worker.rss = ready.get("rss", 0)
+        worker.ready_at = time.perf_counter()
+        self.stats.startup_times.append(worker.ready_at - start)
+        return worker
+
+    def _discard(self, worker: _Worker) -> None:
+        """终止并移除工作进程"""
+        worker.kill()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        # 已退出的进程直接丢弃，其余留待 close() 回收
+        self._retired = [w for w in self._retired if w.proc.returncode is None]
+        self._retired.append(worker)
+
+    def _replace(self, worker: _Worker) -> None:
+        """回收工作进程，后台启动替代进程"""
+        self._discard(worker)
+        self.stats.recycled += 1
+        if self._closed:
+            return
+
+        async def respawn():
+            try:
+                self._idle.put_nowait(await self._spawn())
+            finally:
+                self._spawning.discard(task)
+
+        task = asyncio.create_task(respawn())
+        self._spawning.add(task)
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        return (
+            worker.runs >= self.max_runs
+            or worker.rss - worker.baseline_rss > self.max_rss_growth
+        )
+
+    async def _execute(
+        self,
+        message: Dict[str, Any],
+        timeout: Optional[float]
+    ) -> PoolRunResult:
+        await self.start()
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+
+        deadline = start + timeout
+
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout)
+        except asyncio.TimeoutError:
+            return PoolRunResult(
+                exit_code=None, stdout="", stderr="",
+                duration=time.perf_counter() - start, cold=True, timed_out=True
+            )
+        # 请求到达后才预热完成的工作进程，计为冷启动
+        cold = worker.ready_at > start
+
+        try:
+            response = await asyncio.wait_for(
+                worker.request(message), max(deadline - time.perf_counter(), 0)
+            )
+        except asyncio.TimeoutError:
+            self._replace(worker)
+            duration = time.perf_counter() - start
+            (self.stats.cold_latencies if cold else self.stats.warm_latencies).append(duration)
+            return PoolRunResult(
+                exit_code=None, stdout="", stderr="", duration=duration,
+                cold=cold, timed_out=True
+            )
+        except Exception:
+            self._replace(worker)
+            raise
+
+        worker.runs += 1
+        worker.rss = response.get("rss", worker.rss)
+        if self._should_recycle(worker):
+            self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+
+        duration = time.perf_counter() - start
+        (self.stats.cold_latencies if cold else self.stats.warm_latencies).append(duration)
+        return PoolRunResult(
+            exit_code=response.get("exit_code"),
+            stdout=response.get("stdout", ""),
+            stderr=response.get("stderr", ""),
+            duration=duration,
+            cold=cold,
+            result=response.get("result"),
+        )
+
+    async def run_main(self, target: RunTarget, timeout: Optional[float] = None) -> PoolRunResult:
+        """以 __main__ 方式执行入口文件"""
+        return await self._execute(
+            {"op": "main", "main_file": target.main_file, "cwd": target.cwd}, timeout
+        )
+
+    async def run(
+        self,
+        target: RunTarget,
+        inputs: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> PoolRunResult:
+        """调用入口文件中的 run(inputs)"""
+        return await self._execute(
+            {"op": "run", "main_file": target.main_file, "cwd": target.cwd, "inputs": inputs},
+            timeout
+        )
+
+
+_default_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    """获取进程级默认解释器池（首次运行时启动）"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = WorkerPool()
+    return _default_pool
+
+
+async def close_worker_pool() -> None:
+    """关闭默认解释器池"""
+    global _default_pool
+    if _default_pool is not None:
+        await _default_pool.close()
+        _default_pool = None
@@ -4,6 +4,9 @@
 定义 LangGraph 到 openJiuwen 的迁移工作流
 """
 
+from functools import wraps
+from typing import List, Optional
+
 from openjiuwen.core.workflow.base import Workflow
 from openjiuwen.core.component.start_comp import Start
 from openjiuwen.core.component.end_comp import End
@@ -11,13 +14,17 @@ from openjiuwen.core.runtime.state import ReadableStateLike
 
 from ..components.project_detector import ProjectDetectorComp
 from ..components.file_loader import FileLoaderComp
-from ..components.ast_parser import ASTParserComp
+from ..components.ast_parser import ASTCache, ASTParserComp
 from ..components.rule_extractor import RuleExtractorComp
+from ..components.streaming_extractor import StreamingExtractorComp
+from ..components.pipelined_extractor import PipelinedExtractorComp
 from ..components.pending_check import PendingCheckComp, pending_router
-from ..components.ai_semantic import AISemanticComp
+from ..components.ai_semantic import DEFAULT_MAX_CONCURRENCY, AISemanticComp
 from ..components.ir_builder import IRBuilderComp
 from ..components.code_generator import CodeGeneratorComp
 from ..components.report import ReportComp
+from ..output_sink import OutputSink
+from ..profiling import MigrationProfiler
 
 
 # ==================== Transformer 定义 ====================
@@ -57,7 +64,9 @@ def extractor_inputs_transformer(state: ReadableStateLike):
     """RuleExtractor 输入转换器"""
     return {
         "ast_map": _unwrap_state_value(state.get("parser.ast_map")),
-        "dependency_order": _unwrap_state_value(state.get("parser.dependency_order"))
+        "dependency_order": _unwrap_state_value(state.get("parser.dependency_order")),
+        "load_errors": (_unwrap_state_value(state.get("loader.load_errors")) or [])
+        + (_unwrap_state_value(state.get("parser.parse_errors")) or [])
     }
 
 
@@ -118,7 +127,8 @@ def reporter_inputs_transformer(state: ReadableStateLike):
     return {
         "extraction_result": _unwrap_state_value(state.get("ir_builder.extraction_result")),
         "generated_files": _unwrap_state_value(state.get("generator.generated_files")),
-        "migration_ir": _unwrap_state_value(state.get("ir_builder.migration_ir"))
+        "migration_ir": _unwrap_state_value(state.get("ir_builder.migration_ir")),
+        "output_dir": _unwrap_state_value(state.get("generator.output_dir"))
     }
 
 
@@ -127,23 +137,205 @@ def reporter_direct_inputs_transformer(state: ReadableStateLike):
     return {
         "extraction_result": _unwrap_state_value(state.get("ir_builder_direct.extraction_result")),
         "generated_files": _unwrap_state_value(state.get("generator_direct.generated_files")),
-        "migration_ir": _unwrap_state_value(state.get("ir_builder_direct.migration_ir"))
+        "migration_ir": _unwrap_state_value(state.get("ir_builder_direct.migration_ir")),
+        "output_dir": _unwrap_state_value(state.get("generator_direct.output_dir"))
     }
 
 
 # ==================== 工作流构建 ====================
 
-def build_migration_workflow(llm=None) -> Workflow:
+def _add_extraction_comps(
+    workflow: Workflow,
+    streaming: bool = False,
+    hybrid: bool = False,
+    on_pending=None,
+    pipelined: bool = False,
+    rule_stats: bool = False,
+    ast_cache: Optional[ASTCache] = None
+) -> None:
+    """
+    添加 detector → extractor 之间的提取阶段
+
+    - 默认：loader → parser → extractor，全部源码和 AST 存入工作流状态
+    - 流式：单个 StreamingExtractorComp 逐文件读取、解析、提取
+    - 流水线：单个 PipelinedExtractorComp，读取、解析、扫描经有界队列重叠执行
+      （与流式同时指定时使用流式）
+    - hybrid：提取器只把规则无法转换的语句交给 AI
+    - on_pending：待处理项生成时的回调（AI 流水线模式）
+    - rule_stats：提取器记录规则链的逐规则计数
+    - ast_cache：监听会话的 AST 缓存（流式模式不缓存）
+    """
+    if streaming:
+        workflow.add_workflow_comp(
+            "extractor",
+            StreamingExtractorComp(hybrid=hybrid, on_pending=on_pending, rule_stats=rule_stats),
+            inputs_transformer=loader_inputs_transformer
+        )
+        workflow.add_connection("detector", "extractor")
+        return
+
+    if pipelined:
+        workflow.add_workflow_comp(
+            "extractor",
+            PipelinedExtractorComp(
+                hybrid=hybrid, on_pending=on_pending, rule_stats=rule_stats, ast_cache=ast_cache
+            ),
+            inputs_transformer=loader_inputs_transformer
+        )
+        workflow.add_connection("detector", "extractor")
+        return
+
+    # 文件加载
+    workflow.add_workflow_comp(
+        "loader",
+        FileLoaderComp(),
+        inputs_transformer=loader_inputs_transformer
+    )
+
+    # AST 解析
+    workflow.add_workflow_comp(
+        "parser",
+        ASTParserComp(cache=ast_cache),
+        inputs_transformer=parser_inputs_transformer
+    )
+
+    # 规则提取
+    workflow.add_workflow_comp(
+        "extractor",
+        RuleExtractorComp(hybrid=hybrid, on_pending=on_pending, rule_stats=rule_stats),
+        inputs_transformer=extractor_inputs_transformer
+    )
+
+    workflow.add_connection("detector", "loader")
+    workflow.add_connection("loader", "parser")
+    workflow.add_connection("parser", "extractor")
+
+
+def _add_output_comps(
+    workflow: Workflow,
+    suffix: str,
+    generator_transformer,
+    reporter_transformer,
+    include_report: bool = True,
+    include_ir: bool = True,
+    sink: Optional[OutputSink] = None
+) -> None:
+    """
+    添加 generator → reporter → end 输出阶段
+
+    - include_report=False：不添加 reporter，generator 直接连接 end
+    - include_ir=False：generator 不写出 IR JSON
+    - sink：生成文件和报告的输出目标，默认写入 output_dir
+
+    Args:
+        suffix: 节点名后缀（AI 工作流的直接路径为 "_direct"）
+    """
+    generator = f"generator{suffix}"
+    reporter = f"reporter{suffix}"
+    end = f"end{suffix}"
+
+    workflow.add_workflow_comp(
+        generator,
+        CodeGeneratorComp(include_ir=include_ir, sink=sink),
+        inputs_transformer=generator_transformer
+    )
+
+    if include_report:
+        workflow.add_workflow_comp(
+            reporter,
+            ReportComp(sink=sink),
+            inputs_transformer=reporter_transformer
+        )
+        end_inputs = {
+            "generated_files": f"${{{reporter}.generated_files}}",
+            "report": f"${{{reporter}.report}}",
+            "stats": f"${{{generator}.stats}}"
+        }
+    else:
+        end_inputs = {
+            "generated_files": f"${{{generator}.generated_files}}",
+            "stats": f"${{{generator}.stats}}"
+        }
+
+    workflow.set_end_comp(end, End(), inputs_schema=end_inputs)
+
+    if include_report:
+        workflow.add_connection(generator, reporter)
+        workflow.add_connection(reporter, end)
+    else:
+        workflow.add_connection(generator, end)
+
+
+def _cancel_inflight_on_exit(workflow: Workflow, ai: AISemanticComp) -> None:
+    """
+    工作流结束时取消 AI 组件尚未汇合的派发任务
+
+    流水线模式下待处理项在提取阶段即派发；工作流在 AI 阶段之前失败时，
+    这些任务不会被 AI 组件汇合，这里在 invoke / stream 结束后统一取消
+    """
+    invoke, stream = workflow.invoke, workflow.stream
+
+    @wraps(invoke)
+    async def invoke_and_cancel(*args, **kwargs):
+        try:
+            return await invoke(*args, **kwargs)
+        finally:
+            await ai.cancel_inflight()
+
+    @wraps(stream)
+    async def stream_and_cancel(*args, **kwargs):
+        try:
+            async for chunk in stream(*args, **kwargs):
+                yield chunk
+        finally:
+            await ai.cancel_inflight()
+
+    workflow.invoke, workflow.stream = invoke_and_cancel, stream_and_cancel
+
+
+def build_migration_workflow(
+    llm=None,
+    streaming: bool = False,
+    include_report: bool = True,
+    include_ir: bool = True,
+    sink: Optional[OutputSink] = None,
+    ai_batch_tokens: int = 0,
+    ai_hybrid: bool = False,
+    ai_prompt_tokens: int = 0,
+    ai_models: Optional[List[str]] = None,
+    ai_pipeline: bool = False,
+    ai_max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    pipelined: bool = False,
+    profiler: Optional[MigrationProfiler] = None,
+    rule_stats: bool = False,
+    ast_cache: Optional[ASTCache] = None
+) -> Workflow:
     """
     构建迁移工作流
 
     Args:
         llm: 可选的 LLM 实例，用于 AI 语义理解
+        streaming: 是否使用流式提取（低内存模式）
+        include_report: 是否生成迁移报告（False 时裁剪 reporter 节点）
+        include_ir: 是否写出 IR JSON
+        sink: 输出目标（磁盘 / 内存 / zip），默认写入 output_dir
+        ai_batch_tokens: AI 批量转换的 token 预算，0 表示每个待处理项单独请求
+        ai_hybrid: 混合模式，保留规则已转换的语句，只把失败的语句交给 AI
+        ai_prompt_tokens: 每次 AI 请求的提示词 token 预算，0 表示不限
+        ai_models: AI 模型分级（从快到慢），结果校验失败时升级到下一级
+        ai_pipeline: 流水线模式，待处理项一生成即派发给 AI，与后续提取重叠
+        ai_max_concurrency: 同时进行的 AI 请求数上限
+        pipelined: 读取、解析与符号扫描 / 提取经有界队列流水线执行
+        profiler: 性能分析器，指定时记录每个组件的 CPU 和内存数据
+        rule_stats: 记录规则链的逐规则计数（匹配、命中、失败、耗时）
+        ast_cache: AST 缓存，监听会话中复用未修改文件的 AST
 
     Returns:
         Workflow: 迁移工作流实例
     """
     workflow = Workflow()
+    if profiler is not None:
+        profiler.instrument(workflow)
 
     # ========== 设置起点 ==========
     workflow.set_start_comp(
@@ -164,25 +356,17 @@ def build_migration_workflow(llm=None) -> Workflow:
         }
     )
 
-    # ========== 文件加载 ==========
-    workflow.add_workflow_comp(
-        "loader",
-        FileLoaderComp(),
-        inputs_transformer=loader_inputs_transformer
-    )
-
-    # ========== AST 解析 ==========
-    workflow.add_workflow_comp(
-        "parser",
-        ASTParserComp(),
-        inputs_transformer=parser_inputs_transformer
+    ai = AISemanticComp(
+        llm=llm, batch_tokens=ai_batch_tokens, prompt_tokens=ai_prompt_tokens, models=ai_models,
+        max_concurrency=ai_max_concurrency
     )
+    if ai_pipeline:
+        _cancel_inflight_on_exit(workflow, ai)
 
-    # ========== 规则提取 ==========
-    workflow.add_workflow_comp(
-        "extractor",
-        RuleExtractorComp(),
-        inputs_transformer=extractor_inputs_transformer
+    # ========== 文件加载 / AST 解析 / 规则提取 ==========
+    _add_extraction_comps(
+        workflow, streaming, hybrid=ai_hybrid, on_pending=ai.submit if ai_pipeline else None,
+        pipelined=pipelined, rule_stats=rule_stats, ast_cache=ast_cache
     )
 
     # ========== 待处理检查 ==========
@@ -195,7 +379,7 @@ def build_migration_workflow(llm=None) -> Workflow:
     # ========== AI 语义理解（条件触发）==========
     workflow.add_workflow_comp(
         "ai",
-        AISemanticComp(llm=llm),
+        ai,
         inputs_transformer=ai_inputs_transformer
     )
 
@@ -213,56 +397,18 @@ def build_migration_workflow(llm=None) -> Workflow:
         inputs_transformer=ir_builder_direct_inputs_transformer
     )
 
-    # ========== 代码生成 ==========
-    workflow.add_workflow_comp(
-        "generator",
-        CodeGeneratorComp(),
-        inputs_transformer=generator_inputs_transformer
-    )
-
-    workflow.add_workflow_comp(
-        "generator_direct",
-        CodeGeneratorComp(),
-        inputs_transformer=generator_direct_inputs_transformer
-    )
-
-    # ========== 报告生成 ==========
-    workflow.add_workflow_comp(
-        "reporter",
-        ReportComp(),
-        inputs_transformer=reporter_inputs_transformer
-    )
-
-    workflow.add_workflow_comp(
-        "reporter_direct",
-        ReportComp(),
-        inputs_transformer=reporter_direct_inputs_transformer
-    )
-
-    # ========== 设置终点 ==========
-    workflow.set_end_comp(
-        "end",
-        End(),
-        inputs_schema={
-            "generated_files": "${reporter.generated_files}",
-            "report": "${reporter.report}"
-        }
+    # ========== 代码生成 / 报告生成 / 终点 ==========
+    _add_output_comps(
+        workflow, "", generator_inputs_transformer, reporter_inputs_transformer,
+        include_report=include_report, include_ir=include_ir, sink=sink
     )
-
-    workflow.set_end_comp(
-        "end_direct",
-        End(),
-        inputs_schema={
-            "generated_files": "${reporter_direct.generated_files}",
-            "report": "${reporter_direct.report}"
-        }
+    _add_output_comps(
+        workflow, "_direct", generator_direct_inputs_transformer, reporter_direct_inputs_transformer,
+        include_report=include_report, include_ir=include_ir, sink=sink
     )
 
     # ========== 添加连接 ==========
     workflow.add_connection("start", "detector")
-    workflow.add_connection("detector", "loader")
-    workflow.add_connection("loader", "parser")
-    workflow.add_connection("parser", "extractor")
     workflow.add_connection("extractor", "checker")
 
     # 条件路由：是否需要 AI 处理
@@ -271,25 +417,42 @@ def build_migration_workflow(llm=None) -> Workflow:
     # AI 处理后的路径
     workflow.add_connection("ai", "ir_builder")
     workflow.add_connection("ir_builder", "generator")
-    workflow.add_connection("generator", "reporter")
-    workflow.add_connection("reporter", "end")
 
     # 直接处理的路径
     workflow.add_connection("ir_builder_direct", "generator_direct")
-    workflow.add_connection("generator_direct", "reporter_direct")
-    workflow.add_connection("reporter_direct", "end_direct")
 
     return workflow
 
 
-def build_simple_migration_workflow() -> Workflow:
+def build_simple_migration_workflow(
+    streaming: bool = False,
+    include_report: bool = True,
+    include_ir: bool = True,
+    sink: Optional[OutputSink] = None,
+    pipelined: bool = False,
+    profiler: Optional[MigrationProfiler] = None,
+    rule_stats: bool = False,
+    ast_cache: Optional[ASTCache] = None
+) -> Workflow:
     """
     构建简化版迁移工作流（不使用 AI）
 
+    Args:
+        streaming: 是否使用流式提取（低内存模式）
+        pipelined: 读取、解析与符号扫描 / 提取经有界队列流水线执行
+        include_report: 是否生成迁移报告（False 时裁剪 reporter 节点）
+        include_ir: 是否写出 IR JSON
+        sink: 输出目标（磁盘 / 内存 / zip），默认写入 output_dir
+        profiler: 性能分析器，指定时记录每个组件的 CPU 和内存数据
+        rule_stats: 记录规则链的逐规则计数（匹配、命中、失败、耗时）
+        ast_cache: AST 缓存，监听会话中复用未修改文件的 AST
+
     Returns:
         Workflow: 简化版迁移工作流实例
     """
     workflow = Workflow()
+    if profiler is not None:
+        profiler.instrument(workflow)
 
     # 起点
     workflow.set_start_comp(
@@ -308,26 +471,8 @@ def build_simple_migration_workflow() -> Workflow:
         inputs_schema={"source_path": "${start.source_path}"}
     )
 
-    # 文件加载
-    workflow.add_workflow_comp(
-        "loader",
-        FileLoaderComp(),
-        inputs_transformer=loader_inputs_transformer
-    )
-
-    # AST 解析
-    workflow.add_workflow_comp(
-        "parser",
-        ASTParserComp(),
-        inputs_transformer=parser_inputs_transformer
-    )
-
-    # 规则提取
-    workflow.add_workflow_comp(
-        "extractor",
-        RuleExtractorComp(),
-        inputs_transformer=extractor_inputs_transformer
-    )
+    # 文件加载 / AST 解析 / 规则提取
+    _add_extraction_comps(workflow, streaming, pipelined=pipelined, rule_stats=rule_stats, ast_cache=ast_cache)
 
     # IR 构建 - 直接从 extractor 获取
     def simple_ir_builder_inputs_transformer(state: ReadableStateLike):
@@ -352,44 +497,23 @@ def build_simple_migration_workflow() -> Workflow:
             "project_root": _unwrap_state_value(state.get("detector.project_root"))
         }
 
-    workflow.add_workflow_comp(
-        "generator",
-        CodeGeneratorComp(),
-        inputs_transformer=simple_generator_inputs_transformer
-    )
-
     # 报告生成
     def simple_reporter_inputs_transformer(state: ReadableStateLike):
         return {
             "extraction_result": _unwrap_state_value(state.get("ir_builder.extraction_result")),
             "generated_files": _unwrap_state_value(state.get("generator.generated_files")),
-            "migration_ir": _unwrap_state_value(state.get("ir_builder.migration_ir"))
+            "migration_ir": _unwrap_state_value(state.get("ir_builder.migration_ir")),
+            "output_dir": _unwrap_state_value(state.get("generator.output_dir"))
         }
 
-    workflow.add_workflow_comp(
-        "reporter",
-        ReportComp(),
-        inputs_transformer=simple_reporter_inputs_transformer
-    )
-
-    # 终点
-    workflow.set_end_comp(
-        "end",
-        End(),
-        inputs_schema={
-            "generated_files": "${reporter.generated_files}",
-            "report": "${reporter.report}"
-        }
+    _add_output_comps(
+        workflow, "", simple_generator_inputs_transformer, simple_reporter_inputs_transformer,
+        include_report=include_report, include_ir=include_ir, sink=sink
     )
 
     # 连接
     workflow.add_connection("start", "detector")
-    workflow.add_connection("detector", "loader")
-    workflow.add_connection("loader", "parser")
-    workflow.add_connection("parser", "extractor")
     workflow.add_connection("extractor", "ir_builder")
     workflow.add_connection("ir_builder", "generator")
-    workflow.add_connection("generator", "reporter")
-    workflow.add_connection("reporter", "end")
 
     return workflow
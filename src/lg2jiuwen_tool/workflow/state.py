@@ -15,6 +15,7 @@ class PendingType(Enum):
     CONDITIONAL = "conditional"          # 条件路由逻辑
     TOOL_BODY = "tool_body"              # 工具函数体
     COMPLEX_EXPR = "complex_expr"        # 复杂表达式
+    STATEMENTS = "statements"            # 节点函数中规则无法转换的语句（混合模式）
 
 
 @dataclass
@@ -44,7 +45,7 @@ class ConvertedNode:
     converted_body: str                  # 已转换的函数体代码
     inputs: List[str]                    # 输入字段列表
     outputs: List[str]                   # 输出字段列表
-    conversion_source: str               # "rule" 或 "ai"
+    conversion_source: str               # "rule"、"ai" 或 "hybrid"（规则 + AI 逐语句）
     docstring: Optional[str] = None      # 文档字符串
 
 
@@ -115,10 +116,14 @@ class ExtractionResult:
     imports: List[str] = field(default_factory=list)  # 原始导入语句
     initial_inputs: Dict[str, Any] = field(default_factory=dict)  # 初始输入（从 invoke 调用提取）
     example_inputs: Dict[str, Any] = field(default_factory=dict)  # 示例输入（从 main 函数提取）
+    load_errors: List[str] = field(default_factory=list)  # 读取或解析失败、未参与提取的文件
 
     # 统计
     rule_count: int = 0                  # 规则处理数量
     ai_count: int = 0                    # AI处理数量
+    prompt_stats: List[Dict[str, Any]] = field(default_factory=list)  # 每次 AI 请求: {"items": [待处理项 id], "model": 模型, "tokens": 提示词 token 数, "over_budget": 是否超出预算}
+    escalations: List[Dict[str, Any]] = field(default_factory=list)   # AI 模型升级: {"item", "from", "to", "reason"}
+    rule_stats: Dict[str, Any] = field(default_factory=dict)  # 规则链计数（RuleChainStats.to_dict()），未开启时为空
 
     def has_pending(self) -> bool:
         """是否有待处理项"""
@@ -6,8 +6,10 @@
 Plugin Server - 主应用文件
 模块化插件路由架构
 """
+import asyncio
 import datetime
 import traceback
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
@@ -15,6 +17,16 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # 导入模块化路由
 from src.routers.lg2jiuwen_router import lg2jiuwen_router
+from src.lg2jiuwen_tool.jobs import shutdown_job_manager
+from src.lg2jiuwen_tool.worker_pool import close_worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用生命周期：关闭时取消排队中的迁移任务，等待运行中的任务结束，关闭解释器池"""
+    yield
+    await asyncio.to_thread(shutdown_job_manager, True)
+    await close_worker_pool()
 
 
 # 创建FastAPI应用
@@ -23,7 +35,8 @@ app = FastAPI(
     description="plugin server",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # 添加CORS中间件
@@ -5,10 +5,24 @@
 天气查询插件路由
 """
 
-from fastapi import HTTPException, Query, Body
+import asyncio
+import json
+import mimetypes
+import os
+import shutil
+import tempfile
+
+from fastapi import HTTPException, Query, Body, Header, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from src.routers import BasePluginRouter
 from src.lg2jiuwen_tool import service as lg2jiuwen_service
+from src.lg2jiuwen_tool import archive as lg2jiuwen_archive
+from src.lg2jiuwen_tool.file_cache import get_file_cache, is_not_modified, parse_range
+from src.lg2jiuwen_tool.jobs import QueueFullError, get_job_manager
+from src.lg2jiuwen_tool.runner import get_agent_runner, resolve_run_target
+from src.lg2jiuwen_tool.worker_pool import get_worker_pool
 
 lg2jiuwen_router = BasePluginRouter(
     name="lg2jiuwen",
@@ -21,24 +35,129 @@ async def migrate(
     output_dir: str = Body(..., description="output dir"),
 ):
     try:
+        job = get_job_manager().submit(source_path, output_dir)
         return {
             "result": "success",
-            "data": lg2jiuwen_service.migrate(source_path, output_dir)
+            "data": job.to_dict()
             }
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"migrate rejected: {str(e)}",
+            headers={"Retry-After": "5"}
+        ) from e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"migrate failed: {str(e)}"
+        ) from e
+
+@lg2jiuwen_router.router.post("/migrate/archive")
+async def migrate_archive(
+    request: Request,
+    include_report: bool = Query(True, description="include migration report"),
+    include_ir: bool = Query(True, description="include IR json"),
+):
+    # 上传包和生成的 zip 都放在临时目录中，由工作进程按路径读写
+    workspace = tempfile.mkdtemp(prefix="lg2jiuwen-upload-")
+    upload_path = os.path.join(workspace, "upload.zip")
+    output_path = os.path.join(workspace, "output.zip")
+    cleanup = BackgroundTask(shutil.rmtree, workspace, ignore_errors=True)
+    try:
+        # 请求体为 zip 原始字节，边接收边检查大小；文件读写在线程池中执行，不阻塞事件循环
+        size = 0
+        upload = await asyncio.to_thread(open, upload_path, "wb")
+        try:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > lg2jiuwen_archive.MAX_ARCHIVE_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"archive too large: limit {lg2jiuwen_archive.MAX_ARCHIVE_BYTES} bytes"
+                    )
+                await asyncio.to_thread(upload.write, chunk)
+        finally:
+            await asyncio.to_thread(upload.close)
+
+        options = lg2jiuwen_service.MigrationOptions(
+            use_ai=False,
+            include_report=include_report,
+            include_ir=include_ir
+        )
+        # 解压和迁移交给任务管理器的工作池，与 /migrate 共用并发数和排队上限
+        result = await asyncio.wrap_future(get_job_manager().call(
+            lg2jiuwen_archive.migrate_archive_file, upload_path, output_path, options
+        ))
+        if not result.success:
+            raise HTTPException(
+                status_code=422,
+                detail=f"migrate failed: {'; '.join(result.errors)}"
+            )
+        output = await asyncio.to_thread(open, output_path, "rb")
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"migrate rejected: {str(e)}",
+            headers={"Retry-After": "5"}
+        ) from e
+    except lg2jiuwen_archive.ArchiveError as e:
+        raise HTTPException(status_code=400, detail=f"invalid archive: {str(e)}") from e
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"migrate failed: {str(e)}"
         ) from e
+    finally:
+        # 无论成功、出错还是请求被取消都立即删除临时目录：已打开的输出文件删除后仍可读取，
+        # 客户端在响应开始前断开也不会残留；无法删除打开中文件的平台由响应结束后的 cleanup 兜底
+        await cleanup()
+
+    headers = {
+        "Content-Disposition": 'attachment; filename="openjiuwen_project.zip"',
+        "X-Rule-Count": str(result.rule_count),
+        "X-AI-Count": str(result.ai_count),
+    }
+    return StreamingResponse(
+        lg2jiuwen_archive.iter_file(output), media_type="application/zip", headers=headers, background=cleanup
+    )
+
+@lg2jiuwen_router.router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job not found: {job_id}")
+    return {
+        "result": "success",
+        "data": job.to_dict(),
+    }
+
+@lg2jiuwen_router.router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job not found: {job_id}")
+    return {
+        "result": "success",
+        "data": job.to_dict(),
+    }
 
 @lg2jiuwen_router.router.get("/run")
 async def run(
     source_path: str = Query(..., description="source code path"),
+    timeout: float = Query(None, gt=0, description="timeout in seconds"),
+    use_pool: bool = Query(False, description="run in a pre-warmed interpreter"),
 ):
     try:
+        target = resolve_run_target(source_path)
+        if use_pool:
+            result = await get_worker_pool().run_main(target, timeout)
+        else:
+            result = await get_agent_runner().run(target, timeout)
         return {
             "result": "success",
-            "data": lg2jiuwen_service.run(source_path),
+            "data": result.to_dict(),
         }
     except Exception as e:
         raise HTTPException(
@@ -47,22 +166,151 @@ async def run(
         ) from e
 
 
-@lg2jiuwen_router.router.get("/get_file_content")
-async def get_file_content(
-    file_path: str = Query(..., description="file path"),
+@lg2jiuwen_router.router.get("/run/stream")
+async def run_stream(
+    source_path: str = Query(..., description="source code path"),
+    timeout: float = Query(None, gt=0, description="timeout in seconds"),
+):
+    try:
+        target = resolve_run_target(source_path)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"run failed: {str(e)}"
+        ) from e
+
+    async def events():
+        async for event in get_agent_runner().stream(target, timeout):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@lg2jiuwen_router.router.post("/run/invoke")
+async def run_invoke(
+    source_path: str = Body(..., description="source code path"),
+    inputs: dict = Body(default_factory=dict, description="workflow inputs"),
+    timeout: float = Body(None, gt=0, description="timeout in seconds"),
 ):
     try:
+        target = resolve_run_target(source_path)
+        result = await get_worker_pool().run(target, inputs, timeout)
         return {
             "result": "success",
-            "data": lg2jiuwen_service.get_file_content(file_path),
+            "data": result.to_dict(),
         }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"run failed: {str(e)}"
+        ) from e
+
+
+@lg2jiuwen_router.router.get("/run/pool/stats")
+async def run_pool_stats():
+    return {
+        "result": "success",
+        "data": get_worker_pool().stats.to_dict(),
+    }
+
+
+def _load_cached_file(file_path: str):
+    """解析路径并从文件缓存读取，失败时转换为 HTTP 错误"""
+    try:
+        return get_file_cache().get(lg2jiuwen_service.resolve_file_path(file_path))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except OSError as e:
+        raise HTTPException(status_code=400, detail=f"cannot read file: {str(e)}") from e
+
+
+def _validator_headers(cached) -> dict:
+    return {
+        "ETag": cached.etag,
+        "Last-Modified": cached.last_modified,
+        "Cache-Control": "no-cache",
+    }
+
+
+@lg2jiuwen_router.router.get("/get_file_content")
+async def get_file_content(
+    file_path: str = Query(..., description="file path"),
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+):
+    cached = _load_cached_file(file_path)
+    headers = _validator_headers(cached)
+    if is_not_modified(cached, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        # 编码后的响应体随缓存条目复用，文件未变化时不重复读取和序列化
+        body = cached.derive("json", lambda: json.dumps(
+            {"result": "success", "data": cached.text()}, ensure_ascii=False
+        ).encode("utf-8"))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"get file content failed: {str(e)}"
         ) from e
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@lg2jiuwen_router.router.get("/file")
+async def get_file(
+    file_path: str = Query(..., description="file path"),
+    range_header: str = Header(None, alias="Range"),
+    if_range: str = Header(None),
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+    accept_encoding: str = Header(None),
+):
+    cached = _load_cached_file(file_path)
+    headers = _validator_headers(cached)
+    headers["Accept-Ranges"] = "bytes"
+    media_type = mimetypes.guess_type(cached.path)[0] or "application/octet-stream"
+    if media_type.startswith("text/") or media_type == "application/json":
+        media_type += "; charset=utf-8"
+
+    if is_not_modified(cached, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    # If-Range 与当前版本不一致时忽略 Range，返回完整内容
+    if if_range and if_range not in (cached.etag, cached.last_modified):
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, cached.size)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{cached.size}"
+        return Response(status_code=416, headers=headers)
+
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{cached.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            cached.iter_range(start, end), status_code=206, media_type=media_type, headers=headers
+        )
+
+    headers["Vary"] = "Accept-Encoding"
+    if cached.data is not None and accept_encoding and "gzip" in accept_encoding:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=cached.gzipped(), media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(cached.size)
+    return StreamingResponse(
+        cached.iter_range(0, cached.size - 1), media_type=media_type, headers=headers
+    )
 
 # 注册端点信息
 lg2jiuwen_router.register_endpoint("GET", "/run", run, "lg2jiuwen run python file")
-lg2jiuwen_router.register_endpoint("POST", "/migrate", migrate, "lg2jiuwen migrate file")
-lg2jiuwen_router.register_endpoint("GET", "/get_file_content", get_file_content, "lg2jiuwen get file content")
\ No newline at end of file
+lg2jiuwen_router.register_endpoint("GET", "/run/stream", run_stream, "lg2jiuwen run python file with streamed output")
+lg2jiuwen_router.register_endpoint("POST", "/run/invoke", run_invoke, "lg2jiuwen call run(inputs) in a pre-warmed interpreter")
+lg2jiuwen_router.register_endpoint("GET", "/run/pool/stats", run_pool_stats, "lg2jiuwen interpreter pool latency stats")
+lg2jiuwen_router.register_endpoint("POST", "/migrate", migrate, "lg2jiuwen submit migrate job")
+lg2jiuwen_router.register_endpoint("POST", "/migrate/archive", migrate_archive, "lg2jiuwen migrate an uploaded zip project and download the result as zip")
+lg2jiuwen_router.register_endpoint("GET", "/jobs/{job_id}", get_job, "lg2jiuwen get migrate job")
+lg2jiuwen_router.register_endpoint("DELETE", "/jobs/{job_id}", cancel_job, "lg2jiuwen cancel migrate job")
+lg2jiuwen_router.register_endpoint("GET", "/get_file_content", get_file_content, "lg2jiuwen get file content")
+lg2jiuwen_router.register_endpoint("GET", "/file", get_file, "lg2jiuwen get raw file with range and conditional requests")
\ No newline at end of file
@@ -0,0 +1,546 @@
+"""
+AI 语义理解组件单元测试
+"""
+import asyncio
+import os
+import re
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.components.ai_semantic import BATCH_OVERHEAD_TOKENS, AISemanticComp
+from lg2jiuwen_tool.components.ast_parser import ASTParserComp
+from lg2jiuwen_tool.components.file_loader import FileLoaderComp
+from lg2jiuwen_tool.components.project_detector import ProjectDetectorComp
+from lg2jiuwen_tool.components.rule_extractor import RuleExtractorComp
+from lg2jiuwen_tool.stub_llm import StubLLM
+from lg2jiuwen_tool.token_budget import estimate_tokens
+from lg2jiuwen_tool.workflow.migration_workflow import _cancel_inflight_on_exit
+from lg2jiuwen_tool.workflow.state import ExtractionResult, PendingItem, PendingType
+
+
+def make_item(name, pending_type=PendingType.NODE_BODY):
+    """构造待处理项"""
+    return PendingItem(
+        id=f"agent.py:{name}", pending_type=pending_type,
+        source_code=f"def {name}(state):\n    return {{'{name}': state['x']}}",
+        context={"state_fields": ["x"], "available_tools": []},
+        question="转换为 openJiuwen 组件", location="agent.py:1"
+    )
+
+
+def batch_reply(skip=(), broken=()):
+    """按批量提示中的编号逐项作答；skip 中的编号不作答，broken 中的编号返回无法解析的代码"""
+    def reply(messages):
+        prompt = messages[-1]["content"]
+        numbers = re.findall(r"^### ITEM (\d+)$", prompt, re.MULTILINE)
+        if not numbers:
+            name = re.search(r"def (\w+)\(", prompt).group(1)
+            return f'```python\nreturn {{"{name}": inputs["x"]}}\n```'
+
+        answers = []
+        for number in numbers:
+            if int(number) in skip:
+                continue
+            name = re.findall(r"def (\w+)\(", prompt)[int(number) - 1]
+            code = "return {" if int(number) in broken else f'return {{"{name}": inputs["x"]}}'
+            answers.append(f"### ITEM {number}\n```python\n{code}\n```")
+        return "\n\n".join(answers)
+    return reply
+
+
+class TestBatching:
+    """批量转换测试"""
+
+    async def _convert(self, comp, items):
+        result = await comp.invoke(
+            inputs={"extraction_result": ExtractionResult(pending_items=items)}, runtime=None, context=None
+        )
+        return result["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_one_request_per_batch(self):
+        """测试多个小待处理项合并为一次请求，结果按原顺序对应"""
+        llm = StubLLM(default=batch_reply())
+        items = [make_item(name) for name in ("a", "b", "c")]
+        extraction = await self._convert(AISemanticComp(llm=llm, batch_tokens=4000), items)
+
+        assert llm.calls == 1
+        assert [n.name for n in extraction.nodes] == ["a", "b", "c"]
+        assert [n.outputs for n in extraction.nodes] == [["a"], ["b"], ["c"]]
+        assert extraction.ai_count == 3
+
+    @pytest.mark.asyncio
+    async def test_malformed_answers_retried_alone(self):
+        """测试缺失或无法解析的答案单独重试"""
+        llm = StubLLM(default=batch_reply(skip={2}, broken={3}))
+        items = [make_item(name) for name in ("a", "b", "c")]
+        extraction = await self._convert(AISemanticComp(llm=llm, batch_tokens=4000), items)
+
+        assert llm.calls == 3
+        assert [n.converted_body for n in extraction.nodes] == [
+            'return {"a": inputs["x"]}', 'return {"b": inputs["x"]}', 'return {"c": inputs["x"]}'
+        ]
+
+    def test_plan_respects_budget_and_type(self):
+        """测试按 token 预算和待处理类型分批"""
+        comp = AISemanticComp(llm=StubLLM(), batch_tokens=0)
+        items = [make_item("a"), make_item("b"), make_item("route", PendingType.CONDITIONAL), make_item("c")]
+        overhead = estimate_tokens(comp._get_system_prompt(PendingType.NODE_BODY)) + BATCH_OVERHEAD_TOKENS
+        item_cost = estimate_tokens(comp._build_user_prompt(items[0]))
+
+        comp._batch_tokens = overhead + 2 * item_cost
+        assert comp._plan_batches(items) == [[0, 1], [3], [2]]
+
+        comp._batch_tokens = 1
+        assert comp._plan_batches(items) == [[0], [1], [3], [2]]
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self):
+        """测试默认逐项请求"""
+        llm = StubLLM(default=batch_reply())
+        await self._convert(AISemanticComp(llm=llm), [make_item("a"), make_item("b")])
+        assert llm.calls == 2
+
+
+AGENT_SOURCE = '''
+from typing import TypedDict
+from langgraph.graph import StateGraph, END
+
+
+class State(TypedDict):
+    text: str
+    count: int
+    words: list
+
+
+def count_node(state: State):
+    """统计单词"""
+    text = state["text"]
+    words = text.split()
+    state["words"] = words
+    state["count"] += len(words)
+    first, rest = words[0], words[1:]
+    state["text"] = first.upper()
+
+
+workflow = StateGraph(State)
+workflow.add_node("count", count_node)
+workflow.set_entry_point("count")
+workflow.add_edge("count", END)
+app = workflow.compile()
+'''
+
+
+class PeakLLM(StubLLM):
+    """记录同时进行的最大调用数"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+
+    async def ainvoke(self, model_name=None, messages=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().ainvoke(model_name=model_name, messages=messages, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def statements_reply(messages):
+    """按占位符逐段作答"""
+    prompt = messages[-1]["content"]
+    return "\n".join(
+        f"### {placeholder}\n```python\ncount = inputs[\"count\"] + len(words)\nfirst, rest = words[0], words[1:]\n```"
+        for placeholder in re.findall(r"^### (__AI_STATEMENT_\d+__)$", prompt, re.MULTILINE)
+    )
+
+
+class TestStatementFallback:
+    """混合模式（语句级 AI 转换）测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, "agent.py")
+        with open(self.source_path, "w", encoding="utf-8") as f:
+            f.write(AGENT_SOURCE)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    async def _extract(self, hybrid):
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": self.source_path}, runtime=None, context=None
+        )
+        loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+        parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+        extracted = await RuleExtractorComp(hybrid=hybrid).invoke(inputs=parsed, runtime=None, context=None)
+        return extracted["extraction_result"]
+
+    async def _convert(self, comp, extraction):
+        result = await comp.invoke(inputs={"extraction_result": extraction}, runtime=None, context=None)
+        return result["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_pending_item_contains_failed_statements_only(self):
+        """测试待处理项只包含失败的语句，连续失败的语句合为一段"""
+        extraction = await self._extract(hybrid=True)
+        item = extraction.pending_items[0]
+
+        assert item.pending_type == PendingType.STATEMENTS
+        assert "text.split()" not in item.source_code
+        assert list(item.context["spans"]) == ["__AI_STATEMENT_1__"]
+        assert item.context["partial_body"].splitlines() == [
+            "text = inputs['text']", "words = text.split()", "words = words", "__AI_STATEMENT_1__", "text = first.upper()"
+        ]
+        assert "count" in item.context["outputs"]
+
+    @pytest.mark.asyncio
+    async def test_answers_spliced_into_rule_output(self):
+        """测试 AI 答案填回规则已转换的函数体，且提示词比整函数转换更小"""
+        prompts = []
+
+        def reply(messages):
+            prompts.append(messages[-1]["content"])
+            return statements_reply(messages)
+
+        extraction = await self._convert(AISemanticComp(llm=StubLLM(default=reply)), await self._extract(hybrid=True))
+        node = extraction.nodes[0]
+
+        assert node.conversion_source == "hybrid"
+        assert node.docstring == "统计单词"
+        assert "def count_node" in node.original_code
+        assert node.converted_body.splitlines() == [
+            "text = inputs['text']", "words = text.split()", "words = words",
+            'count = inputs["count"] + len(words)', "first, rest = words[0], words[1:]", "text = first.upper()"
+        ]
+        assert {"text", "count"} <= set(node.inputs)
+        assert {"words", "count", "text"} <= set(node.outputs)
+
+        whole = AISemanticComp()._build_user_prompt((await self._extract(hybrid=False)).pending_items[0])
+        assert estimate_tokens(prompts[0]) < estimate_tokens(whole)
+
+    @pytest.mark.asyncio
+    async def test_missing_answer_keeps_todo(self):
+        """测试没有答案的片段保留 TODO，规则转换结果不受影响"""
+        extraction = await self._convert(AISemanticComp(), await self._extract(hybrid=True))
+        body = extraction.nodes[0].converted_body
+
+        assert "words = text.split()" in body
+        assert "# TODO: 需要手动转换以下代码" in body
+        assert "__AI_STATEMENT_" not in body
+
+
+class TestPromptContext:
+    """提示词上下文精简和 token 预算测试"""
+
+    async def _convert(self, comp, extraction):
+        result = await comp.invoke(inputs={"extraction_result": extraction}, runtime=None, context=None)
+        return result["extraction_result"]
+
+    def _item(self, source_code):
+        return PendingItem(
+            id="agent.py:node", pending_type=PendingType.NODE_BODY, source_code=source_code,
+            context={"state_fields": ["query", "answer", "history"], "available_tools": ["search", "calculator"]},
+            question="转换", location="agent.py:1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_only_referenced_fields_and_tools(self):
+        """测试只发送代码引用的状态字段和工具，并记录每次请求的 token 数"""
+        prompts = []
+        llm = StubLLM(default=lambda messages: prompts.append(messages[-1]["content"]) or "return {}")
+        item = self._item("def node(state):\n    return {'answer': search.invoke(state['query'])}")
+
+        extraction = await self._convert(AISemanticComp(llm=llm), ExtractionResult(pending_items=[item]))
+
+        assert "- 状态字段: ['query', 'answer']" in prompts[0]
+        assert "- 可用工具: ['search']" in prompts[0]
+        assert extraction.prompt_stats[0]["items"] == ["agent.py:node"]
+        assert extraction.prompt_stats[0]["tokens"] > estimate_tokens(prompts[0])
+
+    @pytest.mark.asyncio
+    async def test_whole_state_and_tool_map_keep_everything(self):
+        """测试整体使用 state 或引用工具映射时保留全部字段和工具"""
+        prompts = []
+        llm = StubLLM(default=lambda messages: prompts.append(messages[-1]["content"]) or "return {}")
+        item = self._item("def node(state):\n    return tool_map[state['query']].run(dict(state))")
+        extraction = ExtractionResult(pending_items=[item], tool_map_var_name="tool_map")
+
+        await self._convert(AISemanticComp(llm=llm), extraction)
+
+        assert "- 状态字段: ['query', 'answer', 'history']" in prompts[0]
+        assert "- 可用工具: ['search', 'calculator']" in prompts[0]
+
+    async def _extract_long_node(self):
+        """提取一个大部分语句可由规则转换、少数语句需要 AI 的节点"""
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "agent.py")
+            # 大部分语句可由规则转换
+            converted_lines = "".join(f"    note_{i} = text.replace('{i}', '')\n" for i in range(30))
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(AGENT_SOURCE.replace("    words = text.split()\n", "    words = text.split()\n" + converted_lines))
+            detected = await ProjectDetectorComp().invoke(inputs={"source_path": path}, runtime=None, context=None)
+            loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+            parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+            extracted = await RuleExtractorComp().invoke(inputs=parsed, runtime=None, context=None)
+        return extracted["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_budget_sends_failed_statements_only(self):
+        """测试整函数提示词超出预算时只发送规则无法转换的语句"""
+        extraction = await self._extract_long_node()
+        comp = AISemanticComp(llm=StubLLM(default=statements_reply), prompt_tokens=1)
+        whole_cost = comp._prompt_cost(extraction.pending_items[0])
+
+        extraction = await self._convert(comp, extraction)
+
+        assert extraction.nodes[0].conversion_source == "hybrid"
+        assert "__AI_STATEMENT_" not in extraction.nodes[0].converted_body
+        assert extraction.prompt_stats[0]["tokens"] < whole_cost
+
+    @pytest.mark.asyncio
+    async def test_statements_over_budget_flagged(self, capsys):
+        """测试整函数和语句级提示词都超出预算时标记 over_budget，并在报告和 CLI 中警告"""
+        from lg2jiuwen_tool.cli import print_result
+        from lg2jiuwen_tool.components.report import ReportComp
+        from lg2jiuwen_tool.service import MigrationResult
+
+        extraction = await self._extract_long_node()
+        item = extraction.pending_items[0]
+        comp = AISemanticComp(llm=StubLLM(default=statements_reply), prompt_tokens=1)
+        assert comp._prompt_cost(item.context["statements"]) > 1
+
+        extraction = await self._convert(comp, extraction)
+
+        assert extraction.prompt_stats[0]["over_budget"] is True
+        report = ReportComp()._gen_prompt_stats(extraction)
+        assert f"**警告**: 1 次 AI 请求的提示词超出 token 预算（只发送无法转换的语句仍超出）: {item.id}" in report
+
+        print_result(MigrationResult(
+            success=True, generated_files=[], report="", rule_count=0, ai_count=1, errors=[],
+            prompt_stats=extraction.prompt_stats
+        ))
+        assert "警告: 1 次 AI 请求的提示词超出 token 预算" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_within_budget_not_flagged(self):
+        """测试提示词在预算内时不标记 over_budget，报告中没有警告"""
+        from lg2jiuwen_tool.components.report import ReportComp
+
+        extraction = await self._convert(
+            AISemanticComp(llm=StubLLM(default=statements_reply), prompt_tokens=100000), await self._extract_long_node()
+        )
+
+        assert extraction.prompt_stats[0]["over_budget"] is False
+        assert "警告" not in ReportComp()._gen_prompt_stats(extraction)
+
+
+class TieredLLM:
+    """按模型名返回固定响应的 LLM"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.models = []
+
+    async def ainvoke(self, model_name=None, messages=None, **kwargs):
+        from openjiuwen.core.utils.llm.messages import AIMessage
+
+        self.models.append(model_name)
+        return AIMessage(content=self.responses[model_name])
+
+
+class TestModelTiering:
+    """模型分级与升级测试"""
+
+    async def _convert(self, llm, items):
+        comp = AISemanticComp(llm=llm, models=["fast", "strong"])
+        result = await comp.invoke(
+            inputs={"extraction_result": ExtractionResult(pending_items=items)}, runtime=None, context=None
+        )
+        return result["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_fast_model_accepted(self):
+        """测试快速模型的结果通过校验时不升级"""
+        llm = TieredLLM({"fast": 'return {"a": inputs["x"]}', "strong": "return {}"})
+        extraction = await self._convert(llm, [make_item("a")])
+
+        assert llm.models == ["fast"]
+        assert extraction.escalations == []
+        assert extraction.nodes[0].converted_body == 'return {"a": inputs["x"]}'
+        assert extraction.prompt_stats[0]["model"] == "fast"
+
+    @pytest.mark.parametrize("fast_reply, reason", [
+        ('return {"a": inputs["x"]', "无法解析"),
+        ('return {"b": inputs["x"]}', "缺少输出字段 ['a']"),
+        ('return {"a": inputs["y"]}', "未使用的字段 ['y']"),
+    ])
+    @pytest.mark.asyncio
+    async def test_invalid_result_escalates(self, fast_reply, reason):
+        """测试结果无法解析或字段不一致时升级到下一级模型"""
+        llm = TieredLLM({"fast": fast_reply, "strong": 'return {"a": inputs["x"]}'})
+        extraction = await self._convert(llm, [make_item("a")])
+
+        assert llm.models == ["fast", "strong"]
+        assert extraction.nodes[0].converted_body == 'return {"a": inputs["x"]}'
+        escalation = extraction.escalations[0]
+        assert (escalation["item"], escalation["from"], escalation["to"]) == ("agent.py:a", "fast", "strong")
+        assert reason in escalation["reason"]
+
+    @pytest.mark.asyncio
+    async def test_last_tier_unparsable_falls_back(self):
+        """测试最后一级模型的结果仍无法解析时生成 TODO"""
+        llm = TieredLLM({"fast": "return {", "strong": "return {"})
+        extraction = await self._convert(llm, [make_item("a")])
+        assert "# TODO: 需要手动转换以下代码" in extraction.nodes[0].converted_body
+
+    @pytest.mark.asyncio
+    async def test_statements_escalate(self):
+        """测试语句片段缺少状态写入时升级，并在报告中列出"""
+        from lg2jiuwen_tool.components.report import ReportComp
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "agent.py")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(AGENT_SOURCE)
+            detected = await ProjectDetectorComp().invoke(inputs={"source_path": path}, runtime=None, context=None)
+            loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+            parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+            extracted = await RuleExtractorComp(hybrid=True).invoke(inputs=parsed, runtime=None, context=None)
+
+        llm = TieredLLM({
+            "fast": "### __AI_STATEMENT_1__\n```python\nfirst, rest = words[0], words[1:]\n```",
+            "strong": statements_reply([{"role": "user", "content": "### __AI_STATEMENT_1__"}]),
+        })
+        extraction = await self._convert(llm, extracted["extraction_result"].pending_items)
+
+        assert llm.models == ["fast", "strong"]
+        assert 'count = inputs["count"] + len(words)' in extraction.nodes[0].converted_body
+        assert "缺少输出字段 ['count']" in extraction.escalations[0]["reason"]
+        assert f"| {path}:count | fast | strong |" in ReportComp()._gen_conversion_stats(extraction)
+
+    @pytest.mark.asyncio
+    async def test_batch_answer_escalates_to_next_tier(self):
+        """测试批量答案未通过检查时直接升级到下一级模型，并记录从批量模型的升级"""
+        # 快速模型对第 2 项给出能解析但缺少输出字段的答案
+        llm = TieredLLM({
+            "fast": '### ITEM 1\n```python\nreturn {"a": inputs["x"]}\n```\n\n'
+                    '### ITEM 2\n```python\nreturn {"a": inputs["x"]}\n```',
+            "strong": 'return {"b": inputs["x"]}',
+        })
+        comp = AISemanticComp(llm=llm, models=["fast", "strong"], batch_tokens=4000)
+        result = await comp.invoke(
+            inputs={"extraction_result": ExtractionResult(pending_items=[make_item("a"), make_item("b")])},
+            runtime=None,
+            context=None
+        )
+        extraction = result["extraction_result"]
+
+        assert llm.models == ["fast", "strong"]
+        assert [n.converted_body for n in extraction.nodes] == ['return {"a": inputs["x"]}', 'return {"b": inputs["x"]}']
+        escalation = extraction.escalations[0]
+        assert (escalation["item"], escalation["from"], escalation["to"]) == ("agent.py:b", "fast", "strong")
+        assert "缺少输出字段 ['b']" in escalation["reason"]
+
+
+class TestPipelinedDispatch:
+    """流水线模式测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, "agent.py")
+        with open(self.source_path, "w", encoding="utf-8") as f:
+            f.write(AGENT_SOURCE)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    async def _run(self, pipeline):
+        llm = StubLLM(default=statements_reply, latency=0.02)
+        ai = AISemanticComp(llm=llm)
+        extractor = RuleExtractorComp(hybrid=True, on_pending=ai.submit if pipeline else None)
+
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": self.source_path}, runtime=None, context=None
+        )
+        loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+        parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+        extracted = await extractor.invoke(inputs=parsed, runtime=None, context=None)
+        dispatched = llm.calls
+
+        result = await ai.invoke(inputs=extracted, runtime=None, context=None)
+        return dispatched, llm.calls, result["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_dispatched_during_extraction(self):
+        """测试待处理项在提取阶段即派发，AI 阶段只汇合结果"""
+        dispatched, calls, extraction = await self._run(pipeline=True)
+
+        assert dispatched == calls == 1
+        assert extraction.pending_items == []
+        assert len(extraction.prompt_stats) == 1
+
+    @pytest.mark.asyncio
+    async def test_same_result_as_sequential(self):
+        """测试流水线模式与顺序模式的转换结果一致"""
+        _, _, pipelined = await self._run(pipeline=True)
+        dispatched, _, sequential = await self._run(pipeline=False)
+
+        assert dispatched == 0
+        assert [n.converted_body for n in pipelined.nodes] == [n.converted_body for n in sequential.nodes]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limited(self):
+        """测试派发的请求同时进行的数量不超过 max_concurrency"""
+        llm = PeakLLM(default=batch_reply(), latency=0.02)
+        ai = AISemanticComp(llm=llm, max_concurrency=2)
+        items = [make_item(f"node_{i}") for i in range(6)]
+        extraction_result = ExtractionResult(pending_items=list(items))
+        for item in items:
+            ai.submit(item, extraction_result)
+
+        result = await ai.invoke(inputs={"extraction_result": extraction_result}, runtime=None, context=None)
+
+        assert llm.calls == 6
+        assert llm.peak == 2
+        assert len(result["extraction_result"].nodes) == 6
+
+    @pytest.mark.asyncio
+    async def test_cancel_inflight(self):
+        """测试取消未汇合的派发任务，不留下悬挂任务和统计"""
+        ai = AISemanticComp(llm=StubLLM(default=batch_reply(), latency=10))
+        extraction_result = ExtractionResult(pending_items=[make_item("a"), make_item("b")])
+        for item in extraction_result.pending_items:
+            ai.submit(item, extraction_result)
+        tasks = [task for _, task in ai._inflight.values()]
+        await asyncio.sleep(0)
+
+        await ai.cancel_inflight()
+
+        assert all(task.cancelled() for task in tasks)
+        assert ai._inflight == {}
+        assert ai._prompt_stats == []
+
+    @pytest.mark.asyncio
+    async def test_workflow_failure_cancels_inflight(self):
+        """测试工作流在 AI 阶段之前失败时取消已派发的任务"""
+        class FailingWorkflow:
+            async def invoke(self, inputs, runtime):
+                ai.submit(make_item("a"), ExtractionResult())
+                raise RuntimeError("提取失败")
+
+            async def stream(self, inputs, runtime):
+                yield "chunk"
+
+        ai = AISemanticComp(llm=StubLLM(default=batch_reply(), latency=10))
+        workflow = FailingWorkflow()
+        _cancel_inflight_on_exit(workflow, ai)
+
+        with pytest.raises(RuntimeError):
+            await workflow.invoke({}, None)
+
+        assert ai._inflight == {}
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
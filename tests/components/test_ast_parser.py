@@ -4,7 +4,7 @@ AST 解析组件单元测试
 import ast
 import pytest
 
-from lg2jiuwen_tool.components.ast_parser import ASTParserComp
+from lg2jiuwen_tool.components.ast_parser import ASTCache, ASTParserComp, parse_source
 
 
 class TestASTParserComp:
@@ -160,3 +160,56 @@ def my_tool(query: str) -> str:
             context=None
         )
         assert result["dependency_order"] == order
+
+
+class TestParseSourceCache:
+    """AST 缓存测试"""
+
+    def setup_method(self):
+        self.cache = ASTCache()
+
+    def test_same_content_reuses_tree(self):
+        """测试相同内容复用缓存的 AST"""
+        tree1 = parse_source("x = 1", "a.py", self.cache)
+        tree2 = parse_source("x = 1", "a.py", self.cache)
+        assert tree1 is tree2
+
+    def test_changed_content_reparses(self):
+        """测试内容变化后重新解析"""
+        tree1 = parse_source("x = 1", "a.py", self.cache)
+        tree2 = parse_source("x = 2", "a.py", self.cache)
+        assert tree1 is not tree2
+        assert tree2.body[0].value.value == 2
+
+    def test_syntax_error_not_cached(self):
+        """测试语法错误不会被缓存"""
+        with pytest.raises(SyntaxError):
+            parse_source("def broken(:", "bad.py", self.cache)
+        with pytest.raises(SyntaxError):
+            parse_source("def broken(:", "bad.py", self.cache)
+        assert len(self.cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        """测试超出容量时淘汰最久未使用的 AST"""
+        cache = ASTCache(max_entries=2)
+        tree_a = parse_source("a = 1", "a.py", cache)
+        parse_source("b = 1", "b.py", cache)
+        parse_source("a = 1", "a.py", cache)
+        parse_source("c = 1", "c.py", cache)
+
+        assert len(cache) == 2
+        assert parse_source("a = 1", "a.py", cache) is tree_a
+
+    def test_no_cache_by_default(self):
+        """测试未指定缓存时每次重新解析，不在进程中保留 AST"""
+        assert parse_source("x = 1", "a.py") is not parse_source("x = 1", "a.py")
+
+    @pytest.mark.asyncio
+    async def test_parser_uses_injected_cache(self):
+        """测试解析组件经注入的缓存解析"""
+        inputs = {"file_contents": {"a__DOT__py": "x = 1"}, "dependency_order": ["a__DOT__py"]}
+        first = await ASTParserComp(cache=self.cache).invoke(inputs=inputs, runtime=None, context=None)
+        second = await ASTParserComp(cache=self.cache).invoke(inputs=inputs, runtime=None, context=None)
+
+        assert first["ast_map"]["a__DOT__py"] is second["ast_map"]["a__DOT__py"]
+        assert len(self.cache) == 1
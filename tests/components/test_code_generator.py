@@ -0,0 +1,277 @@
+"""
+代码生成组件单元测试（检查生成代码的运行时行为）
+"""
+import os
+
+import pytest
+
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'example', 'langgraph'
+)
+
+
+async def generate(source_path):
+    """迁移到内存，返回 {相对路径: 源码}"""
+    result = await migrate_async(
+        source_path, "unused",
+        MigrationOptions(use_ai=False, include_report=False, include_ir=False, output_mode="memory")
+    )
+    assert result.success, result.errors
+    return {path: content.decode("utf-8") for path, content in result.files.items()}
+
+
+class TestSharedLLM:
+    """共享 LLM 客户端测试"""
+
+    @pytest.mark.asyncio
+    async def test_multi_file_config_caches_llm(self):
+        """测试多文件模式 config.get_llm 按配置复用实例"""
+        files = await generate(os.path.join(EXAMPLE_DIR, 'react_agent'))
+        namespace = {}
+        exec(compile(files["agent/config.py"], "config.py", "exec"), namespace)
+
+        get_llm = namespace["get_llm"]
+        assert get_llm() is get_llm()
+        assert get_llm(api_key="other") is not get_llm()
+
+        for path, code in files.items():
+            if path.startswith("agent/components/") and "get_llm()" in code:
+                assert "OpenAIChatModel(" not in code
+
+    @pytest.mark.asyncio
+    async def test_single_file_components_share_llm(self):
+        """测试单文件模式组件不再各自创建 LLM"""
+        files = await generate(os.path.join(EXAMPLE_DIR, 'weather_agent.py'))
+        (code,) = files.values()
+        assert code.count("OpenAIChatModel(") == 1
+        assert "self._llm = get_llm()" in code
+        compile(code, "agent_openjiuwen.py", "exec")
+
+
+class TestPooledHttp:
+    """工具共享 HTTP 客户端测试"""
+
+    def setup_method(self):
+        from lg2jiuwen_tool.components.code_generator import CodeGeneratorComp
+        self.generator = CodeGeneratorComp()
+
+    def test_rewrite_module_level_calls(self):
+        """测试模块级调用替换为共享客户端"""
+        code = (
+            "msg = '天气'; resp = httpx.get(url, timeout=10)\n"
+            "requests.post(url, json={'q': msg})\n"
+            "httpx.get(url, verify=False)\n"
+            "httpx.get(url, **options)\n"
+            "error = httpx.HTTPStatusError"
+        )
+        body, libs = self.generator._pool_http_calls(code)
+        assert libs == {"httpx", "requests"}
+        assert body.split("\n") == [
+            "msg = '天气'; resp = get_http_client().get(url, timeout=10)",
+            "get_requests_session().post(url, json={'q': msg})",
+            "httpx.get(url, verify=False)",
+            "httpx.get(url, **options)",
+            "error = httpx.HTTPStatusError",
+        ]
+
+    def test_unparsable_code_unchanged(self):
+        """测试无法解析的代码保持原样"""
+        assert self.generator._pool_http_calls("httpx.get(") == ("httpx.get(", set())
+
+    @pytest.mark.asyncio
+    async def test_generated_config_shares_client(self):
+        """测试生成的 config 只创建一个 httpx 客户端"""
+        files = await generate(os.path.join(EXAMPLE_DIR, 'react_agent'))
+        assert "get_http_client().get(" in files["agent/tools.py"]
+
+        namespace = {}
+        exec(compile(files["agent/config.py"], "config.py", "exec"), namespace)
+        client = namespace["get_http_client"]()
+        try:
+            assert namespace["get_http_client"]() is client
+            assert client.timeout.read == namespace["HTTP_TIMEOUT"]
+        finally:
+            client.close()
+
+
+class TestOffLoopTools:
+    """同步工具在事件循环外执行测试"""
+
+    def setup_method(self):
+        from lg2jiuwen_tool.components.code_generator import CodeGeneratorComp
+        self.generator = CodeGeneratorComp()
+
+    def test_await_missing_on_tool_calls(self):
+        """测试为遗漏 await 的工具调用补上 await"""
+        body = (
+            "a = invoke_tool(name, arg)\n"
+            "b = await invoke_tool(name, arg)\n"
+            "c = await call_tool(search, {'q': a})\n"
+            "d = call_tool(search, {'q': b})\n"
+            "e = self.invoke_tool(name)"
+        )
+        assert self.generator._await_tool_calls(body).split("\n") == [
+            "a = await invoke_tool(name, arg)",
+            "b = await invoke_tool(name, arg)",
+            "c = await call_tool(search, {'q': a})",
+            "d = await call_tool(search, {'q': b})",
+            "e = self.invoke_tool(name)",
+        ]
+
+    def test_await_skips_nested_scopes(self):
+        """测试嵌套函数和 lambda 中的工具调用不补 await（补上会导致语法错误）"""
+        body = (
+            "def lookup(arg):\n"
+            "    return invoke_tool(name, arg)\n"
+            "fetch = lambda q: call_tool(search, {'q': q})\n"
+            "result = invoke_tool(name, arg)\n"
+            "return {'result': result}"
+        )
+        converted = self.generator._await_tool_calls(body)
+
+        assert converted.split("\n") == [
+            "def lookup(arg):",
+            "    return invoke_tool(name, arg)",
+            "fetch = lambda q: call_tool(search, {'q': q})",
+            "result = await invoke_tool(name, arg)",
+            "return {'result': result}",
+        ]
+        compile("async def invoke():\n" + "".join(f"    {line}\n" for line in converted.split("\n")), "<test>", "exec")
+
+    def test_await_skips_strings_and_comments(self):
+        """测试字符串和注释中的工具调用文本保持不变"""
+        body = (
+            "# invoke_tool(name, arg) 调用工具\n"
+            "hint = 'use call_tool(search, {})'\n"
+            "text = invoke_tool(name, f'invoke_tool({arg})')"
+        )
+        assert self.generator._await_tool_calls(body).split("\n") == [
+            "# invoke_tool(name, arg) 调用工具",
+            "hint = 'use call_tool(search, {})'",
+            "text = await invoke_tool(name, f'invoke_tool({arg})')",
+        ]
+
+    def test_await_parenthesizes_chained_call(self):
+        """测试工具调用结果继续取属性或下标时加括号"""
+        body = "a = invoke_tool(name, arg).strip()\nb = call_tool(search, {})['items']"
+        assert self.generator._await_tool_calls(body).split("\n") == [
+            "a = (await invoke_tool(name, arg)).strip()",
+            "b = (await call_tool(search, {}))['items']",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sync_tool_runs_in_executor(self):
+        """测试同步工具在线程池执行，异步工具直接 await"""
+        import asyncio
+        import threading
+
+        from openjiuwen.core.utils.tool.param import Param
+        from openjiuwen.core.utils.tool.tool import tool
+
+        namespace = {}
+        exec(
+            "import asyncio, functools, inspect, os\n"
+            "from concurrent.futures import ThreadPoolExecutor\n",
+            namespace
+        )
+        exec(self.generator._gen_tool_dispatch("TOOLS"), namespace)
+
+        params = [Param(name="city", description="城市", param_type="string", required=True)]
+
+        @tool(name="sync_tool", description="同步工具", params=params)
+        def sync_tool(city: str) -> str:
+            return threading.current_thread().name
+
+        @tool(name="async_tool", description="异步工具", params=params)
+        async def async_tool(city: str) -> str:
+            await asyncio.sleep(0)
+            return threading.current_thread().name
+
+        namespace["TOOLS"] = {"sync_tool": sync_tool, "async_tool": async_tool}
+        loop_thread = threading.current_thread().name
+
+        assert (await namespace["invoke_tool"]("sync_tool", "北京")).startswith("tool")
+        assert await namespace["call_tool"](async_tool, {"city": "北京"}) == loop_thread
+        assert await namespace["invoke_tool"]("missing", "北京") == "未知工具: missing"
+
+    @pytest.mark.asyncio
+    async def test_generated_tools_module(self):
+        """测试生成的 tools.py 中 invoke_tool 为异步函数"""
+        files = await generate(os.path.join(EXAMPLE_DIR, 'react_agent'))
+        tools_code = files["agent/tools.py"]
+        assert "async def invoke_tool(" in tools_code
+        assert "run_in_executor(" in tools_code
+        compile(tools_code, "tools.py", "exec")
+        for path, code in files.items():
+            if path.startswith("agent/components/"):
+                assert "= invoke_tool(" not in code
+
+
+class TestWorkflowRunners:
+    """生成的 main.py 运行入口测试"""
+
+    def setup_method(self):
+        import asyncio
+        import threading
+
+        from openjiuwen.core.component.base import WorkflowComponent
+        from openjiuwen.core.component.end_comp import End
+        from openjiuwen.core.component.start_comp import Start
+        from openjiuwen.core.runtime.base import ComponentExecutable
+        from openjiuwen.core.runtime.workflow import WorkflowRuntime
+        from openjiuwen.core.workflow.base import Workflow
+
+        from lg2jiuwen_tool.components.code_generator import CodeGeneratorComp
+
+        class EchoComp(WorkflowComponent, ComponentExecutable):
+            async def invoke(self, inputs, runtime, context):
+                await asyncio.sleep(0.01)
+                return {"out": inputs["x"]}
+
+        self.builds = 0
+
+        def build_demo_workflow():
+            self.builds += 1
+            workflow = Workflow()
+            workflow.set_start_comp("start", Start(), inputs_schema={"x": "${x}"})
+            workflow.add_workflow_comp("echo", EchoComp(), inputs_schema={"x": "${start.x}"})
+            workflow.set_end_comp("end", End(), inputs_schema={"out": "${echo.out}"})
+            workflow.add_connection("start", "echo")
+            workflow.add_connection("echo", "end")
+            return workflow
+
+        self.namespace = {
+            "asyncio": asyncio, "os": os, "threading": threading,
+            "WorkflowRuntime": WorkflowRuntime, "build_demo_workflow": build_demo_workflow,
+        }
+        exec(CodeGeneratorComp()._gen_runners("demo"), self.namespace)
+
+    def test_run_reuses_workflow(self):
+        """测试多次 run 只构建一次工作流"""
+        run = self.namespace["run"]
+        assert run({"x": 1}).result == {"output": {"out": 1}}
+        assert run({"x": 2}).result == {"output": {"out": 2}}
+        assert self.builds == 1
+
+    def test_run_batch_concurrency(self):
+        """测试批量运行按输入顺序返回，实例数不超过并发数"""
+        results = self.namespace["run_batch"]([{"x": i} for i in range(6)], concurrency=3)
+        assert [r.result["output"]["out"] for r in results] == list(range(6))
+        assert self.builds == 3
+
+        self.namespace["run_batch"]([{"x": i} for i in range(6)], concurrency=3)
+        assert self.builds == 3
+
+    @pytest.mark.asyncio
+    async def test_generated_main_exposes_runners(self):
+        """测试生成的 main.py 提供 arun / run_batch"""
+        files = await generate(os.path.join(EXAMPLE_DIR, 'react_agent'))
+        main_code = files["agent/main.py"]
+        assert "async def arun(" in main_code
+        assert "def run_batch(" in main_code
+        assert main_code.count("build_agent_workflow()") == 1
+        compile(main_code, "main.py", "exec")
@@ -0,0 +1,160 @@
+"""
+流水线规则提取组件单元测试
+"""
+import gc
+import os
+import tempfile
+import weakref
+import pytest
+
+from lg2jiuwen_tool.components.project_detector import ProjectDetectorComp
+from lg2jiuwen_tool.components.file_loader import FileLoaderComp
+from lg2jiuwen_tool.components.ast_parser import ASTParserComp
+from lg2jiuwen_tool.components.rule_extractor import RuleExtractorComp
+from lg2jiuwen_tool.components.pipelined_extractor import PipelinedExtractorComp
+
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'example', 'langgraph', 'react_agent'
+)
+
+
+class TestPipelinedExtractorComp:
+    """流水线规则提取组件测试"""
+
+    def setup_method(self):
+        self.comp = PipelinedExtractorComp()
+
+    async def _extract_full(self, detected):
+        """通过 loader → parser → extractor 全量提取"""
+        loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+        parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+        extracted = await RuleExtractorComp().invoke(inputs=parsed, runtime=None, context=None)
+        return extracted["extraction_result"]
+
+    def _assert_same(self, actual, expected):
+        assert [n.name for n in actual.nodes] == [n.name for n in expected.nodes]
+        assert [n.converted_body for n in actual.nodes] == [n.converted_body for n in expected.nodes]
+        assert [(e.source, e.target) for e in actual.edges] == \
+            [(e.source, e.target) for e in expected.edges]
+        assert [t.name for t in actual.tools] == [t.name for t in expected.tools]
+        assert [s.name for s in actual.states] == [s.name for s in expected.states]
+        assert actual.global_vars == expected.global_vars
+        assert actual.entry_point == expected.entry_point
+        assert len(actual.pending_items) == len(expected.pending_items)
+
+    @pytest.mark.asyncio
+    async def test_matches_full_extraction(self):
+        """测试流水线提取结果与全量提取一致"""
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": EXAMPLE_DIR}, runtime=None, context=None
+        )
+        expected = await self._extract_full(detected)
+
+        result = await self.comp.invoke(inputs=detected, runtime=None, context=None)
+        self._assert_same(result["extraction_result"], expected)
+        assert result["load_errors"] == []
+
+    @pytest.mark.asyncio
+    async def test_queue_size_one(self):
+        """测试队列容量为 1 时结果不变"""
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": EXAMPLE_DIR}, runtime=None, context=None
+        )
+        expected = await self._extract_full(detected)
+
+        comp = PipelinedExtractorComp(queue_size=1)
+        result = await comp.invoke(inputs=detected, runtime=None, context=None)
+        self._assert_same(result["extraction_result"], expected)
+
+    @pytest.mark.asyncio
+    async def test_cross_file_router(self):
+        """测试路由函数定义在其他文件中"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            routing = os.path.join(temp_dir, 'routing.py')
+            graph = os.path.join(temp_dir, 'graph.py')
+            with open(routing, 'w') as f:
+                f.write(
+                    'def route(state):\n'
+                    '    if state["done"]:\n'
+                    '        return "end"\n'
+                    '    return "work"\n'
+                )
+            with open(graph, 'w') as f:
+                f.write(
+                    'from langgraph.graph import StateGraph, END\n'
+                    'from routing import route\n'
+                    '\n'
+                    'def work(state):\n'
+                    '    return {"done": True}\n'
+                    '\n'
+                    'graph = StateGraph(dict)\n'
+                    'graph.add_node("work", work)\n'
+                    'graph.set_entry_point("work")\n'
+                    'graph.add_conditional_edges("work", route, {"end": END, "work": "work"})\n'
+                )
+
+            result = await self.comp.invoke(
+                inputs={"file_list": [routing, graph], "dependency_order": [routing, graph]},
+                runtime=None,
+                context=None
+            )
+            actual = result["extraction_result"]
+            assert any(e.condition_func_code for e in actual.edges)
+
+    @pytest.mark.asyncio
+    async def test_skip_invalid_file(self):
+        """测试语法错误和无法读取的文件被跳过并记录错误"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = os.path.join(temp_dir, 'good.py')
+            bad = os.path.join(temp_dir, 'bad.py')
+            missing = os.path.join(temp_dir, 'missing.py')
+            with open(good, 'w') as f:
+                f.write('def func_a(): pass\n')
+            with open(bad, 'w') as f:
+                f.write('def broken(:\n')
+
+            result = await self.comp.invoke(
+                inputs={"file_list": [good, bad, missing], "dependency_order": [good, bad, missing]},
+                runtime=None,
+                context=None
+            )
+            errors = result["load_errors"]
+            assert len(errors) == 2
+            assert "bad.py" in errors[0]
+            assert "missing.py" in errors[1]
+            assert result["extraction_result"].load_errors == errors
+
+    @pytest.mark.asyncio
+    async def test_trees_released_after_extract(self, monkeypatch):
+        """测试提取阶段从队列消费 AST，提取完的文件不再驻留内存"""
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": EXAMPLE_DIR}, runtime=None, context=None
+        )
+        comp = PipelinedExtractorComp(queue_size=1)
+        extracted = []
+        original = comp._extract_scanned
+
+        def tracking_extract(index, file_path, tree, result):
+            # 之前提取过的文件的 AST 应已释放
+            gc.collect()
+            assert all(ref() is None for ref in extracted)
+            original(index, file_path, tree, result)
+            extracted.append(weakref.ref(tree))
+
+        monkeypatch.setattr(comp, "_extract_scanned", tracking_extract)
+        result = await comp.invoke(inputs=detected, runtime=None, context=None)
+
+        assert len(extracted) > 1
+        self._assert_same(result["extraction_result"], await self._extract_full(detected))
+
+    @pytest.mark.asyncio
+    async def test_no_loadable_files(self):
+        """测试所有文件都无法加载时报错"""
+        with pytest.raises(ValueError):
+            await self.comp.invoke(
+                inputs={"file_list": ["/nonexistent/a.py"], "dependency_order": []},
+                runtime=None,
+                context=None
+            )
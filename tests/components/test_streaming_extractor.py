@@ -0,0 +1,205 @@
+"""
+流式规则提取组件单元测试
+"""
+import ast
+import os
+import tempfile
+import pytest
+
+from lg2jiuwen_tool.components.project_detector import ProjectDetectorComp
+from lg2jiuwen_tool.components.file_loader import FileLoaderComp
+from lg2jiuwen_tool.components.ast_parser import ASTParserComp
+from lg2jiuwen_tool.components.rule_extractor import RuleExtractorComp
+from lg2jiuwen_tool.components.report import ReportComp
+from lg2jiuwen_tool.components.streaming_extractor import StreamingExtractorComp
+
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'example', 'langgraph', 'react_agent'
+)
+
+
+class TestStreamingExtractorComp:
+    """流式规则提取组件测试"""
+
+    def setup_method(self):
+        self.comp = StreamingExtractorComp()
+
+    async def _extract_full(self, detected):
+        """通过 loader → parser → extractor 全量提取"""
+        loaded = await FileLoaderComp().invoke(inputs=detected, runtime=None, context=None)
+        parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+        extracted = await RuleExtractorComp().invoke(inputs=parsed, runtime=None, context=None)
+        return extracted["extraction_result"]
+
+    @pytest.mark.asyncio
+    async def test_matches_full_extraction(self):
+        """测试流式提取结果与全量提取一致"""
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": EXAMPLE_DIR}, runtime=None, context=None
+        )
+        expected = await self._extract_full(detected)
+
+        result = await self.comp.invoke(inputs=detected, runtime=None, context=None)
+        actual = result["extraction_result"]
+
+        assert [n.name for n in actual.nodes] == [n.name for n in expected.nodes]
+        assert [n.converted_body for n in actual.nodes] == [n.converted_body for n in expected.nodes]
+        assert [(e.source, e.target) for e in actual.edges] == \
+            [(e.source, e.target) for e in expected.edges]
+        assert [t.name for t in actual.tools] == [t.name for t in expected.tools]
+        assert [s.name for s in actual.states] == [s.name for s in expected.states]
+        assert actual.global_vars == expected.global_vars
+        assert actual.entry_point == expected.entry_point
+        assert len(actual.pending_items) == len(expected.pending_items)
+
+    @pytest.mark.asyncio
+    async def test_cross_file_router(self):
+        """测试路由函数定义在其他文件中"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, 'routing.py'), 'w') as f:
+                f.write(
+                    'def route(state):\n'
+                    '    if state["done"]:\n'
+                    '        return "end"\n'
+                    '    return "work"\n'
+                )
+            with open(os.path.join(temp_dir, 'graph.py'), 'w') as f:
+                f.write(
+                    'from langgraph.graph import StateGraph, END\n'
+                    'from routing import route\n'
+                    '\n'
+                    'def work(state):\n'
+                    '    return {"done": True}\n'
+                    '\n'
+                    'graph = StateGraph(dict)\n'
+                    'graph.add_node("work", work)\n'
+                    'graph.set_entry_point("work")\n'
+                    'graph.add_conditional_edges("work", route, {"end": END, "work": "work"})\n'
+                )
+
+            detected = await ProjectDetectorComp().invoke(
+                inputs={"source_path": temp_dir}, runtime=None, context=None
+            )
+            expected = await self._extract_full(detected)
+            result = await self.comp.invoke(inputs=detected, runtime=None, context=None)
+
+            actual = result["extraction_result"]
+            assert [(e.source, e.condition_func_code) for e in actual.edges] == \
+                [(e.source, e.condition_func_code) for e in expected.edges]
+            assert any(e.condition_func_code for e in actual.edges)
+
+    @pytest.mark.asyncio
+    async def test_skip_invalid_file(self):
+        """测试语法错误的文件被跳过并记录错误"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = os.path.join(temp_dir, 'good.py')
+            bad = os.path.join(temp_dir, 'bad.py')
+            with open(good, 'w') as f:
+                f.write('def func_a(): pass\n')
+            with open(bad, 'w') as f:
+                f.write('def broken(:\n')
+
+            result = await self.comp.invoke(
+                inputs={"file_list": [good, bad], "dependency_order": [good, bad]},
+                runtime=None,
+                context=None
+            )
+            assert len(result["load_errors"]) == 1
+            assert "bad.py" in result["load_errors"][0]
+            # 错误随提取结果进入报告
+            extraction = result["extraction_result"]
+            assert extraction.load_errors == result["load_errors"]
+            report = ReportComp()._generate_report(extraction, [], None)
+            assert result["load_errors"][0] in report
+
+    @pytest.mark.asyncio
+    async def test_full_extraction_keeps_load_errors(self):
+        """测试全量模式下加载和解析阶段的错误同样进入提取结果"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = os.path.join(temp_dir, 'good.py')
+            bad = os.path.join(temp_dir, 'bad.py')
+            with open(good, 'w') as f:
+                f.write('def func_a(): pass\n')
+            with open(bad, 'w') as f:
+                f.write('def broken(:\n')
+
+            loaded = await FileLoaderComp().invoke(
+                inputs={"file_list": [good, bad], "dependency_order": [good, bad]},
+                runtime=None,
+                context=None
+            )
+            parsed = await ASTParserComp().invoke(inputs=loaded, runtime=None, context=None)
+            extracted = await RuleExtractorComp().invoke(
+                inputs={**parsed, "load_errors": loaded["load_errors"] + parsed["parse_errors"]},
+                runtime=None,
+                context=None
+            )
+            errors = extracted["extraction_result"].load_errors
+            assert len(errors) == 1
+            assert "bad.py" in errors[0]
+
+    @pytest.mark.asyncio
+    async def test_parses_each_file_at_most_twice(self, monkeypatch):
+        """测试每个文件最多解析两次（符号扫描一次，提取一次）"""
+        parsed = []
+        original_parse = ast.parse
+
+        def counting_parse(source, filename="<unknown>", *args, **kwargs):
+            parsed.append(filename)
+            return original_parse(source, filename, *args, **kwargs)
+
+        detected = await ProjectDetectorComp().invoke(
+            inputs={"source_path": EXAMPLE_DIR}, runtime=None, context=None
+        )
+        monkeypatch.setattr(ast, "parse", counting_parse)
+        await self.comp.invoke(inputs=detected, runtime=None, context=None)
+
+        files = detected["dependency_order"] or detected["file_list"]
+        assert parsed
+        assert all(parsed.count(file_path) <= 2 for file_path in files)
+
+    @pytest.mark.asyncio
+    async def test_router_redefined_after_reference(self):
+        """测试路由函数在引用之后才定义、且被多次定义时，使用最后的定义"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            graph = os.path.join(temp_dir, 'graph.py')
+            first = os.path.join(temp_dir, 'routing_v1.py')
+            second = os.path.join(temp_dir, 'routing_v2.py')
+            with open(graph, 'w') as f:
+                f.write(
+                    'from langgraph.graph import StateGraph, END\n'
+                    '\n'
+                    'def work(state):\n'
+                    '    return {"done": True}\n'
+                    '\n'
+                    'graph = StateGraph(dict)\n'
+                    'graph.add_node("work", work)\n'
+                    'graph.set_entry_point("work")\n'
+                    'graph.add_conditional_edges("work", route, {"end": END, "work": "work"})\n'
+                )
+            with open(first, 'w') as f:
+                f.write('def route(state):\n    return "work"\n')
+            with open(second, 'w') as f:
+                f.write('def route(state):\n    return "end"\n')
+
+            order = [graph, first, second]
+            inputs = {"file_list": order, "dependency_order": order}
+            expected = await self._extract_full(inputs)
+            result = await self.comp.invoke(inputs=inputs, runtime=None, context=None)
+
+            actual = result["extraction_result"]
+            assert [e.condition_func_code for e in actual.edges] == \
+                [e.condition_func_code for e in expected.edges]
+            assert any("return 'end'" in (e.condition_func_code or "") for e in actual.edges)
+
+    @pytest.mark.asyncio
+    async def test_no_loadable_files(self):
+        """测试所有文件都无法加载时报错"""
+        with pytest.raises(ValueError):
+            await self.comp.invoke(
+                inputs={"file_list": ["/nonexistent/a.py"], "dependency_order": []},
+                runtime=None,
+                context=None
+            )
@@ -0,0 +1,111 @@
+"""
+规则链计数单元测试
+"""
+import ast
+import os
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.components.report import ReportComp
+from lg2jiuwen_tool.rules.base import PassthroughRule, RuleChain
+from lg2jiuwen_tool.rules.edge_rules import ReturnRule
+from lg2jiuwen_tool.rules.state_rules import StateAssignRule
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+from lg2jiuwen_tool.workflow.state import ExtractionResult
+
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'example', 'langgraph', 'react_agent'
+)
+
+SOURCE = '''
+state["y"] = 1
+print(state["y"])
+del value
+return {"y": 1}
+'''
+
+
+class TestRuleChainStats:
+    """规则链计数测试"""
+
+    def _chain(self, collect_stats):
+        return RuleChain([StateAssignRule(), ReturnRule(), PassthroughRule()], collect_stats=collect_stats)
+
+    def test_disabled_by_default(self):
+        """测试默认不计数"""
+        chain = self._chain(False)
+        result = chain.convert_statements(ast.parse(SOURCE).body)
+        assert chain.stats is None
+        assert result.success is False
+
+    def test_counts(self):
+        """测试逐规则的尝试、命中和耗时"""
+        chain = self._chain(True)
+        chain.convert_statements(ast.parse(SOURCE).body)
+        rules = chain.stats.to_dict()["rules"]
+
+        assert list(rules) == ["StateAssignRule", "ReturnRule", "PassthroughRule"]
+        assert rules["StateAssignRule"]["attempts"] == 4
+        assert rules["StateAssignRule"]["hits"] == 1
+        assert rules["ReturnRule"]["attempts"] == 3
+        assert rules["ReturnRule"]["hits"] == 1
+        # del 没有规则匹配，print 由透传规则兜底
+        assert rules["PassthroughRule"]["attempts"] == 2
+        assert rules["PassthroughRule"]["hits"] == 1
+        assert all(stats["failures"] == 0 for stats in rules.values())
+        assert rules["StateAssignRule"]["seconds"] > 0
+
+    def test_fallthrough_types(self):
+        """测试统计透传兜底和无法转换的语句类型"""
+        chain = self._chain(True)
+        chain.convert_statements(ast.parse(SOURCE).body)
+        stats = chain.stats.to_dict()
+        assert stats["passthrough"] == {"Expr": 1}
+        assert stats["failed"] == {"Delete": 1}
+
+    def test_same_result(self):
+        """测试计数不改变转换结果"""
+        body = ast.parse(SOURCE).body
+        plain = self._chain(False).convert_statements(body)
+        counted = self._chain(True).convert_statements(body)
+        assert counted.code == plain.code
+        assert counted.failed_lines == plain.failed_lines
+
+
+class TestRuleStatsReport:
+    """规则计数在报告和迁移结果中的呈现"""
+
+    def test_report_table(self):
+        """测试报告输出规则表和语句类型表"""
+        result = ExtractionResult(rule_stats={
+            "rules": {"ReturnRule": {"attempts": 3, "hits": 1, "failures": 0, "seconds": 0.002}},
+            "passthrough": {"Expr": 2},
+            "failed": {"Delete": 1},
+        })
+        report = ReportComp()._gen_conversion_stats(result)
+        assert "### 规则统计" in report
+        assert "| ReturnRule | 3 | 1 | 0 | 2.00 |" in report
+        assert "| Delete | 0 | 1 |" in report
+        assert report.index("| Delete |") < report.index("| Expr |")
+
+    def test_report_without_stats(self):
+        """测试未开启计数时报告不变"""
+        assert "规则统计" not in ReportComp()._gen_conversion_stats(ExtractionResult())
+
+    @pytest.mark.asyncio
+    async def test_migration_result(self):
+        """测试 rule_stats 选项在结果和报告中输出计数"""
+        with tempfile.TemporaryDirectory() as out_dir:
+            result = await migrate_async(EXAMPLE_DIR, out_dir, MigrationOptions(use_ai=False, rule_stats=True))
+            assert result.success, result.errors
+            rules = result.rule_stats["rules"]
+            assert rules["PassthroughRule"]["hits"] > 0
+            assert sum(result.rule_stats["passthrough"].values()) == rules["PassthroughRule"]["hits"]
+            assert "### 规则统计" in result.report
+
+            plain = await migrate_async(EXAMPLE_DIR, out_dir, MigrationOptions(use_ai=False))
+            assert plain.rule_stats == {}
+            assert "规则统计" not in plain.report
@@ -82,3 +82,28 @@ class TestToolCallRuleWithoutContext:
         code = 'result = any_tool.run("arg")'
         node = ast.parse(code).body[0]
         assert self.rule.matches(node) is True
+
+
+class TestAsyncToolCallConversion:
+    """组件中的工具调用转换为异步调用测试"""
+
+    def test_tool_invoke_awaits_call_tool(self):
+        """测试 tool.invoke({...}) 转换为 await call_tool(tool, {...})"""
+        rule = ToolCallRule()
+        node = ast.parse('result = get_weather.invoke({"city": "Beijing"})').body[0]
+        result = rule.convert(node)
+        assert result.code == "result = await call_tool(get_weather, {\"city\": 'Beijing'})"
+
+    def test_direct_call_awaits_call_tool(self):
+        """测试直接调用 tool(arg=value) 转换为 await call_tool"""
+        rule = ToolCallRule({"search"})
+        node = ast.parse('result = search(query=q)').body[0]
+        assert rule.matches(node) is True
+        assert rule.convert(node).code == 'result = await call_tool(search, {"query": q})'
+
+    def test_tool_map_awaits_invoke_tool(self):
+        """测试 tool_map[key].run(arg) 转换为 await invoke_tool(key, arg)"""
+        from lg2jiuwen_tool.rules.tool_rules import ToolMapCallRule
+
+        node = ast.parse('result = tool_map[name].run(arg)').body[0]
+        assert ToolMapCallRule().convert(node).code == 'result = await invoke_tool(name, arg)'
@@ -0,0 +1,199 @@
+"""
+压缩包迁移测试
+"""
+import importlib
+import io
+import os
+import stat
+import tempfile
+import threading
+import zipfile
+
+import pytest
+
+from lg2jiuwen_tool.archive import ArchiveError, find_project_root, safe_extract
+
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph')
+
+
+def make_zip(entries):
+    """根据 {路径: 内容} 构造 zip"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, content in entries.items():
+            zf.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def zip_directory(root, prefix):
+    """将目录打包为 zip，成员路径以 prefix 开头"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    path = os.path.join(dirpath, filename)
+                    zf.write(path, os.path.join(prefix, os.path.relpath(path, root)))
+    return buffer.getvalue()
+
+
+class TestSafeExtract:
+    """安全解压测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dest = self.temp_dir.name
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def test_extract_and_unwrap_root(self):
+        """测试解压并识别唯一顶层目录"""
+        safe_extract(make_zip({"proj/agent.py": "x = 1\n", "proj/pkg/a.py": ""}), self.dest)
+        root = find_project_root(self.dest)
+        assert root == os.path.join(self.dest, "proj")
+        with open(os.path.join(root, "agent.py")) as f:
+            assert f.read() == "x = 1\n"
+
+    @pytest.mark.parametrize("name", ["../evil.py", "a/../../evil.py", "/etc/evil.py", "..\\evil.py"])
+    def test_rejects_path_traversal(self, name):
+        """测试拒绝目录穿越"""
+        with pytest.raises(ArchiveError):
+            safe_extract(make_zip({name: "x"}), self.dest)
+        assert not os.path.exists(os.path.join(os.path.dirname(self.dest), "evil.py"))
+
+    def test_rejects_symlink(self):
+        """测试拒绝符号链接"""
+        info = zipfile.ZipInfo("link")
+        info.external_attr = (stat.S_IFLNK | 0o777) << 16
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr(info, "/etc/passwd")
+        buffer.seek(0)
+        with pytest.raises(ArchiveError):
+            safe_extract(buffer, self.dest)
+
+    def test_limits(self):
+        """测试文件数和解压大小上限"""
+        with pytest.raises(ArchiveError):
+            safe_extract(make_zip({"a.py": "", "b.py": ""}), self.dest, max_files=1)
+        with pytest.raises(ArchiveError):
+            safe_extract(make_zip({"a.py": "x" * 1000}), self.dest, max_bytes=100)
+
+    def test_invalid_zip(self):
+        """测试无效压缩包"""
+        with pytest.raises(ArchiveError):
+            safe_extract(io.BytesIO(b"not a zip"), self.dest)
+
+
+class TestMigrateArchiveEndpoint:
+    """压缩包迁移接口测试"""
+
+    def setup_method(self):
+        from fastapi.testclient import TestClient
+        from src.restful_tool_router import app
+
+        self.client = TestClient(app)
+
+    def test_roundtrip_multi_file_project(self):
+        """测试上传多文件项目并下载迁移结果"""
+        body = zip_directory(os.path.join(EXAMPLE_DIR, "react_agent"), "react_agent")
+        response = self.client.post(
+            "/lg2jiuwen/migrate/archive",
+            content=body,
+            headers={"Content-Type": "application/zip"}
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/zip"
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            names = zf.namelist()
+            assert any(name.endswith("/main.py") for name in names)
+            assert any(name.endswith("_report.md") for name in names)
+            # 生成结果中不包含服务端临时路径
+            assert all(not name.startswith("/") for name in names)
+
+    def test_prune_report(self):
+        """测试通过查询参数裁剪报告"""
+        response = self.client.post(
+            "/lg2jiuwen/migrate/archive",
+            params={"include_report": "false", "include_ir": "false"},
+            content=zip_directory(os.path.join(EXAMPLE_DIR, "react_agent"), "")
+        )
+        assert response.status_code == 200, response.text
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert all(name.endswith(".py") for name in zf.namelist())
+
+    def test_bad_archive(self):
+        """测试无效和不安全的压缩包返回 400"""
+        response = self.client.post("/lg2jiuwen/migrate/archive", content=b"not a zip")
+        assert response.status_code == 400
+
+        response = self.client.post(
+            "/lg2jiuwen/migrate/archive", content=make_zip({"../evil.py": "x"}).getvalue()
+        )
+        assert response.status_code == 400
+
+    def _track_workspaces(self, monkeypatch):
+        """记录接口创建的临时目录"""
+        router = importlib.import_module("src.routers.lg2jiuwen_router")
+        workspaces = []
+        mkdtemp = tempfile.mkdtemp
+
+        def tracked(**kwargs):
+            workspaces.append(mkdtemp(**kwargs))
+            return workspaces[-1]
+
+        monkeypatch.setattr(router.tempfile, "mkdtemp", tracked)
+        return router, workspaces
+
+    @pytest.mark.asyncio
+    async def test_workspace_removed_before_body(self, monkeypatch):
+        """测试响应返回时临时目录已删除，客户端在接收响应体前断开也不会残留"""
+        router, workspaces = self._track_workspaces(monkeypatch)
+        body = zip_directory(os.path.join(EXAMPLE_DIR, "react_agent"), "")
+
+        class UploadRequest:
+            async def stream(self):
+                yield body[:1024]
+                yield body[1024:]
+
+        response = await router.migrate_archive(UploadRequest(), include_report=False, include_ir=False)
+
+        assert len(workspaces) == 1 and not os.path.exists(workspaces[0])
+        content = b"".join([chunk async for chunk in response.body_iterator])
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            assert any(name.endswith("main.py") for name in zf.namelist())
+
+    def test_workspace_removed_on_error(self, monkeypatch):
+        """测试请求失败时删除临时目录"""
+        _, workspaces = self._track_workspaces(monkeypatch)
+
+        response = self.client.post("/lg2jiuwen/migrate/archive", content=b"not a zip")
+
+        assert response.status_code == 400
+        assert len(workspaces) == 1 and not os.path.exists(workspaces[0])
+
+    def test_overload_returns_429(self, monkeypatch):
+        """测试工作池已满时返回 429，不在服务进程中迁移"""
+        from src.lg2jiuwen_tool import jobs
+
+        release = threading.Event()
+        manager = jobs.MigrationJobManager(
+            max_workers=1, max_queue=0, executor="thread",
+            runner=lambda s, o: release.wait(5)
+        )
+        monkeypatch.setattr(jobs, "_default_manager", manager)
+        try:
+            manager.submit("a.py", "out")
+            response = self.client.post(
+                "/lg2jiuwen/migrate/archive",
+                content=zip_directory(os.path.join(EXAMPLE_DIR, "react_agent"), "")
+            )
+            assert response.status_code == 429
+            assert response.headers["retry-after"] == "5"
+        finally:
+            release.set()
+            manager.shutdown()
@@ -0,0 +1,152 @@
+"""
+迁移前后延迟对比测试
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool import benchmark
+from lg2jiuwen_tool.benchmark import (
+    BenchmarkReport, LatencyStats, compare_outputs, example_inputs, offline, run_benchmark
+)
+from lg2jiuwen_tool.cli import main
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+from lg2jiuwen_tool.stub_llm import StubLLM
+
+
+EXAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph')
+
+
+def reply(messages):
+    """按示例 Agent 的提示词返回固定格式的响应"""
+    content = messages[-1]["content"]
+    if "可用工具" in content:
+        return "工具：Calculator\n参数：100+200\n思考：用户想计算数学表达式"
+    if "结果：True 或 False" in content:
+        return "结果：True"
+    return '{"city": "北京", "date": "明天"}'
+
+
+class TestBenchmarkHelpers:
+    """对比工具函数测试"""
+
+    def test_latency_stats(self):
+        """测试延迟分布计算（毫秒）"""
+        stats = LatencyStats.from_samples([0.001 * i for i in range(1, 101)])
+        assert stats.count == 100
+        assert stats.min == pytest.approx(1)
+        assert stats.p50 == pytest.approx(51)
+        assert stats.p90 == pytest.approx(90)
+        assert stats.max == pytest.approx(100)
+        assert LatencyStats.from_samples([]).count == 0
+
+    def test_compare_outputs_only_shared_fields(self):
+        """测试只比较两侧都输出的字段"""
+        source = {"sentence": "明天北京天气", "city": "北京", "weather": "晴"}
+        assert compare_outputs(source, {"city": "北京", "weather": "雨"}) == {"weather": ("晴", "雨")}
+
+    def test_disjoint_outputs_not_comparable(self):
+        """测试两侧没有共有字段时不算一致，并列出单侧字段"""
+        empty = LatencyStats.from_samples([])
+        report = BenchmarkReport(
+            inputs={}, iterations=1, source_total=empty, migrated_total=empty,
+            source_nodes={}, migrated_nodes={},
+            compared=[], source_only=["sentence"], migrated_only=["error"],
+        )
+        assert not report.comparable
+        assert not report.outputs_match
+        markdown = report.to_markdown()
+        assert "输出一致: 无可比较字段" in markdown
+        assert "仅 LangGraph 输出: `sentence`" in markdown
+        assert "仅 openJiuwen 输出: `error`" in markdown
+        assert report.to_dict()["migrated_only"] == ["error"]
+
+    def test_bench_exit_code_not_comparable(self, monkeypatch, capsys):
+        """测试没有可比较字段时 bench 以非零状态退出"""
+        empty = LatencyStats.from_samples([])
+        report = BenchmarkReport(
+            inputs={}, iterations=1, source_total=empty, migrated_total=empty,
+            source_nodes={}, migrated_nodes={}, source_only=["sentence"], migrated_only=["error"],
+        )
+        monkeypatch.setattr(benchmark, "run_benchmark", lambda *args, **kwargs: report)
+        assert main(["bench", EXAMPLE_DIR, EXAMPLE_DIR]) == 3
+        assert "无可比较字段" in capsys.readouterr().out
+
+    def test_offline_blocks_network(self):
+        """测试离线模式下网络请求立即失败"""
+        import httpx
+
+        with offline():
+            with pytest.raises(httpx.ConnectError):
+                httpx.get("http://example.com", timeout=5)
+
+    def test_example_inputs(self):
+        """测试使用源代码中的示例输入"""
+        inputs = example_inputs(os.path.join(EXAMPLE_DIR, 'react_agent'))
+        assert inputs == {"input": "100加200等于多少？", "is_end": False, "loop_count": 0}
+
+
+class TestRunBenchmark:
+    """源项目与迁移后项目对比测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _migrate(self, source_path):
+        output_dir = os.path.join(self.temp_dir.name, "out")
+        result = asyncio.run(migrate_async(
+            source_path, output_dir, MigrationOptions(use_ai=False, include_report=False, include_ir=False)
+        ))
+        assert result.success, result.errors
+        return output_dir
+
+    @pytest.mark.parametrize("source", ["react_agent", "weather_agent.py"])
+    def test_outputs_match(self, source):
+        """测试迁移后输出与源项目一致，并统计各节点延迟"""
+        source_path = os.path.join(EXAMPLE_DIR, source)
+        migrated_path = self._migrate(source_path)
+
+        report = run_benchmark(source_path, migrated_path, iterations=2, warmup=1, llm=StubLLM(default=reply))
+
+        assert report.outputs_match, report.mismatches
+        assert report.compared
+        assert report.source_total.count == report.migrated_total.count == 2
+        assert set(report.migrated_nodes) <= set(report.source_nodes)
+        assert report.migrated_nodes
+        assert "端到端" in report.to_markdown()
+
+    def test_bench_reports_run_error(self, capsys):
+        """测试一侧运行抛出异常时输出报告并以 1 退出"""
+        source_path = os.path.join(EXAMPLE_DIR, "react_agent")
+        migrated_path = self._migrate(source_path)
+
+        # 默认 StubLLM 的响应不符合示例 Agent 的格式，源项目节点会抛出异常
+        code = main(["bench", source_path, migrated_path, "-n", "1", "--warmup", "0"])
+
+        out = capsys.readouterr().out
+        assert code == 1
+        assert "输出一致: 运行失败" in out
+        assert "## 运行错误" in out
+
+    def test_run_error_recorded_per_side(self, monkeypatch):
+        """测试运行异常记录在对应一侧，另一侧照常运行"""
+        source_path = os.path.join(EXAMPLE_DIR, "weather_agent.py")
+        migrated_path = self._migrate(source_path)
+
+        def broken(*args, **kwargs):
+            raise KeyError("city")
+
+        monkeypatch.setattr(benchmark, "_run_migrated", broken)
+        report = run_benchmark(source_path, migrated_path, iterations=1, warmup=0, llm=StubLLM(default=reply))
+
+        assert report.failed
+        assert not report.outputs_match
+        assert report.source_error is None
+        assert report.migrated_error.startswith("KeyError: 'city' (test_benchmark.py:")
+        assert report.source_total.count == 1
+        assert report.to_dict()["errors"]["migrated"] == report.migrated_error
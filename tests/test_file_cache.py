@@ -0,0 +1,183 @@
+"""
+文件缓存与文件读取接口测试
+"""
+import gzip
+import os
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.file_cache import FileCache, is_not_modified, parse_range
+
+
+class TestFileCache:
+    """文件缓存测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = FileCache(max_entries=2, max_file_bytes=1024)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, name, content, mtime_ns=None):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return path
+
+    def test_hit_until_modified(self):
+        """测试未修改命中缓存，mtime 变化后重新读取"""
+        path = self._write("a.txt", b"one", mtime_ns=1_000_000_000_000)
+        first = self.cache.get(path)
+        assert self.cache.get(path) is first
+        assert self.cache.hits == 1
+
+        self._write("a.txt", b"two", mtime_ns=2_000_000_000_000)
+        second = self.cache.get(path)
+        assert second is not first
+        assert second.text() == "two"
+        assert second.etag != first.etag
+
+    def test_lru_eviction(self):
+        """测试超过条目数后淘汰最久未使用的文件"""
+        paths = [self._write(f"{i}.txt", b"x") for i in range(3)]
+        first = self.cache.get(paths[0])
+        self.cache.get(paths[1])
+        self.cache.get(paths[2])
+        assert self.cache.get(paths[0]) is not first
+
+    def test_large_file_not_cached(self):
+        """测试大文件不缓存，按块流式读取"""
+        content = bytes(range(256)) * 8
+        path = self._write("big.bin", content)
+        cached = self.cache.get(path)
+        assert cached.data is None
+        assert b"".join(cached.iter_range(0, len(content) - 1, chunk_size=100)) == content
+        assert b"".join(cached.iter_range(10, 19)) == content[10:20]
+
+    def test_derived_data_reused(self):
+        """测试派生数据随缓存条目复用"""
+        path = self._write("a.json", b'{"a": 1}')
+        cached = self.cache.get(path)
+        assert gzip.decompress(cached.gzipped()) == b'{"a": 1}'
+        assert cached.gzipped() is cached.gzipped()
+
+    def test_derived_data_counted(self):
+        """测试派生数据计入缓存总大小，超出上限时淘汰，移除条目时扣除"""
+        cache = FileCache(max_entries=8, max_file_bytes=1024, max_total_bytes=1024)
+        first = cache.get(self._write("a.txt", b"a" * 300))
+        second = cache.get(self._write("b.txt", b"b" * 300))
+        assert cache._total_bytes == 600
+
+        body = first.derive("body", lambda: b"x" * 200)
+        assert first.derived_bytes == len(body)
+        assert cache._total_bytes == 800
+
+        # 第二个文件的派生数据使总大小超限，最久未使用的第一个文件被淘汰
+        second.derive("body", lambda: b"y" * 300)
+        assert cache._total_bytes == 600
+        assert cache.get(first.path) is not first
+
+        cache.invalidate(second.path)
+        assert cache._total_bytes == 300
+
+    def test_conditional_requests(self):
+        """测试 ETag 和 Last-Modified 条件判断"""
+        cached = self.cache.get(self._write("a.txt", b"x", mtime_ns=1_700_000_000_000_000_000))
+        assert is_not_modified(cached, if_none_match=cached.etag)
+        assert is_not_modified(cached, if_none_match=f'"other", W/{cached.etag}')
+        assert not is_not_modified(cached, if_none_match='"other"')
+        assert is_not_modified(cached, if_modified_since=cached.last_modified)
+        assert not is_not_modified(cached, if_modified_since="Mon, 01 Jan 2001 00:00:00 GMT")
+        assert not is_not_modified(cached)
+
+
+class TestParseRange:
+    """Range 解析测试"""
+
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=10-", (10, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=90-200", (90, 99)),
+        ("bytes=0-1,5-6", None),
+        ("items=0-1", None),
+        ("bytes=a-b", None),
+    ])
+    def test_parse(self, header, expected):
+        assert parse_range(header, 100) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=100-", "bytes=5-3", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+
+
+class TestFileEndpoints:
+    """文件读取接口测试"""
+
+    def setup_method(self):
+        from fastapi.testclient import TestClient
+        from src.restful_tool_router import app
+
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.client = TestClient(app)
+        self.content = "# 迁移报告\n" + "line\n" * 200
+        with open(os.path.join(self.temp_dir.name, "report.md"), "w", encoding="utf-8") as f:
+            f.write(self.content)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def test_get_file_content_304(self, monkeypatch):
+        """测试 JSON 接口的条件请求"""
+        monkeypatch.setenv("BASE_DIR", self.temp_dir.name)
+        response = self.client.get("/lg2jiuwen/get_file_content", params={"file_path": "report.md"})
+        assert response.status_code == 200
+        assert response.json() == {"result": "success", "data": self.content}
+
+        etag = response.headers["etag"]
+        response = self.client.get(
+            "/lg2jiuwen/get_file_content",
+            params={"file_path": "report.md"},
+            headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        assert self.client.get(
+            "/lg2jiuwen/get_file_content", params={"file_path": "missing.md"}
+        ).status_code == 404
+
+    def test_file_range_and_gzip(self, monkeypatch):
+        """测试原始文件接口的 Range 和 gzip"""
+        monkeypatch.setenv("BASE_DIR", self.temp_dir.name)
+        raw = self.content.encode("utf-8")
+
+        response = self.client.get(
+            "/lg2jiuwen/file",
+            params={"file_path": "report.md"},
+            headers={"Range": "bytes=0-9", "Accept-Encoding": "identity"}
+        )
+        assert response.status_code == 206
+        assert response.content == raw[:10]
+        assert response.headers["content-range"] == f"bytes 0-9/{len(raw)}"
+
+        response = self.client.get(
+            "/lg2jiuwen/file",
+            params={"file_path": "report.md"},
+            headers={"Range": f"bytes={len(raw)}-"}
+        )
+        assert response.status_code == 416
+
+        response = self.client.get(
+            "/lg2jiuwen/file",
+            params={"file_path": "report.md"},
+            headers={"Accept-Encoding": "gzip"}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == raw
@@ -0,0 +1,245 @@
+"""
+迁移任务管理测试
+"""
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+from lg2jiuwen_tool.jobs import JobStatus, MigrationJobManager, QueueFullError
+
+
+EXAMPLE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph', 'weather_agent.py'
+)
+
+
+def pid_runner(source_path, output_dir):
+    """返回执行所在进程号（process 模式需要模块级函数）"""
+    return os.getpid()
+
+
+def crash_runner(source_path, output_dir):
+    """模拟工作进程异常退出"""
+    os._exit(1)
+
+
+def wait_finished(manager, job_id, timeout=30.0):
+    """等待任务结束"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.status.finished:
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(job_id)
+
+
+class TestMigrationJobManager:
+    """任务管理器测试"""
+
+    def setup_method(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def teardown_method(self):
+        self.release.set()
+
+    def _blocking_runner(self, source_path, output_dir):
+        self.calls.append(source_path)
+        self.release.wait(5)
+        return f"{output_dir}/{source_path}"
+
+    def test_submit_returns_immediately(self):
+        """测试提交后立即返回，结果可查询"""
+        manager = MigrationJobManager(max_workers=1, executor="thread", runner=self._blocking_runner)
+        job = manager.submit("a.py", "out")
+        assert job.status in (JobStatus.PENDING, JobStatus.RUNNING)
+
+        self.release.set()
+        job = wait_finished(manager, job.job_id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == "out/a.py"
+        manager.shutdown()
+
+    def test_failed_job_records_error(self):
+        """测试失败任务记录错误"""
+        def failing_runner(source_path, output_dir):
+            raise ValueError("boom")
+
+        manager = MigrationJobManager(max_workers=1, executor="thread", runner=failing_runner)
+        job = wait_finished(manager, manager.submit("a.py", "out").job_id)
+        assert job.status == JobStatus.FAILED
+        assert job.error == "boom"
+        manager.shutdown()
+
+    def test_bounded_concurrency(self):
+        """测试并发数受限"""
+        manager = MigrationJobManager(max_workers=2, executor="thread", runner=self._blocking_runner)
+        jobs = [manager.submit(f"{i}.py", "out") for i in range(4)]
+        time.sleep(0.1)
+        assert len(self.calls) == 2
+        assert manager.get(jobs[3].job_id).status == JobStatus.PENDING
+
+        self.release.set()
+        for job in jobs:
+            assert wait_finished(manager, job.job_id).status == JobStatus.SUCCEEDED
+        manager.shutdown()
+
+    def test_cancel_pending_and_running(self):
+        """测试取消排队中和运行中的任务"""
+        manager = MigrationJobManager(max_workers=1, executor="thread", runner=self._blocking_runner)
+        running = manager.submit("a.py", "out")
+        pending = manager.submit("b.py", "out")
+        time.sleep(0.05)
+
+        assert manager.cancel(pending.job_id).status == JobStatus.CANCELLED
+        assert manager.cancel(running.job_id).cancel_requested
+
+        self.release.set()
+        assert wait_finished(manager, running.job_id).status == JobStatus.CANCELLED
+        assert self.calls == ["a.py"]
+        assert manager.cancel("unknown") is None
+        manager.shutdown()
+
+    def test_eviction_by_count_and_ttl(self):
+        """测试按数量和过期时间淘汰已结束任务"""
+        manager = MigrationJobManager(
+            max_workers=1, max_jobs=2, ttl_seconds=3600, executor="thread", runner=lambda s, o: s
+        )
+        ids = [manager.submit(f"{i}.py", "out").job_id for i in range(3)]
+        for job_id in ids:
+            wait_finished(manager, job_id)
+
+        manager.submit("trigger.py", "out")
+        assert manager.get(ids[0]) is None
+        assert manager.get(ids[2]) is not None
+
+        manager.ttl_seconds = 0
+        time.sleep(0.01)
+        assert manager.get(ids[2]) is None
+        manager.shutdown()
+
+    def test_queue_limit(self):
+        """测试排队数达到上限后拒绝提交"""
+        manager = MigrationJobManager(
+            max_workers=1, max_queue=1, executor="thread", runner=self._blocking_runner
+        )
+        manager.submit("a.py", "out")
+        manager.submit("b.py", "out")
+        with pytest.raises(QueueFullError):
+            manager.submit("c.py", "out")
+        assert manager.active_count == 2
+
+        self.release.set()
+        manager.shutdown()
+
+    def test_call_shares_queue_limit(self):
+        """测试 call() 与迁移任务共用排队上限，结束后释放名额"""
+        manager = MigrationJobManager(
+            max_workers=1, max_queue=1, executor="thread", runner=self._blocking_runner
+        )
+        manager.submit("a.py", "out")
+        future = manager.call(self._blocking_runner, "b.py", "out")
+        with pytest.raises(QueueFullError):
+            manager.call(self._blocking_runner, "c.py", "out")
+        with pytest.raises(QueueFullError):
+            manager.submit("c.py", "out")
+
+        self.release.set()
+        assert future.result(5) == "out/b.py"
+        assert manager.active_count <= 1
+        manager.shutdown()
+        assert manager.active_count == 0
+
+
+class TestProcessExecutor:
+    """工作进程模式测试"""
+
+    def test_runs_in_worker_process(self):
+        """测试迁移在独立进程中执行"""
+        manager = MigrationJobManager(max_workers=1, executor="process", runner=pid_runner)
+        try:
+            job = wait_finished(manager, manager.submit("a.py", "out").job_id, timeout=60)
+            assert job.status == JobStatus.SUCCEEDED
+            assert job.result != os.getpid()
+        finally:
+            manager.shutdown()
+
+    def test_call_runs_in_worker_process(self):
+        """测试 call() 在独立进程中执行"""
+        manager = MigrationJobManager(max_workers=1, executor="process", runner=pid_runner)
+        try:
+            assert manager.call(pid_runner, "a.py", "out").result(60) != os.getpid()
+            assert manager.active_count == 0
+        finally:
+            manager.shutdown()
+
+    def test_recovers_from_worker_crash(self):
+        """测试工作进程崩溃后重建进程池"""
+        manager = MigrationJobManager(max_workers=1, executor="process", runner=crash_runner)
+        try:
+            job = wait_finished(manager, manager.submit("a.py", "out").job_id, timeout=60)
+            assert job.status == JobStatus.FAILED
+
+            manager._runner = pid_runner
+            job = wait_finished(manager, manager.submit("b.py", "out").job_id, timeout=60)
+            assert job.status == JobStatus.SUCCEEDED
+        finally:
+            manager.shutdown()
+
+
+class TestMigrateEndpoint:
+    """迁移接口测试"""
+
+    def test_migrate_job_roundtrip(self, monkeypatch):
+        """测试提交迁移任务并查询结果"""
+        from fastapi.testclient import TestClient
+        from src.restful_tool_router import app
+
+        monkeypatch.setenv("BASE_DIR", "/")
+        with tempfile.TemporaryDirectory() as out_dir, TestClient(app) as client:
+            response = client.post(
+                "/lg2jiuwen/migrate",
+                json={"source_path": EXAMPLE_FILE, "output_dir": out_dir}
+            )
+            assert response.status_code == 200
+            job_id = response.json()["data"]["job_id"]
+
+            deadline = time.time() + 30
+            while True:
+                data = client.get(f"/lg2jiuwen/jobs/{job_id}").json()["data"]
+                if data["status"] not in ("pending", "running"):
+                    break
+                assert time.time() < deadline
+                time.sleep(0.05)
+
+            assert data["status"] == "succeeded", data["error"]
+            assert data["result"].endswith(".py")
+            assert client.get("/lg2jiuwen/jobs/unknown").status_code == 404
+
+    def test_migrate_overload_returns_429(self, monkeypatch):
+        """测试过载时返回 429"""
+        from fastapi.testclient import TestClient
+        from src.restful_tool_router import app
+        from src.lg2jiuwen_tool import jobs
+
+        # 路由使用 src.lg2jiuwen_tool 下的模块，需使用同一份类
+        release = threading.Event()
+        manager = jobs.MigrationJobManager(
+            max_workers=1, max_queue=0, executor="thread",
+            runner=lambda s, o: release.wait(5)
+        )
+        monkeypatch.setattr(jobs, "_default_manager", manager)
+        try:
+            client = TestClient(app)
+            body = {"source_path": "a.py", "output_dir": "out"}
+            assert client.post("/lg2jiuwen/migrate", json=body).status_code == 200
+            response = client.post("/lg2jiuwen/migrate", json=body)
+            assert response.status_code == 429
+            assert response.headers["retry-after"] == "5"
+        finally:
+            release.set()
+            manager.shutdown()
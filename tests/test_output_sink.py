@@ -0,0 +1,136 @@
+"""
+输出目标测试
+"""
+import io
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+from lg2jiuwen_tool.output_sink import DiskSink, MemorySink, OutputSink, ZipSink
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+
+
+EXAMPLE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph', 'weather_agent.py'
+)
+
+
+class _UnseekableStream(io.RawIOBase):
+    """只能顺序写入的流（模拟 socket / 管道）"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+
+class TestOutputSinks:
+    """输出目标测试"""
+
+    def test_disk_sink_creates_directories(self):
+        """测试磁盘输出自动创建子目录"""
+        with tempfile.TemporaryDirectory() as root:
+            path = DiskSink(root).write("agent/components/a.py", "x = 1\n")
+            assert path == os.path.join(root, "agent", "components", "a.py")
+            with open(path, encoding="utf-8") as f:
+                assert f.read() == "x = 1\n"
+
+    def test_memory_sink_keeps_order(self):
+        """测试内存输出按写出顺序保存字节"""
+        sink = MemorySink()
+        assert sink.write("b.py", "中文") == "b.py"
+        sink.write("a.json", b"{}")
+        assert list(sink.files) == ["b.py", "a.json"]
+        assert sink.files["b.py"] == "中文".encode("utf-8")
+
+    def test_zip_sink_unseekable_stream(self):
+        """测试 zip 输出可写入不可 seek 的流"""
+        stream = _UnseekableStream()
+        sink = ZipSink(stream)
+        sink.write("agent/main.py", "print(1)\n")
+        sink.close()
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(stream.chunks))) as zf:
+            assert zf.read("agent/main.py") == b"print(1)\n"
+
+    def test_sink_without_write_rejected(self):
+        """测试未实现 write 的输出目标在实例化时报错"""
+        class IncompleteSink(OutputSink):
+            def close(self):
+                pass
+
+        with pytest.raises(TypeError):
+            OutputSink()
+        with pytest.raises(TypeError):
+            IncompleteSink()
+
+
+class TestMigrateOutputModes:
+    """迁移输出方式测试"""
+
+    @pytest.mark.asyncio
+    async def test_memory_mode_does_not_touch_disk(self):
+        """测试 memory 模式返回文件内容且不写磁盘"""
+        with tempfile.TemporaryDirectory() as root:
+            out_dir = os.path.join(root, "out")
+            result = await migrate_async(
+                EXAMPLE_FILE, out_dir, MigrationOptions(use_ai=False, output_mode="memory")
+            )
+            assert result.success, result.errors
+            assert not os.path.exists(out_dir)
+
+        assert result.generated_files == list(result.files)
+        code_files = [path for path in result.files if path.endswith(".py")]
+        assert code_files
+        compile(result.files[code_files[0]], code_files[0], "exec")
+        reports = [path for path in result.files if path.endswith("_report.md")]
+        assert [result.files[path].decode("utf-8") for path in reports] == [result.report]
+
+    @pytest.mark.asyncio
+    async def test_zip_mode(self):
+        """测试 zip 模式返回压缩包"""
+        result = await migrate_async(
+            EXAMPLE_FILE, "unused", MigrationOptions(use_ai=False, output_mode="zip")
+        )
+        assert result.success, result.errors
+        with zipfile.ZipFile(io.BytesIO(result.archive)) as zf:
+            assert zf.namelist() == result.generated_files
+
+    @pytest.mark.asyncio
+    async def test_zip_closed_on_failure(self, monkeypatch):
+        """测试迁移失败时同样关闭 zip 写入器"""
+        import lg2jiuwen_tool.service as service
+        from lg2jiuwen_tool.workflow import migration_workflow
+
+        sinks = []
+
+        class RecordingZipSink(ZipSink):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                sinks.append(self)
+
+        def failing_build(**kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(service, "ZipSink", RecordingZipSink)
+        monkeypatch.setattr(migration_workflow, "build_simple_migration_workflow", failing_build)
+        result = await migrate_async(
+            EXAMPLE_FILE, "unused", MigrationOptions(use_ai=False, output_mode="zip")
+        )
+
+        assert not result.success
+        assert result.errors == ["boom"]
+        assert [sink._zip.fp for sink in sinks] == [None]
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode(self):
+        """测试不支持的输出方式"""
+        result = await migrate_async(EXAMPLE_FILE, "unused", MigrationOptions(output_mode="s3"))
+        assert not result.success
@@ -0,0 +1,65 @@
+"""
+迁移选项裁剪流水线测试
+"""
+import os
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+
+
+EXAMPLE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph', 'weather_agent.py'
+)
+
+
+class TestStagePruning:
+    """按选项裁剪报告和 IR 输出"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.out_dir = self.temp_dir.name
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    async def _migrate(self, **kwargs):
+        options = MigrationOptions(use_ai=False, **kwargs)
+        result = await migrate_async(EXAMPLE_FILE, self.out_dir, options)
+        assert result.success, result.errors
+        return result
+
+    def _written(self, suffix):
+        return [name for name in os.listdir(self.out_dir) if name.endswith(suffix)]
+
+    @pytest.mark.asyncio
+    async def test_default_writes_single_report(self):
+        """测试默认输出代码、IR 和唯一一份报告"""
+        result = await self._migrate()
+        reports = self._written("_report.md")
+        assert len(reports) == 1
+        assert len(self._written("_ir.json")) == 1
+
+        report_file = os.path.join(self.out_dir, reports[0])
+        assert report_file in result.generated_files
+        with open(report_file, encoding="utf-8") as f:
+            assert f.read() == result.report
+        assert result.rule_count > 0
+
+    @pytest.mark.asyncio
+    async def test_skip_report(self):
+        """测试不生成报告时裁剪 reporter，统计仍可用"""
+        result = await self._migrate(include_report=False)
+        assert self._written("_report.md") == []
+        assert result.report == ""
+        assert result.rule_count > 0
+        assert all(os.path.exists(path) for path in result.generated_files)
+
+    @pytest.mark.asyncio
+    async def test_code_only(self):
+        """测试只输出代码"""
+        result = await self._migrate(include_report=False, include_ir=False)
+        assert self._written("_report.md") == []
+        assert self._written("_ir.json") == []
+        assert [os.path.basename(path) for path in result.generated_files] == self._written(".py")
@@ -0,0 +1,139 @@
+"""
+迁移性能分析测试
+"""
+import asyncio
+import cProfile
+import os
+import pstats
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.output_sink import MemorySink
+from lg2jiuwen_tool.profiling import MigrationProfiler, collapsed_stacks
+from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+
+
+EXAMPLE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph', 'react_agent'
+)
+
+
+def _inner():
+    return sum(i * i for i in range(20000))
+
+
+def _outer():
+    return _inner() + _inner()
+
+
+class TestCollapsedStacks:
+    """折叠栈重建测试"""
+
+    def test_nested_calls(self):
+        """测试调用路径以根帧开头并包含调用链"""
+        profile = cProfile.Profile()
+        profile.enable()
+        _outer()
+        profile.disable()
+
+        stacks = collapsed_stacks(pstats.Stats(profile), "stage")
+        assert stacks
+        assert all(stack.startswith("stage;") for stack in stacks)
+        assert all(count > 0 for count in stacks.values())
+        assert any(
+            "_outer (test_profiling.py" in stack and "_inner (test_profiling.py" in stack
+            for stack in stacks
+        )
+
+
+class TestMigrationProfiler:
+    """组件分析器测试"""
+
+    def test_measure_accumulates(self):
+        """测试多次执行同一组件时累计调用次数和分配"""
+        profiler = MigrationProfiler()
+        with profiler.tracing():
+            for _ in range(2):
+                with profiler.measure("stage"):
+                    data = [bytearray(1024) for _ in range(100)]
+        del data
+
+        stage = profiler.stages["stage"]
+        assert stage.calls == 2
+        assert stage.seconds > 0
+        assert stage.peak_bytes > 0
+        assert stage.allocations
+        assert stage.allocations[0].size >= 100 * 1024
+
+    def test_write(self):
+        """测试写出 pstats、折叠栈和汇总"""
+        profiler = MigrationProfiler()
+
+        class Comp:
+            async def invoke(self, inputs, runtime, context):
+                return {"value": _outer()}
+
+        comp = profiler.wrap("work", Comp())
+        assert asyncio.run(comp.invoke({}, None, None))["value"] > 0
+
+        sink = MemorySink()
+        files = profiler.write(sink)
+        assert files == ["profile/work.pstats", "profile/migration.collapsed", "profile/summary.md"]
+        assert b"_inner" in sink.files["profile/migration.collapsed"]
+        assert "| work | 1 |" in sink.files["profile/summary.md"].decode("utf-8")
+
+
+class TestProfileOption:
+    """profile 选项测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.out_dir = self.temp_dir.name
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_profile_artifacts(self):
+        """测试 profile 模式写出可加载的 pstats 和折叠栈"""
+        options = MigrationOptions(use_ai=False, profile=True)
+        result = await migrate_async(EXAMPLE_DIR, self.out_dir, options)
+        assert result.success, result.errors
+
+        names = [stage["name"] for stage in result.profile["stages"]]
+        assert "extractor" in names
+        assert "generator" in names
+
+        profile_dir = os.path.join(self.out_dir, "profile")
+        extractor_stats = os.path.join(profile_dir, "extractor.pstats")
+        assert extractor_stats in result.profile["files"]
+        assert pstats.Stats(extractor_stats).total_calls > 0
+
+        with open(os.path.join(profile_dir, "migration.collapsed"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert any(line.startswith("extractor;") for line in lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+
+        # 分析产物不计入生成的代码文件
+        assert not any(path.startswith(profile_dir) for path in result.generated_files)
+
+    @pytest.mark.asyncio
+    async def test_profile_memory_output(self):
+        """测试 memory 输出方式下分析产物写入结果文件"""
+        options = MigrationOptions(use_ai=False, profile=True, output_mode="memory")
+        result = await migrate_async(EXAMPLE_DIR, self.out_dir, options)
+        assert result.success, result.errors
+        assert "profile/summary.md" in result.files
+        assert "profile/extractor.pstats" in result.files
+        assert os.listdir(self.out_dir) == []
+
+    @pytest.mark.asyncio
+    async def test_profile_disabled(self):
+        """测试默认不记录分析数据"""
+        result = await migrate_async(EXAMPLE_DIR, self.out_dir, MigrationOptions(use_ai=False))
+        assert result.success, result.errors
+        assert result.profile == {}
+        assert not os.path.exists(os.path.join(self.out_dir, "profile"))
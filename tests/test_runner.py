@@ -0,0 +1,127 @@
+"""
+Agent 运行器测试
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import pytest
+
+from lg2jiuwen_tool.runner import AgentRunner, RunTarget, resolve_run_target
+
+
+class TestAgentRunner:
+    """运行器测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.runner = AgentRunner(max_concurrent=2, timeout=10)
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _script(self, name, code):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, "w") as f:
+            f.write(code)
+        return RunTarget(main_file=path, cwd=self.temp_dir.name)
+
+    @pytest.mark.asyncio
+    async def test_capture_output_and_exit_code(self):
+        """测试捕获输出、退出码和耗时"""
+        target = self._script("main.py", (
+            "import sys\n"
+            "print('hello')\n"
+            "print('oops', file=sys.stderr)\n"
+            "sys.exit(3)\n"
+        ))
+        result = await self.runner.run(target)
+        assert result.exit_code == 3
+        assert result.stdout == "hello\n"
+        assert result.stderr == "oops\n"
+        assert result.duration > 0
+        assert not result.timed_out
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_process(self):
+        """测试超时后终止进程"""
+        target = self._script("slow.py", (
+            "import time\n"
+            "print('start', flush=True)\n"
+            "time.sleep(30)\n"
+        ))
+        start = time.perf_counter()
+        result = await self.runner.run(target, timeout=1)
+        assert result.timed_out
+        assert result.exit_code != 0
+        assert result.stdout == "start\n"
+        assert time.perf_counter() - start < 10
+
+    @pytest.mark.asyncio
+    async def test_stream_is_incremental(self):
+        """测试输出在进程结束前即可读取"""
+        target = self._script("stream.py", (
+            "import time\n"
+            "print('first')\n"
+            "time.sleep(1)\n"
+            "print('second')\n"
+        ))
+        start = time.perf_counter()
+        events = []
+        async for event in self.runner.stream(target):
+            events.append((time.perf_counter() - start, event))
+
+        first_at, first = events[0]
+        assert first["stream"] == "stdout"
+        assert first["data"].startswith("first")
+        assert first_at < events[-1][0] - 0.5
+        assert events[-1][1]["event"] == "exit"
+        assert events[-1][1]["exit_code"] == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """测试并发运行数受限"""
+        target = self._script("sleep.py", "import time\ntime.sleep(0.5)\n")
+        runner = AgentRunner(max_concurrent=1, timeout=10)
+        start = time.perf_counter()
+        results = await asyncio.gather(runner.run(target), runner.run(target))
+        assert all(r.exit_code == 0 for r in results)
+        assert time.perf_counter() - start >= 1.0
+
+    def test_resolve_run_target(self, monkeypatch):
+        """测试解析运行目标"""
+        monkeypatch.setenv("BASE_DIR", self.temp_dir.name)
+        self._script("main.py", "")
+        assert resolve_run_target("/").main_file == os.path.join(self.temp_dir.name, "main.py")
+        assert resolve_run_target("main.py").cwd == self.temp_dir.name
+        with pytest.raises(ValueError):
+            resolve_run_target("missing.py")
+
+
+class TestRunEndpoint:
+    """运行接口测试"""
+
+    def test_run_and_stream(self, monkeypatch):
+        """测试 /run 和 /run/stream"""
+        from fastapi.testclient import TestClient
+        from src.restful_tool_router import app
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "main.py"), "w") as f:
+                f.write("print('a')\nprint('b')\n")
+            monkeypatch.setenv("BASE_DIR", temp_dir)
+
+            client = TestClient(app)
+            data = client.get("/lg2jiuwen/run", params={"source_path": "/"}).json()["data"]
+            assert data["exit_code"] == 0
+            assert data["stdout"] == "a\nb\n"
+
+            response = client.get("/lg2jiuwen/run/stream", params={"source_path": "/"})
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            events = [json.loads(line) for line in response.text.splitlines()]
+            assert "".join(e["data"] for e in events if e.get("stream") == "stdout") == "a\nb\n"
+            assert events[-1]["event"] == "exit"
+
+            assert client.get("/lg2jiuwen/run", params={"source_path": "/missing"}).status_code == 500
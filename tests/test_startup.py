@@ -0,0 +1,79 @@
+"""
+启动耗时测试
+
+基于 -X importtime 统计 CLI 的导入开销，防止重量级依赖回到启动路径
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+
+# CLI 模块累计导入耗时预算（微秒），可通过环境变量调整
+IMPORT_BUDGET_US = int(os.getenv("LG2JIUWEN_IMPORT_BUDGET_US", "300000"))
+
+# 不允许出现在启动路径上的重量级依赖
+HEAVY_MODULES = ("openjiuwen", "langchain", "langgraph", "fastapi")
+
+
+def run_importtime(*args):
+    """以 -X importtime 运行 Python，返回 (返回码, {模块名: 累计耗时微秒})"""
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue  # 表头
+        modules[parts[2].strip()] = cumulative
+    return proc.returncode, modules
+
+
+class TestStartupTime:
+    """CLI 启动测试"""
+
+    @pytest.mark.parametrize("flag", ["--version", "--help"])
+    def test_no_heavy_imports(self, flag):
+        """测试 --version / --help 不加载重量级依赖"""
+        returncode, modules = run_importtime("-m", "lg2jiuwen_tool", flag)
+        assert returncode == 0
+
+        heavy = sorted(
+            name for name in modules
+            if name.split(".")[0] in HEAVY_MODULES
+        )
+        assert heavy == []
+
+    def test_cli_import_budget(self):
+        """测试 CLI 模块导入耗时在预算内"""
+        returncode, modules = run_importtime("-c", "import lg2jiuwen_tool.cli")
+        assert returncode == 0
+        assert "lg2jiuwen_tool.cli" in modules
+        assert modules["lg2jiuwen_tool.cli"] < IMPORT_BUDGET_US, (
+            f"lg2jiuwen_tool.cli 导入耗时 {modules['lg2jiuwen_tool.cli'] / 1000:.1f} ms，"
+            f"超出预算 {IMPORT_BUDGET_US / 1000:.0f} ms"
+        )
+
+    def test_lazy_attributes(self):
+        """测试包级别名称按需加载"""
+        import lg2jiuwen_tool
+        from lg2jiuwen_tool import rules
+
+        assert lg2jiuwen_tool.MigrationOptions().use_ai is True
+        assert lg2jiuwen_tool.AgentIR.__name__ == "AgentIR"
+        assert rules.ToolCallRule.__name__ == "ToolCallRule"
+        with pytest.raises(AttributeError):
+            lg2jiuwen_tool.not_a_name
@@ -0,0 +1,157 @@
+"""
+本地 LLM 替身测试
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+import pytest
+
+from lg2jiuwen_tool.stub_llm import (
+    RecordingLLM,
+    StubLLM,
+    StubLLMError,
+    StubRateLimitError,
+    prompt_hash,
+)
+
+
+MESSAGES = [{"role": "user", "content": "你好"}]
+
+
+class TestStubResponses:
+    """响应回放测试"""
+
+    def test_same_prompt_across_frameworks(self):
+        """测试两个框架中相同提示词的哈希一致"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+
+        openjiuwen_messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+        langchain_messages = [SystemMessage(content="s"), HumanMessage(content="u")]
+        assert prompt_hash(openjiuwen_messages) == prompt_hash(langchain_messages)
+        assert prompt_hash("u") == prompt_hash([("user", "u")])
+
+    @pytest.mark.asyncio
+    async def test_responses_by_hash(self):
+        """测试按提示词哈希返回响应，未命中时返回默认值"""
+        llm = StubLLM(responses={prompt_hash(MESSAGES): "您好"}, default="默认")
+
+        assert (await llm.ainvoke(model_name="m", messages=MESSAGES)).content == "您好"
+        assert llm.invoke(messages=[{"role": "user", "content": "其他"}]).content == "默认"
+        assert llm.as_langchain().invoke("你好").content == "您好"
+        assert (llm.calls, llm.hits) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_record_and_replay(self):
+        """测试录制真实 LLM 响应后离线回放"""
+        recorder = RecordingLLM(StubLLM(default="录制的响应"))
+        await recorder.ainvoke(model_name="m", messages=MESSAGES)
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "recording.json")
+            recorder.save(path)
+            replay = StubLLM.from_file(path)
+
+        assert (await replay.ainvoke(messages=MESSAGES)).content == "录制的响应"
+        assert replay.hits == 1
+
+
+class TestStubBehaviour:
+    """延迟、限流和失败模拟测试"""
+
+    @pytest.mark.asyncio
+    async def test_latency_does_not_block_loop(self):
+        """测试异步调用的延迟不阻塞事件循环"""
+        llm = StubLLM(latency=0.05)
+        start = time.perf_counter()
+        await asyncio.gather(*(llm.ainvoke(messages=MESSAGES) for _ in range(10)))
+        elapsed = time.perf_counter() - start
+        assert 0.05 <= elapsed < 0.3
+
+    def test_jitter_reproducible(self):
+        """测试相同随机种子得到相同的延迟序列"""
+        delays = [[StubLLM(latency=0.1, jitter=0.05, seed=s)._admit() for _ in range(5)] for s in (1, 1)]
+        assert delays[0] == delays[1]
+        assert all(0.05 <= d <= 0.15 for d in delays[0])
+
+    def test_rate_limit(self):
+        """测试超过每秒调用次数时抛出限流错误"""
+        llm = StubLLM(rate_limit=2)
+        llm.invoke(messages=MESSAGES)
+        llm.invoke(messages=MESSAGES)
+        with pytest.raises(StubRateLimitError):
+            llm.invoke(messages=MESSAGES)
+        assert llm.failures == 1
+
+    def test_failure_rate(self):
+        """测试随机失败按种子可复现"""
+        def outcomes(seed):
+            llm = StubLLM(failure_rate=0.5, seed=seed)
+            result = []
+            for _ in range(20):
+                try:
+                    llm.invoke(messages=MESSAGES)
+                    result.append(True)
+                except StubLLMError:
+                    result.append(False)
+            return result
+
+        assert outcomes(7) == outcomes(7)
+        assert True in outcomes(7) and False in outcomes(7)
+
+    def test_from_env(self):
+        """测试根据环境变量创建"""
+        assert StubLLM.from_env({}) is None
+
+        llm = StubLLM.from_env({
+            "LG2JIUWEN_STUB_LLM": "1",
+            "LG2JIUWEN_STUB_LATENCY": "0.2",
+            "LG2JIUWEN_STUB_RATE_LIMIT": "5",
+            "LG2JIUWEN_STUB_FAILURE_RATE": "0.1",
+        })
+        assert (llm.latency, llm.rate_limit, llm.failure_rate, llm.responses) == (0.2, 5.0, 0.1, {})
+
+
+class TestStubIntegration:
+    """接入迁移服务和生成代码测试"""
+
+    @pytest.mark.asyncio
+    async def test_ai_stage_uses_stub(self):
+        """测试 AI 阶段通过替身转换待处理项"""
+        from lg2jiuwen_tool.components.ai_semantic import AISemanticComp
+        from lg2jiuwen_tool.workflow.state import ExtractionResult, PendingItem, PendingType
+
+        extraction = ExtractionResult(pending_items=[PendingItem(
+            id="agent.py:summarize", pending_type=PendingType.NODE_BODY,
+            source_code="def summarize(state): ...", context={}, question="转换", location="agent.py:1"
+        )])
+        llm = StubLLM(default='```python\nreturn {"summary": inputs["text"]}\n```')
+
+        result = await AISemanticComp(llm=llm).invoke(
+            inputs={"extraction_result": extraction}, runtime=None, context=None
+        )
+        assert result["extraction_result"].ai_count == 1
+        assert llm.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_generated_get_llm_uses_stub(self, monkeypatch):
+        """测试设置环境变量后生成代码的 get_llm() 返回替身"""
+        from lg2jiuwen_tool.service import MigrationOptions, migrate_async
+
+        example = os.path.join(
+            os.path.dirname(os.path.dirname(__file__)), 'example', 'langgraph', 'react_agent'
+        )
+        result = await migrate_async(
+            example, "unused",
+            MigrationOptions(use_ai=False, include_report=False, include_ir=False, output_mode="memory")
+        )
+        namespace = {}
+        exec(compile(result.files["agent/config.py"].decode("utf-8"), "config.py", "exec"), namespace)
+
+        monkeypatch.setenv("LG2JIUWEN_STUB_LLM", "1")
+        monkeypatch.setenv("LG2JIUWEN_STUB_LATENCY", "0.01")
+        llm = namespace["get_llm"]()
+        assert isinstance(llm, StubLLM)
+        assert llm.latency == 0.01
+        assert namespace["get_llm"]() is llm
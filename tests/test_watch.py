@@ -0,0 +1,104 @@
+"""
+监听模式测试
+"""
+import os
+import tempfile
+import pytest
+
+from lg2jiuwen_tool.service import MigrationOptions
+from lg2jiuwen_tool.watch import MigrationWatcher
+
+
+AGENT_CODE = '''
+from typing import TypedDict
+from langgraph.graph import StateGraph, END
+
+class State(TypedDict):
+    text: str
+
+def upper(state: State) -> dict:
+    return {"text": state["text"].upper()}
+
+graph = StateGraph(State)
+graph.add_node("upper", upper)
+graph.set_entry_point("upper")
+graph.add_edge("upper", END)
+app = graph.compile()
+'''
+
+
+class TestMigrationWatcher:
+    """迁移监听器测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.src_dir = os.path.join(self.temp_dir.name, "src")
+        self.out_dir = os.path.join(self.temp_dir.name, "out")
+        os.makedirs(self.src_dir)
+        self.agent_file = os.path.join(self.src_dir, "agent.py")
+        self._write(AGENT_CODE)
+        self.watcher = MigrationWatcher(
+            self.src_dir, self.out_dir, MigrationOptions(use_ai=False)
+        )
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, content: str):
+        with open(self.agent_file, "w") as f:
+            f.write(content)
+
+    def _bump_mtime(self):
+        """确保 mtime 变化（部分文件系统时间精度较低）"""
+        stat = os.stat(self.agent_file)
+        os.utime(self.agent_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_initial_scan_reports_all_files(self):
+        """测试首次扫描返回全部文件"""
+        assert self.watcher.scan() == [self.agent_file]
+        assert self.watcher.scan() == []
+
+    def test_touch_without_change_is_ignored(self):
+        """测试仅修改 mtime 不触发迁移"""
+        self.watcher.scan()
+        self._bump_mtime()
+        assert self.watcher.scan() == []
+
+    def test_detect_modified_and_deleted(self):
+        """测试检测修改和删除"""
+        self.watcher.scan()
+        self._write(AGENT_CODE + "\n# changed\n")
+        self._bump_mtime()
+        assert self.watcher.scan() == [self.agent_file]
+
+        os.unlink(self.agent_file)
+        assert self.watcher.scan() == [self.agent_file]
+
+    @pytest.mark.asyncio
+    async def test_poll_once_remigrates(self):
+        """测试文件变化后重新迁移"""
+        events = []
+        self.watcher.on_change = events.append
+
+        first = await self.watcher.migrate(self.watcher.scan())
+        assert first.result.success, first.result.errors
+        assert await self.watcher.poll_once() is None
+
+        self._write(AGENT_CODE.replace("upper()", "lower()"))
+        self._bump_mtime()
+        event = await self.watcher.poll_once()
+
+        assert event is not None
+        assert event.result.success, event.result.errors
+        assert event.changed_files == [self.agent_file]
+        assert event.elapsed > 0
+        assert len(events) == 2
+
+    @pytest.mark.asyncio
+    async def test_ast_cache_owned_by_watcher(self):
+        """测试监听会话的 AST 缓存由监听器持有，不同监听器互不共享"""
+        await self.watcher.migrate(self.watcher.scan())
+        assert len(self.watcher.ast_cache) == 1
+
+        other = MigrationWatcher(self.src_dir, self.out_dir, MigrationOptions(use_ai=False))
+        assert len(other.ast_cache) == 0
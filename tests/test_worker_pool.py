@@ -0,0 +1,220 @@
+"""
+预热解释器池测试
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+from lg2jiuwen_tool.runner import RunTarget
+from lg2jiuwen_tool.worker_pool import WorkerPool
+
+
+def make_project(root, name, message):
+    """创建与生成代码结构相同的项目：<root>/<name>/main.py + agent 包"""
+    project = os.path.join(root, name)
+    package = os.path.join(project, "agent")
+    os.makedirs(package)
+    with open(os.path.join(package, "__init__.py"), "w") as f:
+        f.write(f"MESSAGE = {message!r}\n")
+    with open(os.path.join(project, "main.py"), "w") as f:
+        f.write(
+            "import sys\n"
+            "from agent import MESSAGE\n"
+            "\n"
+            "def run(inputs):\n"
+            "    return {'message': MESSAGE, **inputs}\n"
+            "\n"
+            "if __name__ == '__main__':\n"
+            "    print(MESSAGE)\n"
+            "    print('warn', file=sys.stderr)\n"
+        )
+    return RunTarget(main_file=os.path.join(project, "main.py"), cwd=project)
+
+
+def make_loading_project(root, name, message):
+    """创建 run() 返回入口加载次数的项目（计数保存在进程级的 sys 上，不随项目模块卸载）"""
+    target = make_project(root, name, message)
+    with open(target.main_file, "w") as f:
+        f.write(
+            "import sys\n"
+            "from agent import MESSAGE\n"
+            "\n"
+            "LOADS = sys.__dict__.setdefault('_test_loads', {})\n"
+            "LOADS[MESSAGE] = LOADS.get(MESSAGE, 0) + 1\n"
+            "\n"
+            "def run(inputs):\n"
+            "    return {'message': MESSAGE, 'loads': LOADS[MESSAGE]}\n"
+            "\n"
+            "if __name__ == '__main__':\n"
+            "    print(MESSAGE)\n"
+        )
+    return target
+
+
+class TestWorkerPool:
+    """解释器池测试"""
+
+    def setup_method(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def teardown_method(self):
+        self.temp_dir.cleanup()
+
+    def _pool(self, **kwargs):
+        kwargs.setdefault("size", 1)
+        kwargs.setdefault("timeout", 20)
+        return WorkerPool(preload=("json",), python=sys.executable, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_run_main_captures_output(self):
+        """测试执行 main.py 并捕获输出"""
+        target = make_project(self.temp_dir.name, "p1", "hello")
+        pool = self._pool()
+        try:
+            await pool.start()
+            result = await pool.run_main(target)
+            assert result.exit_code == 0
+            assert result.stdout == "hello\n"
+            assert result.stderr == "warn\n"
+            assert not result.cold
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_run_inputs(self):
+        """测试调用 run(inputs)"""
+        target = make_project(self.temp_dir.name, "p1", "hello")
+        pool = self._pool()
+        try:
+            result = await pool.run(target, {"x": 1})
+            assert result.exit_code == 0
+            assert result.result == {"message": "hello", "x": 1}
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_projects_do_not_share_modules(self):
+        """测试同名包的不同项目不会互相污染"""
+        first = make_project(self.temp_dir.name, "p1", "one")
+        second = make_project(self.temp_dir.name, "p2", "two")
+        pool = self._pool()
+        try:
+            assert (await pool.run_main(first)).stdout == "one\n"
+            assert (await pool.run_main(second)).stdout == "two\n"
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_recycle_after_max_runs(self):
+        """测试运行次数达到上限后回收，替代进程的首次运行计为冷启动"""
+        target = make_project(self.temp_dir.name, "p1", "hello")
+        pool = self._pool(max_runs=1)
+        try:
+            await pool.start()
+            first = await pool.run_main(target)
+            second = await pool.run_main(target)
+            assert not first.cold
+            assert second.cold
+            assert pool.stats.recycled >= 1
+
+            stats = pool.stats.to_dict()
+            assert stats["warm"]["count"] == 1
+            assert stats["cold"]["count"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_exit_code_and_timeout(self):
+        """测试退出码和超时"""
+        project = os.path.join(self.temp_dir.name, "p3")
+        os.makedirs(project)
+        exit_file = os.path.join(project, "exit.py")
+        with open(exit_file, "w") as f:
+            f.write("import sys\nsys.exit(4)\n")
+        slow_file = os.path.join(project, "slow.py")
+        with open(slow_file, "w") as f:
+            f.write("import time\ntime.sleep(30)\n")
+
+        pool = self._pool()
+        try:
+            result = await pool.run_main(RunTarget(exit_file, project))
+            assert result.exit_code == 4
+
+            result = await pool.run_main(RunTarget(slow_file, project), timeout=1)
+            assert result.timed_out
+            assert pool.stats.recycled == 1
+
+            result = await pool.run_main(RunTarget(exit_file, project))
+            assert result.exit_code == 4
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_single_file_keeps_preloaded_modules(self, monkeypatch):
+        """测试单文件 Agent 运行后不卸载预导入的模块，再次运行仍为预热状态"""
+        lib = os.path.join(self.temp_dir.name, "lib")
+        os.makedirs(os.path.join(lib, "agents"))
+        with open(os.path.join(lib, "warm_mod.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        # 入口文件上两级目录即预导入模块所在目录
+        main_file = os.path.join(lib, "agents", "b.py")
+        with open(main_file, "w") as f:
+            f.write(
+                "import sys\n"
+                "\n"
+                "def run(inputs):\n"
+                "    return {name: name in sys.modules for name in inputs['modules']}\n"
+            )
+        monkeypatch.setenv("PYTHONPATH", lib)
+
+        modules = ["openjiuwen.core.runtime.workflow", "warm_mod"]
+        pool = WorkerPool(preload=tuple(modules), python=sys.executable, size=1, timeout=60)
+        try:
+            await pool.start()
+            target = RunTarget(main_file=main_file, cwd=os.path.dirname(main_file))
+            first = await pool.run(target, {"modules": modules})
+            second = await pool.run(target, {"modules": modules})
+            assert first.exit_code == 0, first.stderr
+            assert second.result == {name: True for name in modules}
+            assert not second.cold
+            assert pool.stats.to_dict()["warm"]["count"] == 2
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_run_reuses_cached_namespace(self):
+        """测试同一项目的 run 请求复用已加载的命名空间，不同项目的同名包互不影响"""
+        first = make_loading_project(self.temp_dir.name, "p1", "one")
+        second = make_loading_project(self.temp_dir.name, "p2", "two")
+        pool = self._pool()
+        try:
+            results = [(await pool.run(target, {})).result for target in (first, first, second, first)]
+            assert results == [
+                {"message": "one", "loads": 1},
+                {"message": "one", "loads": 1},
+                {"message": "two", "loads": 1},
+                {"message": "one", "loads": 1},
+            ]
+            # main 请求仍执行 __main__ 块，使用当前项目的模块
+            assert (await pool.run_main(second)).stdout == "two\n"
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_regenerated_project_reloaded(self):
+        """测试入口文件重新生成（mtime 变化）后重新加载"""
+        target = make_loading_project(self.temp_dir.name, "p1", "one")
+        pool = self._pool()
+        try:
+            assert (await pool.run(target, {})).result["message"] == "one"
+
+            with open(os.path.join(os.path.dirname(target.main_file), "agent", "__init__.py"), "w") as f:
+                f.write("MESSAGE = 'changed'\n")
+            stat = os.stat(target.main_file)
+            os.utime(target.main_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+            assert (await pool.run(target, {})).result == {"message": "changed", "loads": 1}
+        finally:
+            await pool.close()